@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark message encryption throughput for each cipher backend.
+Reports encrypt+decrypt throughput and ciphertext overhead per payload size.
+
+Usage:
+    python benchmarks/bench_cipher_backends.py [--seconds S]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from security.cipher_backends import BACKENDS, has_aes_acceleration, resolve_backend_name
+from security.encryption import SecureEncryption
+
+PAYLOAD_SIZES = (64, 1024, 16 * 1024, 256 * 1024)
+
+
+def measure(encryptor: SecureEncryption, payload: bytes, seconds: float):
+    """
+    Encrypt and decrypt repeatedly for roughly ``seconds``.
+
+    Returns:
+        Tuple of (messages per second, MB per second)
+    """
+    iterations = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for _ in range(16):
+            encryptor.decrypt_bytes(encryptor.encrypt_bytes(payload))
+        iterations += 16
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+    elapsed = now - start
+    return iterations / elapsed, iterations * len(payload) / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=0.5, help='time per case')
+    args = parser.parse_args()
+
+    print(f"AES acceleration: {has_aes_acceleration()}, 'aead' -> {resolve_backend_name('aead')}")
+    print(f"{'backend':<20} {'size':>8} {'msgs/s':>12} {'MB/s':>10} {'overhead':>10}")
+    for size in PAYLOAD_SIZES:
+        payload = os.urandom(size)
+        for name in BACKENDS:
+            encryptor = SecureEncryption(backend=name)
+            overhead = len(encryptor.encrypt_bytes(payload)) - size
+            per_second, megabytes = measure(encryptor, payload, args.seconds)
+            print(
+                f"{name:<20} {size:>8} {per_second:>12,.0f} {megabytes:>10.1f} "
+                f"{overhead:>+9}B"
+            )
+
+
+if __name__ == '__main__':
+    main()
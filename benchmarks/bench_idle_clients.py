@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark server threads and memory with many idle clients.
+Runs the server in a subprocess for each mode, connects N authenticated
+clients that then sit idle, and reads the server's thread count and RSS.
+
+Usage:
+    python benchmarks/bench_idle_clients.py [--clients N] [--pool-size P]
+"""
+
+import argparse
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+# Add project root to Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from security.encryption import SecureEncryption
+from security.key_exchange import KeyExchange
+from utils.protocol import recv_frame, send_frame
+
+# Server process: accepts any login so the benchmark measures connection
+# handling, not 5k PBKDF2 verifications
+SERVER_SCRIPT = '''
+import sys, tempfile, threading
+from server.server import ChatServer
+from server.authentication import AuthenticationManager
+from server.database import DatabaseManager
+from server.rate_limiter import ServerRateLimits
+
+class AcceptAll(AuthenticationManager):
+    def authenticate_user(self, username, password):
+        return True
+
+clients, mode, pool_size = int(sys.argv[1]), sys.argv[2], int(sys.argv[3])
+workdir = tempfile.mkdtemp()
+server = ChatServer(
+    host='127.0.0.1', port=0, max_connections=clients + 100,
+    auth_manager=AcceptAll(workdir + '/users.db'),
+    database_manager=DatabaseManager(workdir + '/chat.db'),
+    rate_limits=ServerRateLimits(auth_attempts_per_minute=1e9, auth_burst=1e9),
+    mode=mode, worker_pool_size=pool_size
+)
+server.logger.setLevel('WARNING')
+threading.Thread(target=server.start, daemon=True).start()
+server.ready.wait()
+print(server.port, flush=True)
+sys.stdin.read()
+'''
+
+
+def read_status(pid: int):
+    """
+    Return (threads, RSS in MB) for a process from /proc.
+    """
+    values = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            values[key] = value.strip()
+    return int(values['Threads']), int(values['VmRSS'].split()[0]) / 1024
+
+
+def open_client(port: int, index: int) -> socket.socket:
+    """
+    Connect, complete the key exchange and log in, then leave the socket idle.
+    """
+    sock = socket.create_connection(('127.0.0.1', port))
+    hello = recv_frame(sock)
+    server_public_key, cipher = KeyExchange.parse_hello(hello)
+    key_exchange = KeyExchange()
+    send_frame(sock, key_exchange.hello_frame())
+    encryption = SecureEncryption.from_session_key(
+        key_exchange.derive_session_key(server_public_key, is_server=False),
+        backend=cipher
+    )
+    recv_frame(sock)  # AUTH_REQUEST
+    send_frame(sock, encryption.encrypt_bytes(f'idle{index}:password'.encode('utf-8')))
+    if encryption.decrypt_bytes(recv_frame(sock)) != b'AUTH_SUCCESS':
+        raise RuntimeError("Login failed")
+    return sock
+
+
+def run_mode(mode: str, clients: int, pool_size: int):
+    server = subprocess.Popen(
+        [sys.executable, '-c', SERVER_SCRIPT, str(clients), mode, str(pool_size)],
+        cwd=PROJECT_ROOT,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    sockets = []
+    try:
+        port = int(server.stdout.readline())
+        baseline_threads, baseline_rss = read_status(server.pid)
+
+        start = time.perf_counter()
+        for index in range(clients):
+            sockets.append(open_client(port, index))
+        connect_time = time.perf_counter() - start
+
+        time.sleep(1)  # Let the server settle
+        threads, rss = read_status(server.pid)
+        print(
+            f"{mode:<9} clients={clients:<6} threads={threads:<6} "
+            f"rss={rss:8.1f} MB (+{rss - baseline_rss:.1f})  "
+            f"connect={connect_time:6.2f}s"
+        )
+    finally:
+        for sock in sockets:
+            sock.close()
+        server.stdin.close()
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=5000)
+    parser.add_argument('--pool-size', type=int, default=32)
+    args = parser.parse_args()
+
+    # Each client needs one descriptor here and one in the server
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, args.clients + 1024)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+    for mode in ('threaded', 'reactor'):
+        run_mode(mode, args.clients, args.pool_size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-connection key setup cost.
+Compares the old PBKDF2-per-instance setup with the X25519 + HKDF handshake
+and reports how many connects per minute each allows on one core.
+
+Usage:
+    python benchmarks/bench_key_exchange.py [--connections N]
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from security.encryption import SecureEncryption
+from security.key_exchange import KeyExchange
+
+TARGET_CONNECTS_PER_MINUTE = 10000
+
+
+def legacy_setup():
+    """
+    What every SecureEncryption() used to cost: PBKDF2 over random bytes.
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=os.urandom(16),
+        iterations=100000
+    )
+    return Fernet(base64.urlsafe_b64encode(kdf.derive(os.urandom(32))))
+
+
+def handshake_setup():
+    """
+    Both sides of one X25519 exchange, including frame encoding and ciphers.
+    """
+    server = KeyExchange()
+    client = KeyExchange()
+    server_hello = server.hello_frame()
+    client_hello = client.hello_frame()
+
+    server_cipher = SecureEncryption.from_session_key(
+        server.derive_session_key(KeyExchange.parse_hello(client_hello)[0], is_server=True)
+    )
+    client_cipher = SecureEncryption.from_session_key(
+        client.derive_session_key(KeyExchange.parse_hello(server_hello)[0], is_server=False)
+    )
+    return server_cipher, client_cipher
+
+
+def measure(label: str, setup, connections: int):
+    start = time.perf_counter()
+    for _ in range(connections):
+        setup()
+    per_connect = (time.perf_counter() - start) / connections
+    per_minute = 60 / per_connect
+    verdict = 'ok' if per_minute >= TARGET_CONNECTS_PER_MINUTE else 'below target'
+    print(
+        f"{label:<22} {per_connect * 1e6:10.1f} us/connect  "
+        f"{per_minute:12,.0f} connects/min  ({verdict})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"target: {TARGET_CONNECTS_PER_MINUTE:,} connects/min")
+    measure('pbkdf2 per instance', legacy_setup, max(1, args.connections // 100))
+    measure('x25519 + hkdf', handshake_setup, args.connections)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark process startup for the server and client entry points.
+Measures import time with ``python -X importtime`` and the cost of
+constructing ChatServer on a fresh and on an existing database.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--top K] [--max-ms MS]
+
+With --max-ms the script exits non-zero when any entry point's import
+takes longer, so it can guard against startup regressions in CI.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# Add project root to Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+ENTRY_POINTS = ('run_server', 'client.client', 'client.async_client')
+
+# Server process: times ChatServer construction, i.e. schema setup and
+# everything else done before start()
+CONSTRUCT_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+from server.server import ChatServer
+from server.database import DatabaseManager
+imported = time.perf_counter()
+ChatServer(host='127.0.0.1', port=0, database_manager=DatabaseManager(sys.argv[1]))
+print(f"{(imported - start) * 1000:.1f} {(time.perf_counter() - imported) * 1000:.1f}")
+'''
+
+
+def import_times(module: str):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        Dict of module name to (self, cumulative) microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure_imports(module: str, runs: int):
+    """
+    Return the fastest of several runs, which filters out disk cache noise.
+    """
+    return min((import_times(module) for _ in range(runs)), key=lambda times: times[module][1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per entry point')
+    parser.add_argument('--top', type=int, default=8, help='slowest imports listed per entry point')
+    parser.add_argument('--max-ms', type=float, help='fail if an entry point imports slower than this')
+    args = parser.parse_args()
+
+    failed = False
+    for module in ENTRY_POINTS:
+        times = measure_imports(module, args.runs)
+        total_ms = times[module][1] / 1000
+        print(f"{module:<22} import {total_ms:8.1f} ms  ({len(times)} modules)")
+
+        slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+        for name, (self_us, cumulative_us) in slowest:
+            print(f"    {name:<50} self {self_us / 1000:6.1f} ms  cumulative {cumulative_us / 1000:6.1f} ms")
+
+        if args.max_ms is not None and total_ms > args.max_ms:
+            print(f"    ! over the {args.max_ms:.0f} ms budget")
+            failed = True
+
+    # First construction creates the schema; later ones find the version marker
+    with tempfile.TemporaryDirectory() as workdir:
+        database_path = os.path.join(workdir, 'chat.db')
+        for label in ('new database', 'existing database'):
+            result = subprocess.run(
+                [sys.executable, '-c', CONSTRUCT_SCRIPT, database_path],
+                cwd=PROJECT_ROOT,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            import_ms, construct_ms = result.stdout.split()
+            print(f"ChatServer ({label:<17}) import {float(import_ms):6.1f} ms  construct {float(construct_ms):6.1f} ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
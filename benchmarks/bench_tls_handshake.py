@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark TLS handshake cost for full and resumed sessions.
+Also compares certificate generation for ECDSA, RSA and cached certificates.
+
+Usage:
+    python benchmarks/bench_tls_handshake.py [--connections N]
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from security.ssl_config import (
+    SSLConfiguration,
+    TLSSessionCache,
+    get_client_context,
+    get_server_context
+)
+
+
+def time_cert_generation(cert_dir: str):
+    """
+    Time certificate generation for each key type and for a cache hit.
+    """
+    for key_type in ('rsa', 'ec'):
+        config = SSLConfiguration(output_dir=os.path.join(cert_dir, key_type), key_type=key_type)
+        start = time.perf_counter()
+        config.generate_self_signed_cert(force=True)
+        print(f"cert generation ({key_type}):   {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    start = time.perf_counter()
+    config.generate_self_signed_cert()
+    print(f"cert generation (cached): {(time.perf_counter() - start) * 1000:8.2f} ms")
+    return config.generate_self_signed_cert()
+
+
+def run_server(listener: socket.socket, context, count: int):
+    for _ in range(count):
+        conn, _ = listener.accept()
+        try:
+            with context.wrap_socket(conn, server_side=True) as tls_conn:
+                tls_conn.sendall(b'x')
+                tls_conn.recv(1)
+        except OSError:
+            pass
+
+
+def time_handshakes(port: int, client_context, connections: int, resume: bool):
+    """
+    Open sequential connections.
+
+    Returns:
+        Tuple of (mean handshake time in ms, number of resumed sessions)
+    """
+    cache = TLSSessionCache()
+    total = 0.0
+    reused = 0
+    for _ in range(connections):
+        sock = socket.create_connection(('127.0.0.1', port))
+        start = time.perf_counter()
+        tls_sock = client_context.wrap_socket(
+            sock,
+            server_hostname='localhost',
+            session=cache.get('localhost', port) if resume else None
+        )
+        total += time.perf_counter() - start
+        reused += tls_sock.session_reused
+        tls_sock.recv(1)
+        if resume:
+            cache.store('localhost', port, tls_sock)
+        tls_sock.sendall(b'y')
+        tls_sock.close()
+    return total / connections * 1000, reused
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, default=200)
+    args = parser.parse_args()
+
+    cert_dir = tempfile.mkdtemp()
+    try:
+        cert_path, key_path = time_cert_generation(cert_dir)
+        server_context = get_server_context(cert_path, key_path)
+        client_context = get_client_context(cafile=cert_path)
+
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(128)
+        port = listener.getsockname()[1]
+
+        server_thread = threading.Thread(
+            target=run_server,
+            args=(listener, server_context, args.connections * 2),
+            daemon=True
+        )
+        server_thread.start()
+
+        full, _ = time_handshakes(port, client_context, args.connections, resume=False)
+        resumed, reused = time_handshakes(port, client_context, args.connections, resume=True)
+        server_thread.join(timeout=10)
+        listener.close()
+
+        print(f"full handshake:    {full:8.3f} ms")
+        print(
+            f"resumed handshake: {resumed:8.3f} ms  ({full / resumed:.1f}x faster, "
+            f"{reused}/{args.connections} resumed)"
+        )
+    finally:
+        shutil.rmtree(cert_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""
+Asyncio client module for the distributed chat application.
+Lets bots and integrations run many chat sessions in one event loop.
+"""
+
+import asyncio
+import json
+import uuid
+from collections import OrderedDict, deque
+from security.encryption import SecureEncryption
+from security.key_exchange import KeyExchange, check_login_transport
+from utils.protocol import read_frame, write_frame
+
+# Most sent messages kept for resending; beyond it the oldest are given up
+MAX_UNACKNOWLEDGED = 1000
+
+class AsyncChatClient:
+    def __init__(self, host='localhost', port=5000, ssl_context=None, max_pending=1000, allow_plaintext=False):
+        """
+        Initialize an asyncio chat client.
+
+        Speaks the same framing, key exchange and SecureEncryption message
+        format as ChatClient, so it works against today's ChatServer.
+
+        Incoming messages wait in a queue of at most ``max_pending``
+        entries. When a consumer falls behind, the reader stops reading
+        the socket and TCP flow control pushes back on the server instead
+        of the client buffering without bound.
+
+        As with ChatClient, logging in without TLS is only allowed to a
+        loopback address unless allow_plaintext is set.
+
+        Args:
+            host (str): Server hostname or IP address
+            port (int): Server port number
+            ssl_context (ssl.SSLContext, optional): Client context; enables TLS
+            max_pending (int): Received messages buffered before reading pauses
+            allow_plaintext (bool): Log in without TLS over the network,
+                accepting that the password can be intercepted
+
+        Raises:
+            ValueError: If a remote host is given without TLS or allow_plaintext
+        """
+        check_login_transport(host, ssl_context is not None, allow_plaintext)
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.username = None
+        self.encryption = None  # Keyed per connection during the handshake
+        self.is_connected = False
+
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._messages = asyncio.Queue(maxsize=max_pending)
+        self._ended = False
+        self.last_error = None  # Why the last connection ended, if not cleanly
+        self._subscription = None  # Re-sent after every reconnect
+
+        # Sent but not yet acknowledged, resent after a reconnect
+        self.unacknowledged = OrderedDict()
+
+        # Recently delivered server message IDs, to drop repeated deliveries
+        self._seen_ids = set()
+        self._seen_order = deque()
+        self.seen_window = 1000
+
+    async def connect(self, username, password):
+        """
+        Establish a secure, authenticated connection with the chat server.
+
+        Args:
+            username (str): Account username
+            password (str): Account password
+
+        Returns:
+            bool: Whether authentication succeeded
+
+        Raises:
+            ConnectionRefusedError: If the server is at capacity
+        """
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host,
+            self.port,
+            ssl=self.ssl_context,
+            server_hostname=self.host if self.ssl_context else None
+        )
+        try:
+            self.encryption = await self._exchange_keys()
+            if not await self._authenticate(username, password):
+                await self.close()
+                return False
+        except BaseException:
+            await self.close()
+            raise
+
+        self.username = username
+        self.is_connected = True
+        self._messages = asyncio.Queue(maxsize=self._messages.maxsize)
+        self._ended = False
+        self.last_error = None
+        if self._subscription is not None:
+            await self._send_encrypted(self._subscription)
+        for payload in list(self.unacknowledged.values()):
+            await self._send_encrypted(payload)
+        self._reader_task = asyncio.create_task(self._read_loop())
+        return True
+
+    async def _exchange_keys(self):
+        hello = await read_frame(self._reader)
+        if hello is None:
+            raise ConnectionError("Server closed during key exchange")
+        if json.loads(hello.decode('utf-8')).get('type') == 'server_busy':
+            raise ConnectionRefusedError("Server is at capacity")
+
+        server_public_key, cipher = KeyExchange.parse_hello(hello)
+        key_exchange = KeyExchange()
+        await write_frame(self._writer, key_exchange.hello_frame())
+        session_key = key_exchange.derive_session_key(server_public_key, is_server=False)
+        return SecureEncryption.from_session_key(session_key, backend=cipher or 'fernet')
+
+    async def _authenticate(self, username, password):
+        if await self._recv_decrypted() != "AUTH_REQUEST":
+            return False
+        await self._send_encrypted(f"{username}:{password}")
+        return await self._recv_decrypted() == "AUTH_SUCCESS"
+
+    async def _send_encrypted(self, message):
+        await write_frame(self._writer, self.encryption.encrypt_bytes(message.encode('utf-8')))
+
+    async def _recv_decrypted(self):
+        frame = await read_frame(self._reader)
+        if frame is None:
+            return None
+        return self.encryption.decrypt_bytes(frame).decode('utf-8')
+
+    async def _read_loop(self):
+        """
+        Decode server messages into the bounded queue until the connection ends.
+        """
+        try:
+            while True:
+                decrypted_msg = await self._recv_decrypted()
+                if decrypted_msg is None:
+                    break
+                message_data = json.loads(decrypted_msg)
+                if 'acks' in message_data:
+                    for client_message_id, _stored_id in message_data['acks']:
+                        self.unacknowledged.pop(client_message_id, None)
+                elif message_data.get('type') == 'error' and 'msg_id' in message_data:
+                    # Refused outright; a resend would only be refused again
+                    self.unacknowledged.pop(message_data['msg_id'], None)
+                if message_data.get('type') == 'ack' or self._is_repeat_delivery(message_data):
+                    continue
+                # Blocks while the queue is full: this is the backpressure
+                await self._messages.put(message_data)
+        except Exception as e:
+            # Socket errors, bad frames and failed decryption all end the session
+            self.last_error = e
+        finally:
+            self.is_connected = False
+            self._ended = True
+            if self._writer is not None:
+                self._writer.close()
+            try:
+                self._messages.put_nowait(None)
+            except asyncio.QueueFull:
+                pass  # iter_messages stops once the backlog is drained
+
+    def _is_repeat_delivery(self, message_data):
+        message_id = message_data.get('id')
+        if message_id is None:
+            return False
+        key = (message_data.get('type'), message_id)
+        if key in self._seen_ids:
+            return True
+        self._seen_ids.add(key)
+        self._seen_order.append(key)
+        if len(self._seen_order) > self.seen_window:
+            self._seen_ids.discard(self._seen_order.popleft())
+        return False
+
+    async def _send_tracked(self, envelope):
+        envelope['msg_id'] = uuid.uuid4().hex
+        payload = json.dumps(envelope)
+        self.unacknowledged[envelope['msg_id']] = payload
+        while len(self.unacknowledged) > MAX_UNACKNOWLEDGED:
+            self.unacknowledged.popitem(last=False)
+        if self.is_connected:
+            await self._send_encrypted(payload)
+        return envelope['msg_id']
+
+    async def send(self, message):
+        """
+        Send a message to the room.
+
+        Waits while the socket's send buffer is full.
+
+        Args:
+            message (str): Message content
+
+        Returns:
+            str: Client-generated message ID, acknowledged by the server
+        """
+        return await self._send_tracked({
+            'type': 'message',
+            'username': self.username,
+            'message': message
+        })
+
+    async def send_direct(self, recipient, message):
+        """
+        Send a private message to a single user.
+
+        Args:
+            recipient (str): Recipient's username
+            message (str): Message content
+
+        Returns:
+            str: Client-generated message ID, acknowledged by the server
+        """
+        return await self._send_tracked({
+            'type': 'direct',
+            'to': recipient,
+            'message': message
+        })
+
+    async def send_typing(self, is_typing=True):
+        """
+        Tell the server the user started or stopped typing.
+        """
+        if self.is_connected:
+            await self._send_encrypted(json.dumps({'type': 'typing', 'typing': is_typing}))
+
+    async def request_history(self, before_id=None, limit=50):
+        """
+        Ask for older room messages; the reply arrives as a 'history' message.
+        """
+        if self.is_connected:
+            await self._send_encrypted(json.dumps({
+                'type': 'history',
+                'before_id': before_id,
+                'limit': limit
+            }))
+
+    async def subscribe(self, keywords, notify_only=False):
+        """
+        Watch keywords; see ChatClient.subscribe. Restored after reconnecting.
+        """
+        self._subscription = json.dumps({
+            'type': 'subscribe',
+            'keywords': list(keywords),
+            'notify_only': notify_only
+        })
+        if self.is_connected:
+            await self._send_encrypted(self._subscription)
+
+    async def iter_messages(self):
+        """
+        Yield decoded server messages until the connection closes.
+
+        A 'reconnect' message means the server is restarting; wait its
+        'delay' before calling connect() again so logins are spread out.
+
+        Yields:
+            dict: Server message, as ChatClient.message_handler receives it
+        """
+        while True:
+            if self._ended and self._messages.empty():
+                return
+            message_data = await self._messages.get()
+            if message_data is None:
+                return
+            yield message_data
+
+    async def close(self):
+        """
+        Close the connection and stop the reader.
+        """
+        self.is_connected = False
+        if self._reader_task is not None:
+            # It may be waiting on a full queue rather than the socket
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self._writer = None
@@ -3,42 +3,224 @@ Core client-side communication module for the distributed chat application.
 Handles socket connections, message transmission, and client-server interactions.
 """
 
+import hashlib
+import os
 import socket
 import threading
+import time
 import json
+import uuid
+from collections import OrderedDict, deque
 from security.encryption import SecureEncryption
+from security.key_exchange import KeyExchange, check_login_transport
+from security.ssl_config import session_cache, wrap_client_socket
+from utils.protocol import CHUNK_SIZE, is_chunk, pack_chunk, recv_frame, send_frame, unpack_chunk
+
+# Server replies that only drive file transfers, never shown to the user
+TRANSFER_MESSAGES = ('upload_ready', 'download_start', 'download_end')
+
+# Most sent messages kept for resending; beyond it the oldest are given up
+MAX_UNACKNOWLEDGED = 1000
 
 class ChatClient:
-    def __init__(self, host='localhost', port=5000):
+    def __init__(self, host='localhost', port=5000, ssl_context=None, allow_plaintext=False):
         """
         Initialize the chat client with server connection details.
         
+        Without TLS the server's key is not authenticated, so logging in
+        to anything but a loopback address is refused unless
+        allow_plaintext is set.
+        
         Args:
             host (str): Server hostname or IP address
             port (int): Server port number
+            ssl_context (ssl.SSLContext, optional): Client context; enables TLS
+            allow_plaintext (bool): Log in without TLS over the network,
+                accepting that the password can be intercepted
+        
+        Raises:
+            ValueError: If a remote host is given without TLS or allow_plaintext
         """
+        check_login_transport(host, ssl_context is not None, allow_plaintext)
         self.host = host
         self.port = port
+        self.ssl_context = ssl_context
         self.socket = None
-        self.encryption = SecureEncryption()
+        self.encryption = None  # Keyed per connection during the handshake
         self.is_connected = False
+        self.message_handler = None  # Called with each decoded server message
+        self._credentials = None
+        self._reconnect_timer = None
+        self._receive_thread = None
+        self._subscription = None  # Re-sent after every reconnect
+        # Frames from the UI, typing and file transfers must not interleave
+        self._send_lock = threading.Lock()
+        # File transfers in progress, by transfer ID
+        self._transfers = {}
 
-    def connect(self):
+        # Sent but not yet acknowledged, resent after a reconnect
+        self.unacknowledged = OrderedDict()
+        self._unacknowledged_lock = threading.Lock()
+
+        # Recently delivered server message IDs, to drop repeated deliveries
+        self._seen_ids = set()
+        self._seen_order = deque()
+        self.seen_window = 1000
+
+    def connect(self, username, password):
         """
         Establish a secure connection with the chat server.
+        
+        Args:
+            username (str): Account username
+            password (str): Account password
+        
+        Returns:
+            bool: Whether the connection was established and authenticated
         """
+        # Kept so a server restart hint can log back in without the user
+        self._credentials = (username, password)
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.host, self.port))
+            if self.ssl_context:
+                # Resumes the last session with this server when one is cached
+                self.socket = wrap_client_socket(
+                    self.socket, self.host, self.port, self.ssl_context
+                )
+
+            self.encryption = self._exchange_keys()
+            if self.ssl_context:
+                # TLS 1.3 tickets arrive with the first server data
+                session_cache.store(self.host, self.port, self.socket)
+
+            if not self._authenticate(username, password):
+                print("Authentication failed")
+                self.disconnect()
+                return False
             self.is_connected = True
+            if self._subscription is not None:
+                self._send_encrypted(self._subscription)
+            self._resend_unacknowledged()
             
             # Start listening thread
-            receive_thread = threading.Thread(target=self.receive_messages)
-            receive_thread.daemon = True
-            receive_thread.start()
+            self._receive_thread = threading.Thread(target=self.receive_messages)
+            self._receive_thread.daemon = True
+            self._receive_thread.start()
         except Exception as e:
             print(f"Connection error: {e}")
             self.is_connected = False
+        return self.is_connected
+
+    def _exchange_keys(self):
+        """
+        Answer the server's key exchange and derive the session cipher.
+        
+        Returns:
+            SecureEncryption: Cipher sharing the session key with the server
+        """
+        hello = recv_frame(self.socket)
+        if hello is None:
+            raise ConnectionError("Server closed during key exchange")
+        if json.loads(hello.decode('utf-8')).get('type') == 'server_busy':
+            raise ConnectionRefusedError("Server is at capacity")
+
+        server_public_key, cipher = KeyExchange.parse_hello(hello)
+        key_exchange = KeyExchange()
+        send_frame(self.socket, key_exchange.hello_frame())
+        session_key = key_exchange.derive_session_key(server_public_key, is_server=False)
+        return SecureEncryption.from_session_key(session_key, backend=cipher or 'fernet')
+
+    def _send_encrypted(self, message):
+        self._send_payload(message.encode('utf-8'))
+
+    def _send_payload(self, payload):
+        with self._send_lock:
+            send_frame(self.socket, self.encryption.encrypt_bytes(payload))
+
+    def _recv_payload(self):
+        frame = recv_frame(self.socket)
+        if frame is None:
+            return None
+        return self.encryption.decrypt_bytes(frame)
+
+    def _recv_decrypted(self):
+        payload = self._recv_payload()
+        return None if payload is None else payload.decode('utf-8')
+
+    def _authenticate(self, username, password):
+        """
+        Complete the server's authentication request.
+        
+        Returns:
+            bool: Authentication success status
+        """
+        if self._recv_decrypted() != "AUTH_REQUEST":
+            return False
+        self._send_encrypted(f"{username}:{password}")
+        return self._recv_decrypted() == "AUTH_SUCCESS"
+
+    def _send_tracked(self, envelope):
+        """
+        Send a message under a fresh client ID and keep it until acknowledged.
+        
+        A message the server refuses comes back as an error carrying its
+        ID and is forgotten. At most MAX_UNACKNOWLEDGED are kept; the
+        oldest are dropped first.
+        
+        Args:
+            envelope (dict): Message envelope without an ID
+        
+        Returns:
+            str: Client-generated message ID
+        """
+        envelope['msg_id'] = uuid.uuid4().hex
+        payload = json.dumps(envelope)
+        with self._unacknowledged_lock:
+            self.unacknowledged[envelope['msg_id']] = payload
+            while len(self.unacknowledged) > MAX_UNACKNOWLEDGED:
+                self.unacknowledged.popitem(last=False)
+
+        if self.is_connected:
+            try:
+                self._send_encrypted(payload)
+            except Exception as e:
+                # Kept in unacknowledged; resent on the next connect
+                print(f"Send error: {e}")
+        return envelope['msg_id']
+
+    def _resend_unacknowledged(self):
+        """
+        Resend messages the server never acknowledged, under their original IDs.
+        
+        The server recognises IDs it already stored and only acknowledges
+        them again, so a resend never creates a duplicate.
+        """
+        with self._unacknowledged_lock:
+            pending = list(self.unacknowledged.values())
+        for payload in pending:
+            self._send_encrypted(payload)
+
+    def _handle_acks(self, acks):
+        with self._unacknowledged_lock:
+            for client_message_id, _stored_id in acks:
+                self.unacknowledged.pop(client_message_id, None)
+
+    def _is_repeat_delivery(self, message_data):
+        """
+        Check whether a server message was already delivered to this client.
+        """
+        message_id = message_data.get('id')
+        if message_id is None:
+            return False
+        key = (message_data.get('type'), message_id)
+        if key in self._seen_ids:
+            return True
+        self._seen_ids.add(key)
+        self._seen_order.append(key)
+        if len(self._seen_order) > self.seen_window:
+            self._seen_ids.discard(self._seen_order.popleft())
+        return False
 
     def send_message(self, message, username):
         """
@@ -47,41 +229,337 @@ class ChatClient:
         Args:
             message (str): Message content
             username (str): Sender's username
+        
+        Returns:
+            str: Client-generated message ID, acknowledged by the server
+        """
+        return self._send_tracked({
+            'type': 'message',
+            'username': username,
+            'message': message
+        })
+
+    def send_direct_message(self, recipient, message):
+        """
+        Send a private message to a single user.
+        
+        Args:
+            recipient (str): Recipient's username
+            message (str): Message content
+        
+        Returns:
+            str: Client-generated message ID, acknowledged by the server
+        """
+        return self._send_tracked({
+            'type': 'direct',
+            'to': recipient,
+            'message': message
+        })
+
+    def send_typing(self, is_typing=True):
+        """
+        Tell the server the user started or stopped typing.
+        
+        Args:
+            is_typing (bool): Whether the user is typing
         """
         if not self.is_connected:
             return
 
-        encrypted_msg = self.encryption.encrypt(json.dumps({
-            'username': username,
-            'message': message
-        }))
+        try:
+            self._send_encrypted(json.dumps({'type': 'typing', 'typing': is_typing}))
+        except Exception as e:
+            print(f"Send error: {e}")
+
+    def request_history(self, before_id=None, limit=50):
+        """
+        Ask the server for older room messages.
+        
+        The reply arrives as a 'history' message through the normal
+        receive path.
+        
+        Args:
+            before_id (int, optional): Only messages older than this ID
+            limit (int): Maximum number of messages
+        """
+        if not self.is_connected:
+            return
+
+        try:
+            self._send_encrypted(json.dumps({
+                'type': 'history',
+                'before_id': before_id,
+                'limit': limit
+            }))
+        except Exception as e:
+            print(f"Send error: {e}")
+
+    def subscribe(self, keywords, notify_only=False):
+        """
+        Watch keywords in the room and optionally receive only notifying messages.
+        
+        Room messages that @mention this user or contain a keyword (as a
+        whole word, any case) arrive with 'notify' set. The subscription
+        replaces any earlier one and is restored after reconnecting.
         
+        Args:
+            keywords (list): Words or phrases to watch
+            notify_only (bool): Receive only messages that notify this user
+        """
+        self._subscription = json.dumps({
+            'type': 'subscribe',
+            'keywords': list(keywords),
+            'notify_only': notify_only
+        })
+        if not self.is_connected:
+            return
+
         try:
-            self.socket.send(encrypted_msg.encode('utf-8'))
+            self._send_encrypted(self._subscription)
         except Exception as e:
             print(f"Send error: {e}")
 
+    def send_file(self, path, name=None, timeout=30.0):
+        """
+        Upload a file to the room as an attachment.
+        
+        The file is hashed first; if the server already stores that
+        content it skips the transfer. Otherwise the file is sent in
+        CHUNK_SIZE pieces, each encrypted as its own frame and paced to
+        the upload rate the server announces, so neither side holds the
+        whole file in memory. The room receives only a
+        reference (name, size, SHA-256) that clients can download.
+        Blocks until the upload is sent; call it off the UI thread.
+        
+        Args:
+            path (str): File to send
+            name (str, optional): Name shown to others, default the file name
+            timeout (float): Seconds to wait for the server to accept the upload
+        
+        Returns:
+            Optional client message ID, acknowledged once the reference is
+            stored; None if the server refused the upload
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+
+        transfer_id = uuid.uuid4().hex
+        transfer = self._transfers[transfer_id] = {'event': threading.Event(), 'reply': None}
+        try:
+            self._send_encrypted(json.dumps({
+                'type': 'upload_start',
+                'transfer_id': transfer_id,
+                'name': name or os.path.basename(path),
+                'size': os.path.getsize(path),
+                'sha256': digest.hexdigest()
+            }))
+            if not transfer['event'].wait(timeout):
+                return None
+        finally:
+            del self._transfers[transfer_id]
+
+        reply = transfer['reply']
+        if not reply['skip']:
+            # Keep to the server's upload rate; going over it aborts the upload
+            rate = reply.get('bytes_per_second')
+            started, sent = time.monotonic(), 0
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(reply['chunk_size']), b''):
+                    if rate:
+                        delay = started + sent / rate - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                    self._send_payload(pack_chunk(transfer_id, chunk))
+                    sent += len(chunk)
+        return self._send_tracked({'type': 'upload_end', 'transfer_id': transfer_id})
+
+    def download_file(self, sha256, path, timeout=60.0):
+        """
+        Download an attachment and verify it against its hash.
+        
+        Chunks are written to path + '.part' as they arrive and the file
+        is moved into place only if the hash matches.
+        
+        Args:
+            sha256 (str): Attachment hash from a message's 'attachment' field
+            path (str): Where to save the file
+            timeout (float): Seconds to wait for the whole download
+        
+        Returns:
+            bool: Whether the file was downloaded intact
+        """
+        transfer_id = uuid.uuid4().hex
+        part_path = path + '.part'
+        transfer = self._transfers[transfer_id] = {
+            'event': threading.Event(),
+            'file': open(part_path, 'wb'),
+            'hash': hashlib.sha256()
+        }
+        try:
+            self._send_encrypted(json.dumps({
+                'type': 'download',
+                'transfer_id': transfer_id,
+                'sha256': sha256
+            }))
+            completed = transfer['event'].wait(timeout)
+        finally:
+            del self._transfers[transfer_id]
+            transfer['file'].close()
+
+        if completed and transfer['hash'].hexdigest() == sha256:
+            os.replace(part_path, path)
+            return True
+        os.unlink(part_path)
+        return False
+
+    def _handle_transfer(self, message_data):
+        transfer = self._transfers.get(message_data.get('transfer_id'))
+        if transfer is None:
+            return
+        if message_data['type'] == 'upload_ready':
+            transfer['reply'] = message_data
+            transfer['event'].set()
+        elif message_data['type'] == 'download_end':
+            transfer['event'].set()
+
+    def _receive_chunk(self, payload):
+        transfer_id, data = unpack_chunk(payload)
+        transfer = self._transfers.get(transfer_id)
+        if transfer is not None and 'file' in transfer:
+            transfer['file'].write(data)
+            transfer['hash'].update(data)
+
+    @staticmethod
+    def format_message(message_data):
+        """
+        Render a server message as display lines.
+        
+        Args:
+            message_data (dict): Decoded server message
+        
+        Returns:
+            List[str]: Lines to show, possibly empty
+        """
+        message_type = message_data.get('type', 'message')
+        if message_type == 'ack':
+            return []
+        if message_type == 'direct':
+            return [f"[DM] {message_data['sender']}: {message_data['message']}"]
+        if message_type == 'error':
+            return [f"Server error: {message_data['message']}"]
+        if message_type == 'presence':
+            lines = []
+            if 'online' in message_data:
+                lines.append(f"* Online: {', '.join(message_data['online'])}")
+            for change in message_data.get('changes', []):
+                status = 'typing' if change['typing'] else (
+                    'online' if change['online'] else 'offline'
+                )
+                lines.append(f"* {change['username']} is {status}")
+            return lines
+        if message_type == 'reconnect':
+            return [f"* Server restarting; reconnecting in {message_data['delay']:.1f}s"]
+        if message_type == 'subscribed':
+            mode = ' (notifications only)' if message_data['notify_only'] else ''
+            return [f"* Watching: {', '.join(message_data['keywords']) or 'mentions only'}{mode}"]
+        if message_type == 'history':
+            return [
+                f"{row['sender']}: {row['message']}"
+                for row in reversed(message_data['messages'])
+            ]
+        marker = '[!] ' if message_data.get('notify') else ''
+        return [f"{marker}{message_data['sender']}: {message_data['message']}"]
+
     def receive_messages(self):
         """
         Continuously listen for incoming messages from the server.
         Decrypts and processes received messages.
+        
+        Messages go to message_handler if one is set (it runs on this
+        background thread and must hand off to its own thread, as ChatGUI
+        does with a queue); otherwise they are printed.
         """
-        while self.is_connected:
+        # Bound to this connection: after a reconnect, a loop still
+        # unwinding from the old socket must not read from or reset the new one
+        sock, cipher = self.socket, self.encryption
+        while self.is_connected and self.socket is sock:
             try:
-                data = self.socket.recv(1024).decode('utf-8')
-                if data:
-                    decrypted_msg = self.encryption.decrypt(data)
-                    message_data = json.loads(decrypted_msg)
-                    print(f"{message_data['username']}: {message_data['message']}")
+                frame = recv_frame(sock)
+                if frame is None:
+                    break
+                payload = cipher.decrypt_bytes(frame)
+                if is_chunk(payload):
+                    self._receive_chunk(payload)
+                    continue
+                message_data = json.loads(payload.decode('utf-8'))
+                if 'acks' in message_data:
+                    self._handle_acks(message_data['acks'])
+                elif message_data.get('type') == 'error' and 'msg_id' in message_data:
+                    # Refused outright; a resend would only be refused again
+                    self._handle_acks([(message_data['msg_id'], None)])
+                if self._is_repeat_delivery(message_data):
+                    continue
+                if message_data.get('type') == 'ack':
+                    continue
+                if message_data.get('type') in TRANSFER_MESSAGES:
+                    self._handle_transfer(message_data)
+                    continue
+
+                if self.message_handler:
+                    self.message_handler(message_data)
+                else:
+                    for line in self.format_message(message_data):
+                        print(line)
+
+                if message_data.get('type') == 'reconnect':
+                    self._schedule_reconnect(message_data['delay'])
+                    break
             except Exception as e:
-                print(f"Receive error: {e}")
-                self.is_connected = False
+                if self.is_connected and self.socket is sock:
+                    print(f"Receive error: {e}")
                 break
+        if self.socket is sock:
+            self.is_connected = False
+
+    def _schedule_reconnect(self, delay):
+        """
+        Close this connection and log in again after the server's delay.
+        
+        The server picks a random delay per client, so a restart does not
+        bring every client back at the same moment. Unacknowledged
+        messages are resent once the new connection is up.
+        
+        Args:
+            delay (float): Seconds to wait before reconnecting
+        """
+        self.is_connected = False
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+
+        self._reconnect_timer = threading.Timer(delay, self.connect, args=self._credentials)
+        self._reconnect_timer.daemon = True
+        self._reconnect_timer.start()
 
     def disconnect(self):
         """
         Gracefully close the client socket connection.
         """
+        if self._reconnect_timer:
+            self._reconnect_timer.cancel()
+        self.is_connected = False
         if self.socket:
+            # close() alone does not wake a recv blocked in the receive
+            # thread, and the server sees no end-of-stream until it returns
+            try:
+                self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             self.socket.close()
-        self.is_connected = False
\ No newline at end of file
+        # A later connect() must not race the old loop for the socket
+        receive_thread = self._receive_thread
+        if receive_thread and receive_thread is not threading.current_thread():
+            receive_thread.join(timeout=1.0)
@@ -3,15 +3,33 @@ Graphical User Interface module for the chat application.
 Provides a tkinter-based interactive chat window.
 """
 
+import queue
+from collections import deque
 import tkinter as tk
 from tkinter import messagebox, simpledialog
-from client import ChatClient
+from client.client import ChatClient
+
+# Milliseconds between drains of the incoming message queue
+DRAIN_INTERVAL_MS = 50
+
+# Most messages rendered per drain; the rest wait for the next tick
+MAX_BATCH = 500
+
+# Messages kept in the chat display while the user follows the bottom
+MAX_MESSAGES = 2000
+
+# History messages requested per scroll to the top
+HISTORY_PAGE_SIZE = 50
 
 class ChatGUI:
     def __init__(self, client):
         """
         Initialize the chat GUI with a client instance.
         
+        Incoming messages arrive on the client's receive thread; they are
+        queued there and rendered from the Tk main loop in batches, since
+        tkinter widgets must only be touched from the thread running it.
+        
         Args:
             client (ChatClient): Connected chat client
         """
@@ -20,8 +38,11 @@ class ChatGUI:
         self.root.title("Distributed Chat Application")
         
         # Chat display area
-        self.chat_display = tk.Text(self.root, height=20, width=50)
+        self.chat_display = tk.Text(self.root, height=20, width=50, state=tk.DISABLED)
         self.chat_display.pack(padx=10, pady=10)
+        self.chat_display.bind('<MouseWheel>', self._on_scroll)
+        self.chat_display.bind('<Button-4>', self._on_scroll)
+        self.chat_display.bind('<KeyRelease-Prior>', self._on_scroll)
         
         # Message input area
         self.message_entry = tk.Entry(self.root, width=40)
@@ -34,6 +55,21 @@ class ChatGUI:
         # Username
         self.username = self.prompt_username()
 
+        # Filled by the receive thread, drained by the Tk main loop
+        self.incoming = queue.Queue()
+        self.client.message_handler = self.incoming.put
+
+        # (tag, room message ID) per displayed message, oldest first. The tag
+        # spans the message's text however many lines it takes; the ID (None
+        # for notices) tells trimming where history should resume
+        self.entries = deque()
+        self._next_tag = 0
+
+        # Lazy history state
+        self.oldest_id = None
+        self.history_exhausted = False
+        self.loading_history = False
+
     def prompt_username(self):
         """
         Prompt user to enter their username.
@@ -53,8 +89,132 @@ class ChatGUI:
             self.client.send_message(message, self.username)
             self.message_entry.delete(0, tk.END)
 
+    def _drain_incoming(self):
+        """
+        Render queued messages in one batch, then reschedule.
+        
+        Appending a whole batch with one insert keeps Tk from re-laying out
+        the widget per message, which is what froze the window before.
+        """
+        chunks = []
+        entries = []
+        for _ in range(MAX_BATCH):
+            try:
+                message_data = self.incoming.get_nowait()
+            except queue.Empty:
+                break
+            if message_data.get('type') == 'history':
+                self._prepend_history(message_data)
+            else:
+                rendered = ChatClient.format_message(message_data)
+                if not rendered:
+                    continue
+                room_id = message_data.get('id') if message_data.get('type') == 'message' else None
+                chunk, entry = self._entry(rendered, room_id)
+                chunks.extend(chunk)
+                entries.append(entry)
+
+        if chunks:
+            following = self.chat_display.yview()[1] >= 1.0
+            self.chat_display.configure(state=tk.NORMAL)
+            self.chat_display.insert(tk.END, *chunks)
+            self.entries.extend(entries)
+            self._trim(following)
+            self.chat_display.configure(state=tk.DISABLED)
+            if following:
+                self.chat_display.see(tk.END)
+
+        self.root.after(DRAIN_INTERVAL_MS, self._drain_incoming)
+
+    def _entry(self, lines, room_id):
+        """
+        Give one message's text a tag of its own, so it can be found and
+        removed whole however many lines it takes.
+        
+        Returns:
+            tuple: (text, tag) arguments for Text.insert, and the (tag, room_id) entry
+        """
+        tag = f'message-{self._next_tag}'
+        self._next_tag += 1
+        return ('\n'.join(lines) + '\n', tag), (tag, room_id)
+
+    def _trim(self, following):
+        """
+        Drop the oldest messages beyond MAX_MESSAGES.
+        
+        While the user reads scrolled-back history the buffer may grow to
+        twice the cap, so messages are not pulled out from under them.
+        """
+        limit = MAX_MESSAGES if following else 2 * MAX_MESSAGES
+        excess = len(self.entries) - limit
+        if excess <= 0:
+            return
+
+        removed = [self.entries.popleft() for _ in range(excess)]
+        self.chat_display.delete('1.0', f'{removed[-1][0]}.last')
+        for tag, _ in removed:
+            self.chat_display.tag_delete(tag)
+
+        # Trimmed messages can be loaded again from the server
+        self.history_exhausted = False
+        self.oldest_id = next(
+            (room_id for _, room_id in self.entries if room_id is not None),
+            self.oldest_id
+        )
+
+    def _prepend_history(self, message_data):
+        """
+        Insert a page of older messages above the current content.
+        """
+        self.loading_history = False
+        messages = message_data['messages']
+        if len(messages) < HISTORY_PAGE_SIZE:
+            self.history_exhausted = True
+        # Pages arrive newest first; keep what fits under the scrolled-back cap
+        messages = messages[:max(0, 2 * MAX_MESSAGES - len(self.entries))]
+        if not messages:
+            return
+
+        self.oldest_id = messages[-1]['id']
+        # The first page is requested once live messages can already be
+        # arriving, so it may overlap them
+        shown = {room_id for _, room_id in self.entries}
+        rows = [row for row in reversed(messages) if row['id'] not in shown]
+        if not rows:
+            return
+
+        chunks = []
+        entries = []
+        for row in rows:
+            chunk, entry = self._entry(ChatClient.format_message(dict(row, type='message')), row['id'])
+            chunks.extend(chunk)
+            entries.append(entry)
+        self.chat_display.configure(state=tk.NORMAL)
+        self.chat_display.insert('1.0', *chunks)
+        self.chat_display.configure(state=tk.DISABLED)
+        self.entries.extendleft(reversed(entries))
+
+        # Keep the message the user was looking at in view
+        self.chat_display.see(f'{entries[-1][0]}.last')
+
+    def _on_scroll(self, event=None):
+        """
+        Request older history once the user reaches the top.
+        """
+        if self.loading_history or self.history_exhausted:
+            return
+        # Trimming the newest instead would leave a gap before live messages
+        if len(self.entries) >= 2 * MAX_MESSAGES:
+            return
+        if self.chat_display.yview()[0] == 0.0:
+            self.loading_history = True
+            self.client.request_history(self.oldest_id, HISTORY_PAGE_SIZE)
+
     def run(self):
         """
         Start the GUI event loop.
         """
-        self.root.mainloop()
\ No newline at end of file
+        self.loading_history = True
+        self.client.request_history(limit=HISTORY_PAGE_SIZE)
+        self.root.after(DRAIN_INTERVAL_MS, self._drain_incoming)
+        self.root.mainloop()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Export and import chat history without loading it into memory.
+Streams messages between the configured database and archive files.
+
+Usage:
+    python manage_history.py export history.jsonl.gz [--room R] [--since T] [--until T] [--layout columns]
+    python manage_history.py import history.jsonl.gz [--batch-size N]
+"""
+
+import argparse
+import sys
+from server.archive import LAYOUTS, export_messages, import_messages
+from server.storage import create_storage
+from utils.config import get_config
+
+def report(count: int, seconds: float) -> None:
+    rate = count / seconds if seconds > 0 else 0.0
+    print(f"[*] {count:,} messages, {rate:,.0f}/s", file=sys.stderr, flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', help='database URL (default: DATABASE_URL)')
+    parser.add_argument('--batch-size', type=int, default=10000, help='rows per fetch or insert')
+    parser.add_argument('--report-every', type=int, default=100000, help='messages between progress lines')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = commands.add_parser('export', help='write messages to an archive')
+    export_parser.add_argument('path', help='output file, gzip-compressed if it ends in .gz')
+    export_parser.add_argument('--room', help='only this room (default: every message)')
+    export_parser.add_argument('--since', help="earliest timestamp, e.g. '2024-01-01' (UTC)")
+    export_parser.add_argument('--until', help='latest timestamp, exclusive')
+    export_parser.add_argument('--layout', choices=LAYOUTS, default='rows', help='one JSON line per message or per column chunk')
+
+    import_parser = commands.add_parser('import', help='insert messages from an archive')
+    import_parser.add_argument('path', help='archive written by export')
+
+    args = parser.parse_args()
+    config = get_config()
+    storage = create_storage(args.database or config.database.url, pool_size=config.database.max_connections)
+
+    try:
+        if args.command == 'export':
+            stats = export_messages(
+                storage,
+                args.path,
+                room=args.room,
+                since=args.since,
+                until=args.until,
+                layout=args.layout,
+                batch_size=args.batch_size,
+                progress=report,
+                report_every=args.report_every
+            )
+            action = 'Exported'
+        else:
+            stats = import_messages(
+                storage,
+                args.path,
+                batch_size=args.batch_size,
+                progress=report,
+                report_every=args.report_every
+            )
+            action = 'Imported'
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        storage.close()
+
+    print(
+        f"[*] {action} {stats.messages:,} messages in {stats.seconds:.1f}s ({stats.rate:,.0f}/s)",
+        file=sys.stderr
+    )
+
+if __name__ == '__main__':
+    main()
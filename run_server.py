@@ -5,21 +5,111 @@ This script initializes and starts the chat server application.
 """
 
 import os
-from dotenv import load_dotenv
+import signal
+import threading
+from server.authentication import AuthenticationManager
 from server.server import ChatServer
+from server.handoff import inherited_listen_fd, notify_ready, spawn_successor
+from server.rate_limiter import ServerRateLimits
+from server.storage import create_storage
+from utils.config import ConfigWatcher, add_reload_listener, get_config
+from security.ssl_config import SSLConfiguration, get_server_context
 
 def main():
-    # Load environment variables
-    load_dotenv()
+    # Loaded and validated once; reloaded on SIGHUP or when .env changes
+    config = get_config()
 
-    # Get server configuration from environment
-    host = os.getenv('SERVER_HOST', '127.0.0.1')
-    port = int(os.getenv('SERVER_PORT', 5000))
-    debug_mode = os.getenv('DEBUG_MODE', 'False').lower() == 'true'
+    # Optional TLS transport; certificates are generated once and reused
+    ssl_context = None
+    if config.security.ssl_enabled:
+        cert_path = config.security.ssl_cert_path
+        key_path = config.security.ssl_key_path
+        if not (os.path.exists(cert_path) and os.path.exists(key_path)):
+            cert_path, key_path = SSLConfiguration().generate_self_signed_cert()
+        ssl_context = get_server_context(cert_path, key_path)
+
+    # Messages, accounts and presence share the database DATABASE_URL names
+    storage = create_storage(config.database.url, pool_size=config.database.max_connections)
 
     # Initialize and start the chat server
-    chat_server = ChatServer(host=host, port=port, debug=debug_mode)
+    chat_server = ChatServer(
+        host=config.server.host,
+        port=config.server.port,
+        max_connections=config.rate_limit.max_connections,
+        debug=config.server.debug,
+        ssl_context=ssl_context,
+        cipher_backend=config.security.encryption_backend,
+        auth_manager=AuthenticationManager(storage=storage),
+        database_manager=storage,
+        rate_limits=ServerRateLimits.from_config(config.rate_limit),
+        mode=config.server.mode,
+        worker_pool_size=config.server.worker_pool_size,
+        handshake_timeout=config.server.handshake_timeout,
+        presence_push_interval=config.presence.push_interval,
+        presence_flush_interval=config.presence.flush_interval,
+        ack_flush_interval=config.delivery.ack_flush_interval,
+        dedup_window=config.delivery.dedup_window,
+        listen_fd=inherited_listen_fd(),
+        trace_sample_rate=config.tracing.sample_rate,
+        trace_buffer_size=config.tracing.buffer_size,
+        profile_dir=config.tracing.output_dir,
+        attachment_dir=config.attachments.dir,
+        max_attachment_size=config.attachments.max_size
+    )
+
+    # Log level, limits, intervals and pool size change without a restart
+    add_reload_listener(lambda old, new: chat_server.apply_config(new))
+    watcher = ConfigWatcher()
+    watcher.install_signal_handler()
+    watcher.start()
+
+    def drain():
+        current = get_config()
+        chat_server.drain(
+            reconnect_window=current.server.reconnect_window,
+            timeout=current.server.drain_timeout
+        )
+
+    def restart():
+        # The successor accepts on the same socket before we stop
+        try:
+            spawn_successor(chat_server.listen_socket)
+        except RuntimeError as e:
+            chat_server.logger.error(f"[!] Restart aborted: {e}")
+            return
+        drain()
+
+    def debug_snapshot():
+        # Dump sampled traces and, if configured, profile the next few seconds
+        tracing = get_config().tracing
+        os.makedirs(tracing.output_dir, exist_ok=True)
+        path = os.path.join(tracing.output_dir, f'traces_{os.getpid()}.jsonl')
+        count = chat_server.tracer.dump_to_file(path)
+        chat_server.logger.info(f"[*] Wrote {count} traces to {path}")
+        if tracing.profile_seconds > 0:
+            try:
+                chat_server.profiler.start(tracing.profile_seconds, tracing.profile_mode)
+            except RuntimeError as e:
+                chat_server.logger.warning(f"[!] {e}")
+
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(target=debug_snapshot).start())
+
+    # SIGTERM drains and exits; SIGUSR2 hands the socket to a new process first
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=drain).start())
+    if hasattr(signal, 'SIGUSR2'):
+        signal.signal(signal.SIGUSR2, lambda signum, frame: threading.Thread(target=restart).start())
+
+    def announce_ready():
+        # Tells a predecessor, if any, that it can start draining
+        chat_server.ready.wait()
+        notify_ready()
+
+    threading.Thread(target=announce_ready, daemon=True).start()
+
     chat_server.start()
+    watcher.stop()
+    storage.close()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -4,42 +4,112 @@ Implements AES encryption with secure key management.
 """
 
 import os
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from typing import Optional
 import base64
+from .cipher_backends import FernetBackend, create_backend
+
+KEY_SIZE = 32
 
 class SecureEncryption:
-    def __init__(self, salt: bytes = None, iterations: int = 100000):
+    def __init__(
+        self,
+        salt: bytes = None,
+        iterations: int = 100000,
+        key: Optional[bytes] = None,
+        passphrase: Optional[str] = None,
+        backend: str = FernetBackend.name
+    ):
         """
         Initialize encryption with configurable salt and iteration count.
         
         Args:
             salt (bytes, optional): Cryptographic salt
             iterations (int, optional): Key derivation iterations
+            key (bytes, optional): Raw 32-byte key, skips derivation
+            passphrase (str, optional): Secret to derive a shareable key from
+            backend (str, optional): Cipher backend, see cipher_backends
         """
         self.salt = salt or os.urandom(16)
         self.iterations = iterations
-        self.key = self._generate_key()
+        self.key = key or self._generate_key(passphrase)
+        self._backend = create_backend(backend, self.key)
+
+    @classmethod
+    def from_session_key(
+        cls,
+        session_key: bytes,
+        backend: str = FernetBackend.name
+    ) -> 'SecureEncryption':
+        """
+        Build an instance around a key agreed during the connection handshake.
+        
+        Args:
+            session_key (bytes): Raw 32-byte key from KeyExchange
+            backend (str, optional): Cipher backend announced by the server
+        
+        Returns:
+            SecureEncryption: Instance sharing the key with the peer
+        """
+        return cls(key=session_key, backend=backend)
+
+    @property
+    def backend_name(self) -> str:
+        return self._backend.name
 
-    def _generate_key(self) -> bytes:
+    def _generate_key(self, passphrase: Optional[str] = None) -> bytes:
         """
-        Generate a secure encryption key using PBKDF2.
+        Generate a secure encryption key.
+        
+        PBKDF2 is only worth its cost when stretching a passphrase; a
+        random key needs no derivation at all.
+        
+        Args:
+            passphrase (str, optional): Secret to derive the key from
         
         Returns:
-            bytes: Derived encryption key
+            bytes: Raw encryption key
         """
+        if passphrase is None:
+            return os.urandom(KEY_SIZE)
+
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
-            length=32,
+            length=KEY_SIZE,
             salt=self.salt,
             iterations=self.iterations
         )
-        return base64.urlsafe_b64encode(kdf.derive(os.urandom(32)))
+        return kdf.derive(passphrase.encode('utf-8'))
+
+    def encrypt_bytes(self, data: bytes) -> bytes:
+        """
+        Encrypt raw bytes with the configured backend.
+        
+        Args:
+            data (bytes): Plain-text payload
+        
+        Returns:
+            bytes: Backend ciphertext, suitable for a binary frame
+        """
+        return self._backend.encrypt(data)
+
+    def decrypt_bytes(self, data: bytes) -> bytes:
+        """
+        Decrypt raw bytes produced by encrypt_bytes.
+        
+        Args:
+            data (bytes): Backend ciphertext
+        
+        Returns:
+            bytes: Plain-text payload
+        """
+        return self._backend.decrypt(data)
 
     def encrypt(self, message: str) -> str:
         """
-        Encrypt a message using Fernet symmetric encryption.
+        Encrypt a message using the configured backend.
         
         Args:
             message (str): Plain-text message
@@ -47,12 +117,15 @@ class SecureEncryption:
         Returns:
             str: Base64 encoded encrypted message
         """
-        f = Fernet(self.key)
-        return f.encrypt(message.encode()).decode()
+        token = self._backend.encrypt(message.encode())
+        if self._backend.name == FernetBackend.name:
+            # Fernet tokens are already base64
+            return token.decode()
+        return base64.urlsafe_b64encode(token).decode()
 
     def decrypt(self, encrypted_message: str) -> str:
         """
-        Decrypt a Fernet encrypted message.
+        Decrypt a message produced by encrypt.
         
         Args:
             encrypted_message (str): Base64 encoded encrypted message
@@ -60,5 +133,7 @@ class SecureEncryption:
         Returns:
             str: Decrypted plain-text message
         """
-        f = Fernet(self.key)
-        return f.decrypt(encrypted_message.encode()).decode()
\ No newline at end of file
+        token = encrypted_message.encode()
+        if self._backend.name != FernetBackend.name:
+            token = base64.urlsafe_b64decode(token)
+        return self._backend.decrypt(token).decode()
@@ -0,0 +1,136 @@
+"""
+Session key agreement module for secure communication.
+Implements an ephemeral X25519 exchange with HKDF key derivation.
+
+The exchange is not authenticated: it defeats passive eavesdropping, but
+an attacker who can intercept the connection can answer each side with
+its own key and read everything, passwords included. Clients therefore
+log in only over TLS, which authenticates the server, or to a loopback
+address, unless explicitly allowed to take that risk.
+"""
+
+import base64
+import ipaddress
+import json
+from typing import Optional, Tuple
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric.x25519 import (
+    X25519PrivateKey,
+    X25519PublicKey
+)
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+SESSION_KEY_INFO = b'multichat session key v1'
+SESSION_KEY_LENGTH = 32
+
+def is_loopback(host: str) -> bool:
+    """
+    Whether host names this machine, so no one can sit between client and server.
+
+    Args:
+        host (str): Server hostname or IP address
+
+    Returns:
+        bool: True for 'localhost' and loopback addresses
+    """
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def check_login_transport(host: str, tls: bool, allow_plaintext: bool) -> None:
+    """
+    Refuse to send credentials where the key exchange could be intercepted.
+
+    Args:
+        host (str): Server hostname or IP address
+        tls (bool): Whether the connection uses TLS
+        allow_plaintext (bool): Accept an unauthenticated exchange anyway
+
+    Raises:
+        ValueError: If the login would cross the network without TLS
+    """
+    if tls or allow_plaintext or is_loopback(host):
+        return
+    raise ValueError(
+        f"Refusing to log in to {host} without TLS: the key exchange is not "
+        "authenticated, so the password could be intercepted. Pass an "
+        "ssl_context, or allow_plaintext=True on a trusted network"
+    )
+
+class KeyExchange:
+    def __init__(self):
+        """
+        Generate an ephemeral X25519 key pair for one connection.
+        """
+        self._private_key = X25519PrivateKey.generate()
+        self.public_bytes = self._private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw
+        )
+
+    def hello_frame(self, cipher: Optional[str] = None) -> bytes:
+        """
+        Build the handshake frame announcing this side's public key.
+
+        Args:
+            cipher (str, optional): Cipher backend the server selected
+
+        Returns:
+            bytes: JSON-encoded handshake payload
+        """
+        hello = {
+            'type': 'key_exchange',
+            'public_key': base64.b64encode(self.public_bytes).decode('ascii')
+        }
+        if cipher:
+            hello['cipher'] = cipher
+        return json.dumps(hello).encode('utf-8')
+
+    @staticmethod
+    def parse_hello(frame: bytes) -> Tuple[bytes, Optional[str]]:
+        """
+        Extract the peer's public key and cipher choice from a handshake frame.
+
+        Args:
+            frame (bytes): Handshake payload received from the peer
+
+        Returns:
+            Tuple of (raw public key, cipher backend name or None)
+        """
+        hello = json.loads(frame.decode('utf-8'))
+        if hello.get('type') != 'key_exchange':
+            raise ValueError("Expected a key_exchange handshake frame")
+        return base64.b64decode(hello['public_key']), hello.get('cipher')
+
+    def derive_session_key(self, peer_public_bytes: bytes, is_server: bool) -> bytes:
+        """
+        Derive the shared per-connection key.
+
+        Both public keys are mixed into the HKDF salt in a fixed
+        server-then-client order, so each side derives the same key and
+        the key is bound to this particular exchange.
+
+        Args:
+            peer_public_bytes (bytes): Peer's raw 32-byte public key
+            is_server (bool): Whether this side is the server
+
+        Returns:
+            bytes: Raw session key
+        """
+        shared_secret = self._private_key.exchange(
+            X25519PublicKey.from_public_bytes(peer_public_bytes)
+        )
+        if is_server:
+            transcript = self.public_bytes + peer_public_bytes
+        else:
+            transcript = peer_public_bytes + self.public_bytes
+
+        return HKDF(
+            algorithm=hashes.SHA256(),
+            length=SESSION_KEY_LENGTH,
+            salt=transcript,
+            info=SESSION_KEY_INFO
+        ).derive(shared_secret)
@@ -5,19 +5,29 @@ Manages SSL certificate generation and configuration.
 
 import os
 import ssl
-from cryptography import x509
-from cryptography.x509.oid import NameOID
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.hazmat.primitives import serialization
-from datetime import datetime, timedelta
+import threading
+from typing import Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+
+# cryptography's x509 and key modules are imported where certificates are
+# handled; most processes only wrap sockets and never need them
+
+# Regenerate cached certificates this long before they actually expire
+RENEWAL_MARGIN = timedelta(days=7)
+
+# One server and one client context per process, keyed by their inputs
+_context_lock = threading.Lock()
+_server_contexts: Dict[Tuple[str, str], ssl.SSLContext] = {}
+_client_contexts: Dict[Tuple[Optional[str], bool], ssl.SSLContext] = {}
+
 
 class SSLConfiguration:
     def __init__(
         self,
         common_name: str = 'localhost',
         days_valid: int = 365,
-        output_dir: str = 'ssl_certs'
+        output_dir: str = 'ssl_certs',
+        key_type: str = 'ec'
     ):
         """
         Configure SSL/TLS certificate settings.
@@ -26,35 +36,110 @@ class SSLConfiguration:
             common_name (str): Certificate domain/hostname
             days_valid (int): Certificate validity period
             output_dir (str): Directory to store generated certificates
+            key_type (str): Private key algorithm, 'ec' (P-256) or 'rsa'
         """
+        if key_type not in ('ec', 'rsa'):
+            raise ValueError(f"Unsupported key type: {key_type}")
+
         self.common_name = common_name
         self.days_valid = days_valid
         self.output_dir = output_dir
-        
+        self.key_type = key_type
+
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
 
-    def generate_self_signed_cert(self):
+    @property
+    def cert_path(self) -> str:
+        return os.path.join(self.output_dir, f'{self.common_name}_certificate.pem')
+
+    @property
+    def key_path(self) -> str:
+        return os.path.join(self.output_dir, f'{self.common_name}_private_key.pem')
+
+    def _generate_private_key(self):
+        """
+        Generate a private key of the configured type.
+
+        ECDSA P-256 keys are generated in well under a millisecond, while
+        2048-bit RSA keys take tens to hundreds of milliseconds.
+        """
+        from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+        if self.key_type == 'ec':
+            return ec.generate_private_key(ec.SECP256R1())
+        return rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=2048
+        )
+
+    def _cached_cert_is_valid(self) -> bool:
+        """
+        Check whether a previously generated certificate can be reused.
+
+        Returns:
+            bool: True if the cached certificate and key exist, match the
+            configured common name and key type, and are not about to expire
+        """
+        if not (os.path.exists(self.cert_path) and os.path.exists(self.key_path)):
+            return False
+
+        from cryptography import x509
+        from cryptography.hazmat.primitives.asymmetric import ec, rsa
+        from cryptography.x509.oid import NameOID
+
+        try:
+            with open(self.cert_path, 'rb') as f:
+                cert = x509.load_pem_x509_certificate(f.read())
+        except (OSError, ValueError):
+            return False
+
+        names = cert.subject.get_attributes_for_oid(NameOID.COMMON_NAME)
+        if not names or names[0].value != self.common_name:
+            return False
+
+        expected_key = ec.EllipticCurvePublicKey if self.key_type == 'ec' else rsa.RSAPublicKey
+        if not isinstance(cert.public_key(), expected_key):
+            return False
+
+        # not_valid_after_utc replaces the naive attribute in newer cryptography
+        not_after = getattr(cert, 'not_valid_after_utc', None)
+        if not_after is None:
+            not_after = cert.not_valid_after.replace(tzinfo=timezone.utc)
+        return not_after > datetime.now(timezone.utc) + RENEWAL_MARGIN
+
+    def generate_self_signed_cert(self, force: bool = False):
         """
         Generate a self-signed SSL certificate.
 
+        A valid certificate left in ``output_dir`` by an earlier call is
+        reused, so server startup does not pay for key generation.
+
+        Args:
+            force (bool): Regenerate even if a valid cached certificate exists
+
         Returns:
             Tuple of (certificate_path, key_path)
         """
+        cert_path, key_path = self.cert_path, self.key_path
+        if not force and self._cached_cert_is_valid():
+            return cert_path, key_path
+
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.x509.oid import NameOID
+
         # Generate private key
-        private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048
-        )
+        private_key = self._generate_private_key()
 
         # Write private key to file
-        key_path = os.path.join(self.output_dir, f'{self.common_name}_private_key.pem')
         with open(key_path, 'wb') as f:
             f.write(private_key.private_bytes(
                 encoding=serialization.Encoding.PEM,
-                format=serialization.PrivateFormat.TraditionalOpenSSL,
+                format=serialization.PrivateFormat.PKCS8,
                 encryption_algorithm=serialization.NoEncryption()
             ))
+        os.chmod(key_path, 0o600)
 
         # Generate certificate
         subject = issuer = x509.Name([
@@ -77,10 +162,12 @@ class SSLConfiguration:
             datetime.utcnow()
         ).not_valid_after(
             datetime.utcnow() + timedelta(days=self.days_valid)
+        ).add_extension(
+            x509.SubjectAlternativeName([x509.DNSName(self.common_name)]),
+            critical=False
         ).sign(private_key, hashes.SHA256())
 
         # Write certificate to file
-        cert_path = os.path.join(self.output_dir, f'{self.common_name}_certificate.pem')
         with open(cert_path, 'wb') as f:
             f.write(cert.public_bytes(serialization.Encoding.PEM))
 
@@ -97,6 +184,120 @@ class SSLConfiguration:
         Returns:
             ssl.SSLContext: Configured SSL context
         """
-        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-        context.load_cert_chain(certfile=cert_path, keyfile=key_path)
-        return context
\ No newline at end of file
+        return _build_server_context(cert_path, key_path)
+
+
+def _build_server_context(cert_path: str, key_path: str) -> ssl.SSLContext:
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.load_cert_chain(certfile=cert_path, keyfile=key_path)
+
+    # Session tickets let reconnecting clients skip the full handshake
+    context.options &= ~ssl.OP_NO_TICKET
+    context.num_tickets = 2
+    return context
+
+
+def get_server_context(cert_path: str, key_path: str) -> ssl.SSLContext:
+    """
+    Return the process-wide server SSL context for a certificate/key pair.
+
+    Sharing one context keeps the session ticket keys and session cache in
+    one place, which is what makes resumption work across connections.
+
+    Args:
+        cert_path (str): Path to SSL certificate
+        key_path (str): Path to private key
+
+    Returns:
+        ssl.SSLContext: Shared server context
+    """
+    key = (os.path.abspath(cert_path), os.path.abspath(key_path))
+    with _context_lock:
+        context = _server_contexts.get(key)
+        if context is None:
+            context = _build_server_context(cert_path, key_path)
+            _server_contexts[key] = context
+        return context
+
+
+def get_client_context(cafile: Optional[str] = None, verify: bool = True) -> ssl.SSLContext:
+    """
+    Return the process-wide client SSL context.
+
+    Args:
+        cafile (str, optional): Certificate to trust, e.g. a self-signed server cert
+        verify (bool): Verify the server certificate and hostname
+
+    Returns:
+        ssl.SSLContext: Shared client context
+    """
+    key = (os.path.abspath(cafile) if cafile else None, verify)
+    with _context_lock:
+        context = _client_contexts.get(key)
+        if context is None:
+            context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH, cafile=cafile)
+            context.minimum_version = ssl.TLSVersion.TLSv1_2
+            if not verify:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            _client_contexts[key] = context
+        return context
+
+
+class TLSSessionCache:
+    def __init__(self):
+        """
+        Remember the last TLS session per server so reconnects can resume it.
+        """
+        self._lock = threading.Lock()
+        self._sessions: Dict[Tuple[str, int], ssl.SSLSession] = {}
+
+    def get(self, host: str, port: int) -> Optional[ssl.SSLSession]:
+        with self._lock:
+            return self._sessions.get((host, port))
+
+    def store(self, host: str, port: int, ssl_socket: ssl.SSLSocket) -> None:
+        """
+        Store the session of an established connection.
+
+        With TLS 1.3 the ticket arrives after the handshake, so call this
+        once the first application data has been read.
+        """
+        session = ssl_socket.session
+        if session is not None:
+            with self._lock:
+                self._sessions[(host, port)] = session
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+
+# Shared by every client in the process
+session_cache = TLSSessionCache()
+
+
+def wrap_client_socket(
+    sock,
+    host: str,
+    port: int,
+    context: ssl.SSLContext
+) -> ssl.SSLSocket:
+    """
+    Wrap a connected client socket, resuming a cached session if one exists.
+
+    Args:
+        sock (socket): Connected TCP socket
+        host (str): Server hostname, used for SNI and verification
+        port (int): Server port, used as part of the session cache key
+        context (ssl.SSLContext): Client context
+
+    Returns:
+        ssl.SSLSocket: Wrapped socket with the handshake completed
+    """
+    return context.wrap_socket(
+        sock,
+        server_hostname=host,
+        session=session_cache.get(host, port)
+    )
@@ -0,0 +1,210 @@
+"""
+Message archive export and import for the distributed chat application.
+Streams messages between a storage backend and compressed archive files.
+"""
+
+import gzip
+import json
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .storage import StorageBackend
+
+ARCHIVE_FORMAT = 'chat-archive'
+ARCHIVE_VERSION = 1
+LAYOUTS = ('rows', 'columns')
+
+# Message fields written to archives, in column order
+COLUMNS = ('id', 'sender', 'content', 'timestamp', 'room', 'recipient', 'conversation', 'delivered')
+
+# Called with (messages so far, seconds elapsed)
+ProgressCallback = Callable[[int, float], None]
+
+@dataclass
+class ArchiveStats:
+    messages: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.messages / self.seconds if self.seconds > 0 else 0.0
+
+def _open(path: str, mode: str):
+    """
+    Open an archive as text, gzip-compressed when the name ends in .gz.
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=6)
+    return open(path, mode, encoding='utf-8')
+
+def _counted(
+    messages: Iterable[Dict],
+    progress: Optional[ProgressCallback],
+    report_every: int,
+    start: float
+) -> Iterator[Dict]:
+    count = 0
+    for message in messages:
+        yield message
+        count += 1
+        if progress and count % report_every == 0:
+            progress(count, time.perf_counter() - start)
+
+def write_archive(
+    messages: Iterable[Dict],
+    path: str,
+    layout: str = 'rows',
+    chunk_size: int = 10000
+) -> int:
+    """
+    Write messages to an archive file.
+
+    The 'rows' layout writes one JSON object per message. The 'columns'
+    layout writes chunks of chunk_size messages as one list per field,
+    which drops the repeated keys and groups similar values together,
+    so it compresses noticeably better. Either way at most one chunk
+    is held in memory.
+
+    Args:
+        messages (Iterable): Message dictionaries, e.g. from iter_messages
+        path (str): Output file; compressed with gzip if it ends in .gz
+        layout (str): 'rows' or 'columns'
+        chunk_size (int): Messages per chunk in the 'columns' layout
+
+    Returns:
+        int: Number of messages written
+
+    Raises:
+        ValueError: For an unknown layout
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown archive layout: {layout}")
+
+    count = 0
+    with _open(path, 'w') as f:
+        header = {'format': ARCHIVE_FORMAT, 'version': ARCHIVE_VERSION, 'layout': layout}
+        f.write(json.dumps(header) + '\n')
+
+        if layout == 'rows':
+            for message in messages:
+                f.write(json.dumps({column: message.get(column) for column in COLUMNS}) + '\n')
+                count += 1
+            return count
+
+        def write_chunk(chunk: List[Dict]) -> None:
+            f.write(json.dumps({column: [m.get(column) for m in chunk] for column in COLUMNS}) + '\n')
+
+        chunk: List[Dict] = []
+        for message in messages:
+            chunk.append(message)
+            if len(chunk) >= chunk_size:
+                write_chunk(chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            write_chunk(chunk)
+            count += len(chunk)
+    return count
+
+def read_archive(path: str) -> Iterator[Dict]:
+    """
+    Stream messages back out of an archive file, in the order written.
+
+    Args:
+        path (str): Archive written by write_archive
+
+    Yields:
+        Message dictionaries
+
+    Raises:
+        ValueError: If the file is not a supported archive
+    """
+    with _open(path, 'r') as f:
+        try:
+            header = json.loads(f.readline())
+        except json.JSONDecodeError:
+            header = None
+        if (
+            not isinstance(header, dict)
+            or header.get('format') != ARCHIVE_FORMAT
+            or header.get('version') != ARCHIVE_VERSION
+            or header.get('layout') not in LAYOUTS
+        ):
+            raise ValueError(f"{path} is not a chat archive")
+
+        for line in f:
+            record = json.loads(line)
+            if header['layout'] == 'rows':
+                yield record
+                continue
+            columns = [record[column] for column in COLUMNS]
+            for values in zip(*columns):
+                yield dict(zip(COLUMNS, values))
+
+def export_messages(
+    storage: StorageBackend,
+    path: str,
+    room: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    layout: str = 'rows',
+    batch_size: int = 10000,
+    progress: Optional[ProgressCallback] = None,
+    report_every: int = 100000
+) -> ArchiveStats:
+    """
+    Stream messages from storage into an archive file in constant memory.
+
+    Args:
+        storage (StorageBackend): Backend to read
+        path (str): Output file; compressed with gzip if it ends in .gz
+        room (str, optional): Room to export, or None for every message
+        since (str, optional): Earliest timestamp, inclusive
+        until (str, optional): Latest timestamp, exclusive
+        layout (str): 'rows' or 'columns'
+        batch_size (int): Rows fetched per round trip, and messages per column chunk
+        progress (callable, optional): Called every report_every messages
+        report_every (int): Messages between progress calls
+
+    Returns:
+        ArchiveStats: Messages written and time taken
+    """
+    start = time.perf_counter()
+    messages = storage.iter_messages(room, batch_size=batch_size, since=since, until=until)
+    count = write_archive(
+        _counted(messages, progress, report_every, start),
+        path,
+        layout=layout,
+        chunk_size=batch_size
+    )
+    return ArchiveStats(count, time.perf_counter() - start)
+
+def import_messages(
+    storage: StorageBackend,
+    path: str,
+    batch_size: int = 10000,
+    progress: Optional[ProgressCallback] = None,
+    report_every: int = 100000
+) -> ArchiveStats:
+    """
+    Stream an archive file into storage with batched inserts.
+
+    Imported messages get new IDs; timestamps and delivery state are kept.
+
+    Args:
+        storage (StorageBackend): Backend to write
+        path (str): Archive written by export_messages
+        batch_size (int): Messages per insert transaction
+        progress (callable, optional): Called every report_every messages
+        report_every (int): Messages between progress calls
+
+    Returns:
+        ArchiveStats: Messages inserted and time taken
+    """
+    start = time.perf_counter()
+    count = storage.import_messages(
+        _counted(read_archive(path), progress, report_every, start),
+        batch_size=batch_size
+    )
+    return ArchiveStats(count, time.perf_counter() - start)
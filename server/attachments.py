@@ -0,0 +1,169 @@
+"""
+Attachment storage for the distributed chat server.
+Keeps uploaded files on disk under their SHA-256, so identical files are stored once.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from typing import BinaryIO, Iterator
+
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+class Upload:
+    __slots__ = ('name', 'size', 'sha256', 'received', 'path', '_file', '_hash')
+
+    def __init__(self, directory: str, name: str, size: int, sha256: str):
+        """
+        An upload in progress, written to a temporary file as chunks arrive.
+
+        With no directory, the content is already stored and the upload
+        is complete as soon as it starts.
+
+        Args:
+            directory (str): Directory for the temporary file, or None
+            name (str): File name shown to other users
+            size (int): Announced size in bytes
+            sha256 (str): Announced SHA-256, checked when the upload ends
+        """
+        self.name = name
+        self.size = size
+        self.sha256 = sha256
+        if directory is None:
+            self.received, self.path, self._file, self._hash = size, None, None, None
+            return
+        self.received = 0
+        fd, self.path = tempfile.mkstemp(dir=directory, suffix='.part')
+        self._file = os.fdopen(fd, 'wb')
+        self._hash = hashlib.sha256()
+
+    @property
+    def stored(self) -> bool:
+        """
+        Whether the content was already in the store, so no data is needed.
+        """
+        return self._file is None
+
+    def write(self, data: bytes) -> None:
+        """
+        Append a chunk.
+
+        Raises:
+            ValueError: If the chunk goes past the announced size
+        """
+        if self.stored or self.received + len(data) > self.size:
+            raise ValueError("Upload is larger than announced")
+        self._file.write(data)
+        self._hash.update(data)
+        self.received += len(data)
+
+    def abort(self) -> None:
+        if self.stored:
+            return
+        self._file.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+class AttachmentStore:
+    def __init__(self, root: str = 'attachments', max_size: int = 50 * 1024 * 1024):
+        """
+        Store attachments by content hash.
+
+        A file lives at root/ab/cdef... for its SHA-256 ab cdef..., so the
+        same file sent to several rooms, or by several users, is kept
+        once and an upload of known content can be skipped entirely.
+        Uploads stream into a temporary file in root/tmp and are moved
+        into place only once their size and hash check out.
+
+        Args:
+            root (str): Storage directory
+            max_size (int): Largest accepted attachment in bytes
+        """
+        self.root = root
+        self.max_size = max_size
+        self._tmp = os.path.join(root, 'tmp')
+        os.makedirs(self._tmp, exist_ok=True)
+
+    def path_for(self, sha256: str) -> str:
+        """
+        Return where a digest's content is stored.
+
+        Raises:
+            ValueError: If the digest is not 64 lowercase hex characters
+        """
+        if not isinstance(sha256, str) or not DIGEST_PATTERN.match(sha256):
+            raise ValueError("Invalid attachment digest")
+        return os.path.join(self.root, sha256[:2], sha256[2:])
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.exists(self.path_for(sha256))
+
+    def size_of(self, sha256: str) -> int:
+        return os.path.getsize(self.path_for(sha256))
+
+    def begin(self, name: str, size: int, sha256: str) -> Upload:
+        """
+        Start receiving an attachment.
+
+        If the content is already stored, the returned upload is complete
+        and the client can skip sending it.
+
+        Args:
+            name (str): File name shown to other users
+            size (int): Size in bytes
+            sha256 (str): Expected SHA-256 of the content
+
+        Returns:
+            Upload: Target for the upload's chunks
+
+        Raises:
+            ValueError: For a bad digest or a size over max_size
+        """
+        self.path_for(sha256)
+        if not isinstance(size, int) or size < 0 or size > self.max_size:
+            raise ValueError(f"Attachments must be at most {self.max_size} bytes")
+        if self.exists(sha256) and self.size_of(sha256) == size:
+            return Upload(None, name, size, sha256)
+        return Upload(self._tmp, name, size, sha256)
+
+    def commit(self, upload: Upload) -> str:
+        """
+        Verify a finished upload and move it into the store.
+
+        Returns:
+            str: SHA-256 of the stored content
+
+        Raises:
+            ValueError: If the size or hash does not match the announcement
+        """
+        if upload.stored:
+            return upload.sha256
+        upload._file.close()
+        digest = upload._hash.hexdigest()
+        if upload.received != upload.size or digest != upload.sha256:
+            upload.abort()
+            raise ValueError("Upload does not match its announced size and hash")
+
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            # Same content arrived meanwhile; keep the copy already stored
+            os.unlink(upload.path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(upload.path, path)
+        return digest
+
+    def open(self, sha256: str) -> BinaryIO:
+        return open(self.path_for(sha256), 'rb')
+
+    def iter_chunks(self, sha256: str, chunk_size: int) -> Iterator[bytes]:
+        """
+        Read stored content chunk by chunk.
+        """
+        with self.open(sha256) as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
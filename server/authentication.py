@@ -6,35 +6,27 @@ Handles user registration, login, and credential verification.
 import hashlib
 import os
 from typing import Dict, Optional
-import sqlite3
-from security.encryption import SecureEncryption
+from .storage import StorageBackend
 
 class AuthenticationManager:
-    def __init__(self, database_path: str = 'users.db'):
+    def __init__(
+        self,
+        database_path: str = 'users.db',
+        storage: Optional[StorageBackend] = None
+    ):
         """
         Initialize authentication manager with database connection.
         
         Args:
-            database_path (str): Path to SQLite user database
+            database_path (str): Path to SQLite user database, if no storage is given
+            storage (StorageBackend, optional): Shared backend, e.g. the
+                server's, so accounts and messages live in one database
         """
         self.database_path = database_path
-        self.encryption = SecureEncryption()
-        self._create_users_table()
-
-    def _create_users_table(self):
-        """
-        Create users table if it doesn't exist in the database.
-        """
-        with sqlite3.connect(self.database_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    username TEXT PRIMARY KEY,
-                    password_hash TEXT,
-                    salt TEXT
-                )
-            ''')
-            conn.commit()
+        if storage is None:
+            from .database import DatabaseManager
+            storage = DatabaseManager(database_path)
+        self.storage = storage
 
     def _hash_password(self, password: str, salt: str = None) -> Dict[str, str]:
         """
@@ -74,20 +66,13 @@ class AuthenticationManager:
         Returns:
             bool: Registration success status
         """
-        try:
-            hashed_data = self._hash_password(password)
-            
-            with sqlite3.connect(self.database_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    'INSERT INTO users (username, password_hash, salt) VALUES (?, ?, ?)',
-                    (username, hashed_data['password_hash'], hashed_data['salt'])
-                )
-                conn.commit()
-            
-            return True
-        except sqlite3.IntegrityError:
-            return False  # Username already exists
+        hashed_data = self._hash_password(password)
+        # False if the username already exists
+        return self.storage.create_user(
+            username,
+            hashed_data['password_hash'],
+            hashed_data['salt']
+        )
 
     def authenticate_user(self, username: str, password: str) -> bool:
         """
@@ -100,18 +85,23 @@ class AuthenticationManager:
         Returns:
             bool: Authentication success status
         """
-        with sqlite3.connect(self.database_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                'SELECT password_hash, salt FROM users WHERE username = ?', 
-                (username,)
-            )
-            result = cursor.fetchone()
-            
-            if result:
-                stored_hash, salt = result
-                # Verify password
-                verification = self._hash_password(password, salt)
-                return verification['password_hash'] == stored_hash
-            
-            return False
\ No newline at end of file
+        result = self.storage.get_credentials(username)
+        if result:
+            stored_hash, salt = result
+            # Verify password
+            verification = self._hash_password(password, salt)
+            return verification['password_hash'] == stored_hash
+        
+        return False
+
+    def user_exists(self, username: str) -> bool:
+        """
+        Check whether an account exists.
+        
+        Args:
+            username (str): Username to look up
+        
+        Returns:
+            bool: True if the user is registered
+        """
+        return self.storage.user_exists(username)
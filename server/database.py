@@ -3,49 +3,192 @@ Database management module for the distributed chat application.
 Handles message storage, retrieval, and database operations.
 """
 
+import os
 import sqlite3
-from datetime import datetime
-from typing import List, Dict, Optional
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .storage import StorageBackend
 
-class DatabaseManager:
-    def __init__(self, database_path: str = 'chat_database.db'):
+# Stored in PRAGMA user_version once the schema below is in place;
+# bump it whenever tables, columns or indexes change
+SCHEMA_VERSION = 2
+
+# First version that keeps accounts in this database instead of users.db
+SHARED_ACCOUNTS_VERSION = 2
+
+# Where versions before SHARED_ACCOUNTS_VERSION kept accounts
+LEGACY_USERS_PATH = 'users.db'
+
+class DatabaseManager(StorageBackend):
+    def __init__(
+        self,
+        database_path: str = 'chat_database.db',
+        legacy_users_path: Optional[str] = LEGACY_USERS_PATH
+    ):
         """
         Initialize database manager with connection setup.
         
+        This is the SQLite storage backend, selected by sqlite:/// URLs.
+        
         Args:
             database_path (str): Path to SQLite chat database
+            legacy_users_path (str, optional): Accounts database of older
+                versions, imported once when this database is upgraded
         """
         self.database_path = database_path
+        self.legacy_users_path = legacy_users_path
         self._create_tables()
 
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Open a connection that commits on success and is always closed.
+        
+        sqlite3's own context manager only commits; the file stays open
+        until the connection is garbage collected, which under load
+        leaves dozens of handles behind.
+        """
+        conn = sqlite3.connect(self.database_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
     def _create_tables(self):
         """
         Create necessary tables for chat application.
+        
+        A database already marked with SCHEMA_VERSION is left alone, so
+        restarts skip the table, column and index checks.
         """
-        with sqlite3.connect(self.database_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
+            cursor.execute('PRAGMA user_version')
+            version = cursor.fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                return
             
-            # Messages table
+            # Messages table; recipient is NULL for room messages
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS messages (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     sender TEXT,
                     content TEXT,
                     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    room TEXT
+                    room TEXT,
+                    recipient TEXT,
+                    conversation TEXT,
+                    delivered INTEGER DEFAULT 1
                 )
             ''')
+            self._add_missing_columns(cursor)
+
+            # One conversation's history, newest first, without a table scan
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_messages_conversation
+                ON messages (conversation, id)
+            ''')
+
+            # Paging back through a room's history by ID
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_messages_room
+                ON messages (room, id)
+            ''')
+
+            # Only pending direct messages are indexed for offline delivery
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_messages_undelivered
+                ON messages (recipient, id) WHERE delivered = 0
+            ''')
             
-            # Users table (if not created by AuthenticationManager)
+            # Accounts and presence share one users table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS users (
                     username TEXT PRIMARY KEY,
+                    password_hash TEXT,
+                    salt TEXT,
                     last_seen DATETIME
                 )
             ''')
+            self._add_missing_user_columns(cursor)
+            if version < SHARED_ACCOUNTS_VERSION:
+                self._import_legacy_accounts(cursor)
             
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
             conn.commit()
 
+    def _add_missing_columns(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Add direct message columns to a messages table created by an older version.
+        
+        Args:
+            cursor (sqlite3.Cursor): Cursor inside the schema transaction
+        """
+        cursor.execute('PRAGMA table_info(messages)')
+        existing = {row[1] for row in cursor.fetchall()}
+        columns = {
+            'recipient': 'TEXT',
+            'conversation': 'TEXT',
+            'delivered': 'INTEGER DEFAULT 1'
+        }
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE messages ADD COLUMN {name} {definition}')
+
+    def _add_missing_user_columns(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Add account columns to a users table older versions only kept last-seen times in.
+        
+        Args:
+            cursor (sqlite3.Cursor): Cursor inside the schema transaction
+        """
+        cursor.execute('PRAGMA table_info(users)')
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, definition in (
+            ('password_hash', 'TEXT'),
+            ('salt', 'TEXT'),
+            ('last_seen', 'DATETIME')
+        ):
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE users ADD COLUMN {name} {definition}')
+
+    def _import_legacy_accounts(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Copy accounts from the separate users.db older versions used.
+        
+        Runs once, while the schema is upgraded past SHARED_ACCOUNTS_VERSION.
+        An account already in this database keeps its password.
+        
+        Args:
+            cursor (sqlite3.Cursor): Cursor inside the schema transaction
+        """
+        legacy_path = self.legacy_users_path
+        if not legacy_path or not os.path.isfile(legacy_path):
+            return
+        if os.path.isfile(self.database_path) and os.path.samefile(legacy_path, self.database_path):
+            return  # Already the accounts database
+
+        cursor.execute('ATTACH DATABASE ? AS legacy', (legacy_path,))
+        try:
+            cursor.execute(
+                "SELECT 1 FROM legacy.sqlite_master WHERE type = 'table' AND name = 'users'"
+            )
+            if cursor.fetchone() is None:
+                return
+            # WHERE true lets SQLite parse the upsert after a SELECT
+            cursor.execute('''
+                INSERT INTO users (username, password_hash, salt)
+                SELECT username, password_hash, salt FROM legacy.users
+                WHERE password_hash IS NOT NULL
+                ON CONFLICT (username) DO UPDATE
+                SET password_hash = excluded.password_hash, salt = excluded.salt
+                WHERE users.password_hash IS NULL
+            ''')
+            cursor.connection.commit()
+        finally:
+            cursor.execute('DETACH DATABASE legacy')
+
     def store_message(self, sender: str, content: str, room: str = 'global') -> int:
         """
         Store a chat message in the database.
@@ -58,7 +201,7 @@ class DatabaseManager:
         Returns:
             int: Stored message ID
         """
-        with sqlite3.connect(self.database_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 'INSERT INTO messages (sender, content, room) VALUES (?, ?, ?)',
@@ -67,6 +210,136 @@ class DatabaseManager:
             conn.commit()
             return cursor.lastrowid
 
+    def store_messages(self, rows: Iterable[Tuple[str, str, str]]) -> List[int]:
+        """
+        Store several room messages in one transaction.
+        
+        Args:
+            rows (Iterable): (sender, content, room) tuples
+        
+        Returns:
+            List of stored message IDs, in input order
+        """
+        ids = []
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            for row in rows:
+                cursor.execute(
+                    'INSERT INTO messages (sender, content, room) VALUES (?, ?, ?)',
+                    row
+                )
+                ids.append(cursor.lastrowid)
+            conn.commit()
+        return ids
+
+    def store_direct_message(
+        self,
+        sender: str,
+        recipient: str,
+        content: str,
+        delivered: bool = True
+    ) -> int:
+        """
+        Store a direct message between two users.
+        
+        Args:
+            sender (str): Message sender's username
+            recipient (str): Message recipient's username
+            content (str): Message content
+            delivered (bool, optional): False if the recipient was offline
+        
+        Returns:
+            int: Stored message ID
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''INSERT INTO messages
+                   (sender, content, room, recipient, conversation, delivered)
+                   VALUES (?, ?, NULL, ?, ?, ?)''',
+                (
+                    sender,
+                    content,
+                    recipient,
+                    self.conversation_key(sender, recipient),
+                    int(delivered)
+                )
+            )
+            conn.commit()
+            return cursor.lastrowid
+
+    def get_conversation(
+        self,
+        user_a: str,
+        user_b: str,
+        limit: int = 50,
+        before_id: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Retrieve one direct conversation, newest first.
+        
+        Args:
+            user_a (str): One participant
+            user_b (str): The other participant
+            limit (int, optional): Number of messages
+            before_id (int, optional): Only return messages older than this ID
+        
+        Returns:
+            List of message dictionaries
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(
+                '''SELECT * FROM messages
+                   WHERE conversation = ? AND id < ?
+                   ORDER BY id DESC
+                   LIMIT ?''',
+                (
+                    self.conversation_key(user_a, user_b),
+                    before_id if before_id is not None else 2 ** 63 - 1,
+                    limit
+                )
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_undelivered_messages(self, recipient: str) -> List[Dict[str, str]]:
+        """
+        Retrieve direct messages stored while the recipient was offline.
+        
+        Args:
+            recipient (str): Recipient's username
+        
+        Returns:
+            List of message dictionaries, oldest first
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(
+                '''SELECT * FROM messages
+                   WHERE recipient = ? AND delivered = 0
+                   ORDER BY id''',
+                (recipient,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def mark_messages_delivered(self, message_ids: List[int]) -> None:
+        """
+        Flag offline direct messages as delivered.
+        
+        Args:
+            message_ids (List[int]): IDs returned by get_undelivered_messages
+        """
+        if not message_ids:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                'UPDATE messages SET delivered = 1 WHERE id = ?',
+                [(message_id,) for message_id in message_ids]
+            )
+            conn.commit()
+
     def get_recent_messages(
         self, 
         limit: int = 50, 
@@ -82,7 +355,7 @@ class DatabaseManager:
         Returns:
             List of message dictionaries
         """
-        with sqlite3.connect(self.database_path) as conn:
+        with self._connect() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -96,6 +369,165 @@ class DatabaseManager:
             
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_messages_before(
+        self,
+        room: str = 'global',
+        before_id: Optional[int] = None,
+        limit: int = 50
+    ) -> List[Dict[str, str]]:
+        """
+        Retrieve a page of room history older than a message ID, newest first.
+        
+        Args:
+            room (str, optional): Specific chat room
+            before_id (int, optional): Only messages older than this ID
+            limit (int, optional): Number of messages
+        
+        Returns:
+            List of message dictionaries
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(
+                '''SELECT id, sender, content, timestamp FROM messages
+                   WHERE room = ? AND id < ?
+                   ORDER BY id DESC
+                   LIMIT ?''',
+                (room, before_id if before_id is not None else 2 ** 63 - 1, limit)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def iter_messages(
+        self,
+        room: Optional[str] = 'global',
+        after_id: int = 0,
+        batch_size: int = 1000,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Stream messages oldest first, batch_size rows at a time.
+        
+        Each batch is a separate short query resuming after the last ID
+        seen, so no read transaction stays open while the caller works
+        through the rows and writers never wait on an export.
+        
+        Args:
+            room (str, optional): Room to read, or None for every message
+            after_id (int): Only messages newer than this ID
+            batch_size (int): Rows fetched at a time
+            since (str, optional): Earliest timestamp, inclusive
+            until (str, optional): Latest timestamp, exclusive
+        
+        Yields:
+            Message dictionaries
+        """
+        conditions, params = ['id > ?'], [after_id]
+        if room is not None:
+            conditions.append('room = ?')
+            params.append(room)
+        if since is not None:
+            conditions.append('timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('timestamp < ?')
+            params.append(until)
+        query = f"SELECT * FROM messages WHERE {' AND '.join(conditions)} ORDER BY id LIMIT ?"
+
+        while True:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                rows = conn.execute(query, params + [batch_size]).fetchall()
+            for row in rows:
+                yield dict(row)
+            if len(rows) < batch_size:
+                return
+            params[0] = rows[-1]['id']
+
+    def import_messages(self, messages: Iterable[Dict], batch_size: int = 1000) -> int:
+        """
+        Insert exported messages, committing every batch_size rows.
+        
+        Imported rows get new IDs in input order; timestamps and delivery
+        state are kept.
+        
+        Args:
+            messages (Iterable): Message dictionaries as iter_messages yields them
+            batch_size (int): Rows per transaction
+        
+        Returns:
+            int: Number of messages inserted
+        """
+        count = 0
+        with self._connect() as conn:
+            for batch in self._batches(messages, batch_size):
+                conn.executemany(
+                    '''INSERT INTO messages
+                       (sender, content, timestamp, room, recipient, conversation, delivered)
+                       VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?)''',
+                    batch
+                )
+                conn.commit()
+                count += len(batch)
+        return count
+
+    def create_user(self, username: str, password_hash: str, salt: str) -> bool:
+        """
+        Create an account.
+        
+        Args:
+            username (str): Chosen username
+            password_hash (str): PBKDF2 hash
+            salt (str): Hash salt
+        
+        Returns:
+            bool: False if the username is taken
+        """
+        with self._connect() as conn:
+            # A row holding only last_seen is not an account yet
+            cursor = conn.execute(
+                '''INSERT INTO users (username, password_hash, salt)
+                   VALUES (?, ?, ?)
+                   ON CONFLICT (username) DO UPDATE
+                   SET password_hash = excluded.password_hash, salt = excluded.salt
+                   WHERE users.password_hash IS NULL''',
+                (username, password_hash, salt)
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+
+    def get_credentials(self, username: str) -> Optional[Tuple[str, str]]:
+        """
+        Look up an account's password hash and salt.
+        
+        Args:
+            username (str): Username to look up
+        
+        Returns:
+            Optional (password_hash, salt); None if there is no such account
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT password_hash, salt FROM users WHERE username = ?',
+                (username,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return row[0], row[1]
+
+    def user_exists(self, username: str) -> bool:
+        """
+        Check whether an account exists.
+        
+        Args:
+            username (str): Username to look up
+        
+        Returns:
+            bool: True if the user is registered
+        """
+        return self.get_credentials(username) is not None
+
     def update_user_last_seen(self, username: str) -> None:
         """
         Update user's last seen timestamp.
@@ -103,11 +535,32 @@ class DatabaseManager:
         Args:
             username (str): User's username
         """
-        with sqlite3.connect(self.database_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
+            # An upsert, so the account columns in the same row survive
             cursor.execute(
-                '''INSERT OR REPLACE INTO users (username, last_seen) 
-                   VALUES (?, CURRENT_TIMESTAMP)''', 
+                '''INSERT INTO users (username, last_seen)
+                   VALUES (?, CURRENT_TIMESTAMP)
+                   ON CONFLICT (username) DO UPDATE SET last_seen = excluded.last_seen''',
                 (username,)
             )
-            conn.commit()
\ No newline at end of file
+            conn.commit()
+
+    def update_users_last_seen(self, last_seen: Dict[str, str]) -> None:
+        """
+        Update several users' last seen timestamps in one transaction.
+        
+        Args:
+            last_seen (Dict[str, str]): Username to UTC timestamp
+                ('YYYY-MM-DD HH:MM:SS', the CURRENT_TIMESTAMP format)
+        """
+        if not last_seen:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                '''INSERT INTO users (username, last_seen)
+                   VALUES (?, ?)
+                   ON CONFLICT (username) DO UPDATE SET last_seen = excluded.last_seen''',
+                list(last_seen.items())
+            )
+            conn.commit()
@@ -0,0 +1,58 @@
+"""
+Message de-duplication module for the distributed chat server.
+Remembers recently stored client message IDs so resends are not stored twice.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+# (sender, client message ID)
+MessageKey = Tuple[str, Hashable]
+
+class DeduplicationWindow:
+    def __init__(self, max_entries: int = 100000):
+        """
+        Create a bounded window of recently seen client message IDs.
+
+        The window only has to cover the resends a client can make after
+        a reconnect, so once it is full the oldest entries are forgotten.
+
+        Args:
+            max_entries (int): Maximum remembered message IDs
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._stored: 'OrderedDict[MessageKey, int]' = OrderedDict()
+
+    def get(self, sender: str, message_id: Hashable) -> Optional[int]:
+        """
+        Look up the stored row ID for a message already seen.
+
+        Args:
+            sender (str): Authenticated sender
+            message_id (Hashable): Client-generated message ID
+
+        Returns:
+            Optional database row ID if the message was already stored
+        """
+        with self._lock:
+            return self._stored.get((sender, message_id))
+
+    def record(self, sender: str, message_id: Hashable, row_id: int) -> None:
+        """
+        Remember that a message was stored.
+
+        Args:
+            sender (str): Authenticated sender
+            message_id (Hashable): Client-generated message ID
+            row_id (int): Database row ID from store_message
+        """
+        with self._lock:
+            self._stored[(sender, message_id)] = row_id
+            if len(self._stored) > self.max_entries:
+                self._stored.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._stored)
@@ -0,0 +1,85 @@
+"""
+Listening socket handoff for zero-downtime restarts.
+Passes the bound socket to a successor process so no connection is refused.
+"""
+
+import os
+import select
+import socket
+import subprocess
+import sys
+from typing import List, Optional
+
+# Environment variables a successor reads its inherited descriptors from
+LISTEN_FD_ENV = 'CHAT_LISTEN_FD'
+READY_FD_ENV = 'CHAT_READY_FD'
+
+def inherited_listen_fd() -> Optional[int]:
+    """
+    Return the listening socket descriptor passed by a predecessor, if any.
+    """
+    value = os.environ.pop(LISTEN_FD_ENV, None)
+    return int(value) if value else None
+
+def notify_ready() -> None:
+    """
+    Tell the predecessor this process is accepting connections.
+
+    Does nothing when the process was not started by spawn_successor().
+    """
+    value = os.environ.pop(READY_FD_ENV, None)
+    if not value:
+        return
+    fd = int(value)
+    try:
+        os.write(fd, b'1')
+    finally:
+        os.close(fd)
+
+def spawn_successor(
+    listen_socket: socket.socket,
+    argv: Optional[List[str]] = None,
+    timeout: float = 30.0
+) -> subprocess.Popen:
+    """
+    Start a new server process sharing the listening socket.
+
+    Both processes hold the same socket, so connections queue in the
+    kernel while the successor starts and nothing is refused. Returns
+    once the successor calls notify_ready(); the caller then drains.
+
+    Args:
+        listen_socket (socket): Bound, listening socket to share
+        argv (List[str], optional): Command line; defaults to this process's
+        timeout (float): Seconds to wait for the successor to become ready
+
+    Returns:
+        subprocess.Popen: The running successor
+
+    Raises:
+        RuntimeError: If the successor exits or is not ready in time
+    """
+    ready_read, ready_write = os.pipe()
+    env = dict(os.environ)
+    env[LISTEN_FD_ENV] = str(listen_socket.fileno())
+    env[READY_FD_ENV] = str(ready_write)
+
+    try:
+        process = subprocess.Popen(
+            argv or [sys.executable] + sys.argv,
+            pass_fds=(listen_socket.fileno(), ready_write),
+            env=env
+        )
+    finally:
+        os.close(ready_write)
+
+    try:
+        readable, _, _ = select.select([ready_read], [], [], timeout)
+        # EOF without a byte means the successor exited before it was ready
+        if not readable or os.read(ready_read, 1) != b'1':
+            process.kill()
+            process.wait()
+            raise RuntimeError("Successor server did not become ready")
+    finally:
+        os.close(ready_read)
+    return process
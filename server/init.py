@@ -6,5 +6,6 @@ Sets up server-related imports and configurations.
 from .server import ChatServer
 from .authentication import AuthenticationManager
 from .database import DatabaseManager
+from .storage import StorageBackend, create_storage
 
-__all__ = ['ChatServer', 'AuthenticationManager', 'DatabaseManager']
\ No newline at end of file
+__all__ = ['ChatServer', 'AuthenticationManager', 'DatabaseManager', 'StorageBackend', 'create_storage']
\ No newline at end of file
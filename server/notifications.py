@@ -0,0 +1,274 @@
+"""
+Notification matching for the distributed chat server.
+Finds the users a room message mentions or matches a watched keyword of.
+"""
+
+import re
+import threading
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+MAX_KEYWORDS_PER_USER = 50
+MAX_KEYWORD_LENGTH = 64
+
+MENTION_PATTERN = re.compile(r'@(\w+)')
+
+# Seconds subscription changes are batched before the matcher is rebuilt
+REBUILD_DELAY = 0.5
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """
+    Whether text[start:end] is not part of a longer word.
+    """
+    if start > 0 and _is_word_char(text[start - 1]):
+        return False
+    return end >= len(text) or not _is_word_char(text[end])
+
+def _contains_word(text: str, keyword: str) -> bool:
+    start = text.find(keyword)
+    while start != -1:
+        if _is_whole_word(text, start, start + len(keyword)):
+            return True
+        start = text.find(keyword, start + 1)
+    return False
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Build an Aho-Corasick automaton over a fixed set of keywords.
+
+        Keywords are matched case-insensitively as whole words. A scan
+        visits each character of the text once whatever the number of
+        keywords, so the cost of a message depends on its length and
+        the matches found, not on how many subscriptions exist.
+
+        Args:
+            keywords (Iterable): Case-folded keywords
+        """
+        # Node 0 is the root; each node has transitions, a failure link
+        # and the keywords that end there, including via failure links
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for keyword in keywords:
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(keyword)
+
+        # Breadth-first, so a node's failure link is set before its children's;
+        # the root's children fail back to the root
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Return the keywords that occur in text as whole words.
+
+        Args:
+            text (str): Message text
+
+        Returns:
+            Set of matched keywords
+        """
+        text = text.casefold()
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword in output[node]:
+                if _is_whole_word(text, end - len(keyword) + 1, end + 1):
+                    found.add(keyword)
+        return found
+
+class NotificationIndex:
+    def __init__(self, rebuild_delay: float = REBUILD_DELAY):
+        """
+        Track each connected user's watched keywords for room fan-out.
+
+        The matcher only finds keywords; who watches them is looked up
+        when a message matches, so subscribers coming and going never
+        invalidate it. When the set of keywords changes, the matcher is
+        rebuilt on a background thread once rebuild_delay has passed,
+        so a burst of changes costs one build. Keywords added since the
+        last build are checked one by one until it replaces the matcher.
+
+        Args:
+            rebuild_delay (float): Seconds to batch changes before rebuilding
+        """
+        self._lock = threading.Lock()
+        self._user_keywords: Dict[str, FrozenSet[str]] = {}
+        self._subscribers: Dict[str, Set[str]] = {}
+
+        # Matcher over the keywords in _indexed, swapped in whole by _rebuild
+        self._matcher: Optional[KeywordMatcher] = None
+        self._indexed: FrozenSet[str] = frozenset()
+        self._unindexed: Set[str] = set()
+        self._rebuild_delay = rebuild_delay
+        self._rebuild_timer: Optional[threading.Timer] = None
+        # Keeps an older build from finishing after, and replacing, a newer one
+        self._build_lock = threading.Lock()
+        self._closed = False
+
+    @staticmethod
+    def normalize(keywords: Iterable) -> FrozenSet[str]:
+        """
+        Case-fold and bound a client-supplied keyword list.
+
+        Args:
+            keywords (Iterable): Keywords as sent by the client
+
+        Returns:
+            FrozenSet of usable keywords
+        """
+        normalized = set()
+        for keyword in keywords:
+            if not isinstance(keyword, str):
+                continue
+            keyword = keyword.strip().casefold()
+            if keyword and len(keyword) <= MAX_KEYWORD_LENGTH:
+                normalized.add(keyword)
+            if len(normalized) >= MAX_KEYWORDS_PER_USER:
+                break
+        return frozenset(normalized)
+
+    def subscribe(self, username: str, keywords: Iterable) -> FrozenSet[str]:
+        """
+        Replace a user's watched keywords.
+
+        Args:
+            username (str): Subscribing user
+            keywords (Iterable): Keywords to watch; empty to stop watching
+
+        Returns:
+            FrozenSet of keywords actually watched, after normalization
+        """
+        keywords = self.normalize(keywords)
+        with self._lock:
+            changed = self._remove(username)
+            if keywords:
+                self._user_keywords[username] = keywords
+                for keyword in keywords:
+                    self._subscribers.setdefault(keyword, set()).add(username)
+                    if keyword not in self._indexed:
+                        self._unindexed.add(keyword)
+                        changed = True
+            if changed:
+                self._schedule_rebuild()
+        return keywords
+
+    def unsubscribe(self, username: str) -> None:
+        """
+        Drop a user's keywords, e.g. when they disconnect.
+        """
+        with self._lock:
+            if self._remove(username):
+                self._schedule_rebuild()
+
+    def close(self) -> None:
+        """
+        Cancel any pending rebuild; called when the server stops.
+        """
+        with self._lock:
+            self._closed = True
+            timer, self._rebuild_timer = self._rebuild_timer, None
+        if timer:
+            timer.cancel()
+
+    def _remove(self, username: str) -> bool:
+        """
+        Drop a user's keywords.
+
+        Returns:
+            bool: Whether a keyword lost its last subscriber
+        """
+        dropped = False
+        for keyword in self._user_keywords.pop(username, ()):
+            subscribers = self._subscribers[keyword]
+            subscribers.discard(username)
+            if not subscribers:
+                del self._subscribers[keyword]
+                self._unindexed.discard(keyword)
+                dropped = True
+        return dropped
+
+    def _schedule_rebuild(self) -> None:
+        # Called with the lock held; changes before the timer fires share its build
+        if self._rebuild_timer is not None or self._closed:
+            return
+        self._rebuild_timer = threading.Timer(self._rebuild_delay, self._rebuild)
+        self._rebuild_timer.name = 'notification-rebuild'
+        self._rebuild_timer.daemon = True
+        self._rebuild_timer.start()
+
+    def _rebuild(self) -> None:
+        with self._build_lock:
+            with self._lock:
+                self._rebuild_timer = None
+                if self._closed:
+                    return
+                keywords = frozenset(self._subscribers)
+
+            # Built outside the lock; messages keep using the old matcher
+            matcher = KeywordMatcher(keywords) if keywords else None
+
+            with self._lock:
+                self._matcher, self._indexed = matcher, keywords
+                self._unindexed -= keywords
+
+    def keywords(self, username: str) -> FrozenSet[str]:
+        with self._lock:
+            return self._user_keywords.get(username, frozenset())
+
+    def match(self, text: str) -> Set[str]:
+        """
+        Find the users a message should notify.
+
+        Mentions are '@username' tokens; keyword matches come from one
+        pass of the shared matcher, plus any keywords it does not cover yet.
+
+        Args:
+            text (str): Message text
+
+        Returns:
+            Set of usernames mentioned or watching a keyword in the text
+        """
+        users = set(MENTION_PATTERN.findall(text))
+        with self._lock:
+            if not self._subscribers:
+                return users
+            matcher, unindexed = self._matcher, tuple(self._unindexed)
+
+        # Scanned outside the lock; a built matcher is never modified
+        found = matcher.find(text) if matcher else set()
+        if unindexed:
+            folded = text.casefold()
+            found.update(keyword for keyword in unindexed if _contains_word(folded, keyword))
+        if found:
+            # Keywords nobody watches any more simply have no subscribers
+            with self._lock:
+                for keyword in found:
+                    users.update(self._subscribers.get(keyword, ()))
+        return users
@@ -0,0 +1,411 @@
+"""
+PostgreSQL storage backend for the distributed chat application.
+Pools connections and batches concurrent inserts into multi-row statements.
+
+Requires psycopg2 (``pip install psycopg2-binary``); works with PostgreSQL
+and wire-compatible servers such as CockroachDB or YugabyteDB. Message IDs
+are drawn from the table's sequence, so CockroachDB needs
+``serial_normalization = 'sql_sequence'`` when the tables are created.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import psycopg2
+    import psycopg2.extras
+    import psycopg2.pool
+except ImportError:  # pragma: no cover - optional dependency
+    psycopg2 = None
+
+from .storage import StorageBackend
+
+# Columns returned for message rows; timestamps match SQLite's text format
+MESSAGE_COLUMNS = '''id, sender, content,
+    to_char("timestamp", 'YYYY-MM-DD HH24:MI:SS') AS "timestamp",
+    room, recipient, conversation, delivered'''
+
+# Room messages in one statement. Each row carries its index in the batch
+# as client_key; IDs are drawn in that order and returned with the key, so
+# rows are matched to their IDs by key, not by the order RETURNING yields them
+INSERT_ROOM_MESSAGES = '''WITH batch (client_key, sender, content, room) AS (VALUES %s),
+    ids AS (
+        SELECT client_key, nextval(pg_get_serial_sequence('messages', 'id')) AS id
+        FROM batch
+        ORDER BY client_key
+    ),
+    inserted AS (
+        INSERT INTO messages (id, sender, content, room)
+        SELECT ids.id, batch.sender, batch.content, batch.room
+        FROM batch JOIN ids USING (client_key)
+        RETURNING id
+    )
+    SELECT ids.client_key, ids.id FROM ids JOIN inserted USING (id)'''
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS messages (
+        id BIGSERIAL PRIMARY KEY,
+        sender TEXT,
+        content TEXT,
+        "timestamp" TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+        room TEXT,
+        recipient TEXT,
+        conversation TEXT,
+        delivered INTEGER DEFAULT 1
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages (conversation, id)',
+    'CREATE INDEX IF NOT EXISTS idx_messages_room ON messages (room, id)',
+    '''CREATE INDEX IF NOT EXISTS idx_messages_undelivered
+        ON messages (recipient, id) WHERE delivered = 0''',
+    '''CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        password_hash TEXT,
+        salt TEXT,
+        last_seen TIMESTAMP
+    )'''
+]
+
+class PostgresStorage(StorageBackend):
+    def __init__(
+        self,
+        dsn: str,
+        pool_size: int = 5,
+        batch_size: int = 500,
+        batch_delay: float = 0.002
+    ):
+        """
+        Connect to a PostgreSQL-compatible server.
+
+        Room messages from concurrent senders are grouped by a writer
+        thread: whatever arrives within batch_delay (up to batch_size
+        rows) goes out as one multi-row INSERT in one transaction, so
+        a busy room costs one round trip and one commit per batch
+        instead of per message.
+
+        Args:
+            dsn (str): postgresql:// connection URL
+            pool_size (int): Maximum pooled connections
+            batch_size (int): Most room messages per INSERT
+            batch_delay (float): Seconds the writer waits to fill a batch
+        """
+        if psycopg2 is None:
+            raise ImportError("PostgreSQL storage requires psycopg2 (pip install psycopg2-binary)")
+
+        # The pool raises when exhausted; the semaphore makes callers wait instead
+        self.pool = psycopg2.pool.ThreadedConnectionPool(1, pool_size, dsn)
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.logger = logging.getLogger(__name__)
+        self._create_tables()
+
+        # None on the queue tells the writer to finish its batch and exit;
+        # the lock keeps rows from being queued behind it
+        self._pending: 'queue.Queue' = queue.Queue()
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run_writer, name='pg-writer', daemon=True)
+        self._writer.start()
+
+    @contextmanager
+    def _connection(self):
+        """
+        Borrow a pooled connection; commit on success, roll back on error.
+        """
+        with self._slots:
+            conn = self.pool.getconn()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self.pool.putconn(conn)
+
+    def _create_tables(self):
+        with self._connection() as conn:
+            with conn.cursor() as cursor:
+                for statement in SCHEMA:
+                    cursor.execute(statement)
+
+    def _query(self, sql: str, params: tuple) -> List[Dict[str, str]]:
+        with self._connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                cursor.execute(sql, params)
+                return [dict(row) for row in cursor.fetchall()]
+
+    def _insert_rows(self, rows: List[Tuple[str, str, str]]) -> List[int]:
+        """
+        Insert room messages with one multi-row statement.
+
+        Returns:
+            List of IDs in the order of rows
+        """
+        with self._connection() as conn:
+            with conn.cursor() as cursor:
+                returned = psycopg2.extras.execute_values(
+                    cursor,
+                    INSERT_ROOM_MESSAGES,
+                    [(client_key,) + tuple(row) for client_key, row in enumerate(rows)],
+                    page_size=len(rows),
+                    fetch=True
+                )
+        ids = dict(returned)
+        return [ids[client_key] for client_key in range(len(rows))]
+
+    def _run_writer(self):
+        closing = False
+        while not closing:
+            item = self._pending.get()
+            if item is None:
+                return
+            batch = [item]
+            try:
+                # Let concurrent senders join the batch
+                while len(batch) < self.batch_size:
+                    item = self._pending.get(timeout=self.batch_delay)
+                    if item is None:
+                        closing = True
+                        break
+                    batch.append(item)
+            except queue.Empty:
+                pass
+
+            try:
+                ids = self._insert_rows([row for row, _ in batch])
+            except Exception as e:
+                self.logger.error(f"[!] Batched insert of {len(batch)} messages failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), message_id in zip(batch, ids):
+                future.set_result(message_id)
+
+    def store_message(self, sender: str, content: str, room: str = 'global') -> int:
+        """
+        Store a room message through the batching writer.
+
+        Returns:
+            int: Stored message ID, once its batch is committed
+        """
+        future: Future = Future()
+        with self._pending_lock:
+            if self._closed:
+                raise RuntimeError("Storage is closed")
+            self._pending.put(((sender, content, room), future))
+        return future.result()
+
+    def store_messages(self, rows: Iterable[Tuple[str, str, str]]) -> List[int]:
+        rows = list(rows)
+        ids = []
+        for start in range(0, len(rows), self.batch_size):
+            ids.extend(self._insert_rows(rows[start:start + self.batch_size]))
+        return ids
+
+    def store_direct_message(
+        self,
+        sender: str,
+        recipient: str,
+        content: str,
+        delivered: bool = True
+    ) -> int:
+        with self._connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    '''INSERT INTO messages
+                       (sender, content, room, recipient, conversation, delivered)
+                       VALUES (%s, %s, NULL, %s, %s, %s)
+                       RETURNING id''',
+                    (
+                        sender,
+                        content,
+                        recipient,
+                        self.conversation_key(sender, recipient),
+                        int(delivered)
+                    )
+                )
+                return cursor.fetchone()[0]
+
+    def get_conversation(
+        self,
+        user_a: str,
+        user_b: str,
+        limit: int = 50,
+        before_id: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        return self._query(
+            f'''SELECT {MESSAGE_COLUMNS} FROM messages
+                WHERE conversation = %s AND id < %s
+                ORDER BY id DESC
+                LIMIT %s''',
+            (
+                self.conversation_key(user_a, user_b),
+                before_id if before_id is not None else 2 ** 63 - 1,
+                limit
+            )
+        )
+
+    def get_undelivered_messages(self, recipient: str) -> List[Dict[str, str]]:
+        return self._query(
+            f'''SELECT {MESSAGE_COLUMNS} FROM messages
+                WHERE recipient = %s AND delivered = 0
+                ORDER BY id''',
+            (recipient,)
+        )
+
+    def mark_messages_delivered(self, message_ids: List[int]) -> None:
+        if not message_ids:
+            return
+        with self._connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    'UPDATE messages SET delivered = 1 WHERE id = ANY(%s)',
+                    (list(message_ids),)
+                )
+
+    def get_recent_messages(self, limit: int = 50, room: str = 'global') -> List[Dict[str, str]]:
+        return self._query(
+            f'''SELECT {MESSAGE_COLUMNS} FROM messages
+                WHERE room = %s
+                ORDER BY "timestamp" DESC
+                LIMIT %s''',
+            (room, limit)
+        )
+
+    def get_messages_before(
+        self,
+        room: str = 'global',
+        before_id: Optional[int] = None,
+        limit: int = 50
+    ) -> List[Dict[str, str]]:
+        return self._query(
+            f'''SELECT id, sender, content,
+                    to_char("timestamp", 'YYYY-MM-DD HH24:MI:SS') AS "timestamp"
+                FROM messages
+                WHERE room = %s AND id < %s
+                ORDER BY id DESC
+                LIMIT %s''',
+            (room, before_id if before_id is not None else 2 ** 63 - 1, limit)
+        )
+
+    def iter_messages(
+        self,
+        room: Optional[str] = 'global',
+        after_id: int = 0,
+        batch_size: int = 1000,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Stream messages oldest first through a server-side cursor.
+
+        A named cursor keeps the result set on the server and fetches
+        batch_size rows per round trip, so exporting millions of
+        messages never holds them all in memory.
+        """
+        conditions, params = ['id > %s'], [after_id]
+        if room is not None:
+            conditions.append('room = %s')
+            params.append(room)
+        if since is not None:
+            conditions.append('"timestamp" >= %s::timestamp')
+            params.append(since)
+        if until is not None:
+            conditions.append('"timestamp" < %s::timestamp')
+            params.append(until)
+
+        with self._connection() as conn:
+            with conn.cursor(
+                name='iter_messages',
+                cursor_factory=psycopg2.extras.RealDictCursor
+            ) as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(
+                    f"SELECT {MESSAGE_COLUMNS} FROM messages "
+                    f"WHERE {' AND '.join(conditions)} ORDER BY id",
+                    params
+                )
+                for row in cursor:
+                    yield dict(row)
+
+    def import_messages(self, messages: Iterable[Dict], batch_size: int = 1000) -> int:
+        count = 0
+        for batch in self._batches(messages, batch_size):
+            with self._connection() as conn:
+                with conn.cursor() as cursor:
+                    psycopg2.extras.execute_values(
+                        cursor,
+                        '''INSERT INTO messages
+                           (sender, content, "timestamp", room, recipient, conversation, delivered)
+                           VALUES %s''',
+                        batch,
+                        template="(%s, %s, COALESCE(%s::timestamp, now() AT TIME ZONE 'utc'), %s, %s, %s, %s)",
+                        page_size=len(batch)
+                    )
+            count += len(batch)
+        return count
+
+    def create_user(self, username: str, password_hash: str, salt: str) -> bool:
+        with self._connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    '''INSERT INTO users (username, password_hash, salt)
+                       VALUES (%s, %s, %s)
+                       ON CONFLICT (username) DO UPDATE
+                       SET password_hash = excluded.password_hash, salt = excluded.salt
+                       WHERE users.password_hash IS NULL''',
+                    (username, password_hash, salt)
+                )
+                return cursor.rowcount == 1
+
+    def get_credentials(self, username: str) -> Optional[Tuple[str, str]]:
+        with self._connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    'SELECT password_hash, salt FROM users WHERE username = %s',
+                    (username,)
+                )
+                row = cursor.fetchone()
+        if row is None or row[0] is None:
+            return None
+        return row[0], row[1]
+
+    def user_exists(self, username: str) -> bool:
+        return self.get_credentials(username) is not None
+
+    def update_user_last_seen(self, username: str) -> None:
+        self.update_users_last_seen({username: None})
+
+    def update_users_last_seen(self, last_seen: Dict[str, str]) -> None:
+        """
+        Upsert last-seen times in one statement; None means now.
+        """
+        if not last_seen:
+            return
+        with self._connection() as conn:
+            with conn.cursor() as cursor:
+                psycopg2.extras.execute_values(
+                    cursor,
+                    '''INSERT INTO users (username, last_seen)
+                       VALUES %s
+                       ON CONFLICT (username) DO UPDATE SET last_seen = excluded.last_seen''',
+                    list(last_seen.items()),
+                    template="(%s, COALESCE(%s::timestamp, now() AT TIME ZONE 'utc'))"
+                )
+
+    def close(self) -> None:
+        """
+        Write queued room messages, stop the writer and close the pool.
+        """
+        with self._pending_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._pending.put(None)
+        self._writer.join()
+        self.pool.closeall()
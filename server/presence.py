@@ -0,0 +1,210 @@
+"""
+Presence tracking module for the distributed chat server.
+Keeps online, last-seen and typing state in memory and coalesces updates.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+class _PresenceState:
+    __slots__ = ('online', 'last_seen', 'typing_until')
+
+    def __init__(self):
+        self.online = False
+        self.last_seen = 0.0
+        self.typing_until = 0.0
+
+class PresenceTracker:
+    def __init__(
+        self,
+        database_manager,
+        push_interval: float = 1.0,
+        flush_interval: float = 5.0,
+        typing_timeout: float = 5.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Track user presence without touching the database per event.
+
+        Every event only updates in-memory state. Changes are coalesced per
+        user, so a user who types, sends and goes idle within one interval
+        produces a single presence update and a single last-seen write.
+
+        Args:
+            database_manager (DatabaseManager): Receives batched last-seen writes
+            push_interval (float): Minimum seconds between presence pushes
+            flush_interval (float): Seconds between last-seen batch writes
+            typing_timeout (float): Seconds after which typing expires
+            clock (callable): Wall-clock time source, for tests
+        """
+        self.database_manager = database_manager
+        self.push_interval = push_interval
+        self.flush_interval = flush_interval
+        self.typing_timeout = typing_timeout
+        self._clock = clock
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._states: Dict[str, _PresenceState] = {}
+        self._unsaved_last_seen: Dict[str, float] = {}
+        self._changed: Dict[str, Dict] = {}
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _state(self, username: str) -> _PresenceState:
+        state = self._states.get(username)
+        if state is None:
+            state = self._states[username] = _PresenceState()
+        return state
+
+    def _touch(self, username: str, state: _PresenceState, now: float) -> None:
+        state.last_seen = now
+        self._unsaved_last_seen[username] = now
+
+    def _record_change(self, username: str, state: _PresenceState, now: float) -> None:
+        # Later events for the same user overwrite earlier ones
+        self._changed[username] = {
+            'username': username,
+            'online': state.online,
+            'typing': state.typing_until > now,
+            'last_seen': state.last_seen
+        }
+
+    def connected(self, username: str) -> None:
+        now = self._clock()
+        with self._lock:
+            state = self._state(username)
+            state.online = True
+            self._touch(username, state, now)
+            self._record_change(username, state, now)
+
+    def disconnected(self, username: str) -> None:
+        now = self._clock()
+        with self._lock:
+            state = self._state(username)
+            state.online = False
+            state.typing_until = 0.0
+            self._touch(username, state, now)
+            self._record_change(username, state, now)
+
+    def activity(self, username: str) -> None:
+        """
+        Note that a user sent something; clears their typing indicator.
+        """
+        now = self._clock()
+        with self._lock:
+            state = self._state(username)
+            self._touch(username, state, now)
+            if state.typing_until > now:
+                state.typing_until = 0.0
+                self._record_change(username, state, now)
+
+    def typing(self, username: str, is_typing: bool = True) -> None:
+        """
+        Start or stop a user's typing indicator.
+
+        Only transitions are recorded, so a client repeating "typing"
+        on every keystroke costs a dictionary update and nothing more.
+        """
+        now = self._clock()
+        with self._lock:
+            state = self._state(username)
+            was_typing = state.typing_until > now
+            state.typing_until = now + self.typing_timeout if is_typing else 0.0
+            if was_typing != is_typing:
+                self._record_change(username, state, now)
+
+    def online_users(self) -> List[str]:
+        with self._lock:
+            return [name for name, state in self._states.items() if state.online]
+
+    def drain_changes(self) -> List[Dict]:
+        """
+        Take the coalesced presence changes since the last call.
+
+        Typing indicators that timed out are reported as stopped here.
+
+        Returns:
+            List of presence dictionaries, at most one per user
+        """
+        now = self._clock()
+        with self._lock:
+            for username, state in self._states.items():
+                if state.typing_until and state.typing_until <= now:
+                    state.typing_until = 0.0
+                    self._record_change(username, state, now)
+            changes, self._changed = self._changed, {}
+
+            # Offline users with nothing left to report need no memory
+            for username in [n for n, s in self._states.items() if not s.online]:
+                if username not in self._unsaved_last_seen:
+                    del self._states[username]
+        return list(changes.values())
+
+    def flush_last_seen(self) -> int:
+        """
+        Write every pending last-seen timestamp in one batch.
+
+        Returns:
+            int: Number of users written
+        """
+        with self._lock:
+            pending, self._unsaved_last_seen = self._unsaved_last_seen, {}
+        if not pending:
+            return 0
+
+        try:
+            self.database_manager.update_users_last_seen({
+                username: datetime.fromtimestamp(seen, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                for username, seen in pending.items()
+            })
+        except Exception:
+            # Keep the timestamps for the next attempt unless newer ones arrived
+            with self._lock:
+                for username, seen in pending.items():
+                    self._unsaved_last_seen.setdefault(username, seen)
+            raise
+        return len(pending)
+
+    def start(self, push: Callable[[List[Dict]], None]) -> None:
+        """
+        Start the background thread that pushes changes and flushes writes.
+
+        Args:
+            push (callable): Receives each non-empty batch of changes
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(push,),
+            name='presence',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background thread and flush outstanding last-seen writes.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush_last_seen()
+
+    def _run(self, push: Callable[[List[Dict]], None]) -> None:
+        next_flush = self._clock() + self.flush_interval
+        while not self._stop.wait(self.push_interval):
+            try:
+                changes = self.drain_changes()
+                if changes:
+                    push(changes)
+                if self._clock() >= next_flush:
+                    self.flush_last_seen()
+                    next_flush = self._clock() + self.flush_interval
+            except Exception as e:
+                self.logger.error(f"[!] Presence update error: {e}")
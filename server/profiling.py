@@ -0,0 +1,198 @@
+"""
+On-demand profiling for the distributed chat server.
+Runs cProfile or an all-thread stack sampler for a fixed time and saves the result.
+"""
+
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+PROFILE_MODES = ('sample', 'cprofile')
+
+class StackSampler:
+    def __init__(self, interval: float = 0.005):
+        """
+        Sample every thread's Python stack at a fixed interval.
+
+        Samples are counted as collapsed stacks ("outer;inner;leaf"), the
+        input format of flame graph tools.
+
+        Args:
+            interval (float): Seconds between samples
+        """
+        self.interval = interval
+        self.samples: Counter = Counter()
+
+    def sample(self) -> None:
+        own_thread = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.samples[';'.join(reversed(stack))] += 1
+
+    def run(self, seconds: float) -> Counter:
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self.sample()
+            time.sleep(self.interval)
+        return self.samples
+
+    def write(self, path: str) -> None:
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+class Profiler:
+    def __init__(self, output_dir: str = 'profiles'):
+        """
+        Profile the running server for a limited time on request.
+
+        'sample' mode sees every thread, including idle ones, at a small
+        constant cost. 'cprofile' mode gives exact call counts and times,
+        but cProfile only follows the thread that enables it, so message
+        handlers opt in through profiling() and each thread's results are
+        merged when the capture ends.
+
+        Args:
+            output_dir (str): Directory profile files are written to
+        """
+        self.output_dir = output_dir
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._running = False
+        self._cprofile_active = False
+        self._profiles = []
+        self._refused = 0
+        self._local = threading.local()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self, seconds: float, mode: str = 'sample') -> str:
+        """
+        Start a profile capture in the background.
+
+        Args:
+            seconds (float): Capture length
+            mode (str): 'sample' or 'cprofile'
+
+        Returns:
+            str: Path the profile will be written to
+
+        Raises:
+            ValueError: For an unknown mode
+            RuntimeError: If a capture is already running
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        with self._lock:
+            if self._running:
+                raise RuntimeError("A profile capture is already running")
+            self._running = True
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        suffix = 'folded' if mode == 'sample' else 'prof'
+        path = os.path.join(
+            self.output_dir,
+            f"server_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.{suffix}"
+        )
+        target = self._sample if mode == 'sample' else self._cprofile
+        threading.Thread(target=target, args=(seconds, path), name='profiler', daemon=True).start()
+        self.logger.info(f"[*] Profiling ({mode}) for {seconds}s into {path}")
+        return path
+
+    def _sample(self, seconds: float, path: str) -> None:
+        try:
+            sampler = StackSampler()
+            sampler.run(seconds)
+            sampler.write(path)
+        finally:
+            self._finish(path)
+
+    def _cprofile(self, seconds: float, path: str) -> None:
+        with self._lock:
+            self._profiles = []
+            self._refused = 0
+            self._cprofile_active = True
+        try:
+            time.sleep(seconds)
+        finally:
+            with self._lock:
+                self._cprofile_active = False
+                profiles, self._profiles = self._profiles, []
+                refused = self._refused
+            if refused:
+                self.logger.warning(
+                    f"[!] {refused} handler runs were not profiled: another cProfile was "
+                    f"already active, and Python 3.12+ allows only one at a time; "
+                    f"use 'sample' mode to see every thread"
+                )
+            try:
+                if profiles:
+                    stats = pstats.Stats(profiles[0])
+                    for profile in profiles[1:]:
+                        stats.add(profile)
+                    stats.dump_stats(path)
+                else:
+                    open(path, 'wb').close()
+            finally:
+                self._finish(path)
+
+    def _finish(self, path: str) -> None:
+        with self._lock:
+            self._running = False
+        self.logger.info(f"[*] Profile written to {path}")
+
+    @contextmanager
+    def profiling(self):
+        """
+        Run the enclosed block under this thread's cProfile, if a capture is on.
+
+        Python 3.12+ allows one enabled cProfile per process, so there a
+        block that overlaps another thread's runs unprofiled and the capture
+        logs how many did.
+        """
+        if not self._cprofile_active:
+            yield
+            return
+
+        profile: Optional[cProfile.Profile] = getattr(self._local, 'profile', None)
+        with self._lock:
+            fresh = profile is None or profile not in self._profiles
+        if fresh:
+            profile = cProfile.Profile()
+        try:
+            profile.enable()
+            enabled = True
+        except ValueError:
+            # Python 3.12+ raises this while another thread's profile is enabled
+            enabled = False
+        with self._lock:
+            if not enabled:
+                self._refused += 1
+            elif fresh:
+                # Only profiles that ran are merged; pstats rejects empty ones
+                self._local.profile = profile
+                self._profiles.append(profile)
+
+        if not enabled:
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
@@ -0,0 +1,225 @@
+"""
+Rate limiting module for the distributed chat server.
+Provides token-bucket limiters for messages, upload bytes and authentication attempts.
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Hashable
+
+class TokenBucketLimiter:
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        max_keys: int = 100000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Create a keyed token-bucket limiter.
+
+        Buckets are stored in GCRA form: instead of a token count and a
+        refill timestamp, each key keeps the single time at which its
+        bucket will be full again. That is one float per key, and a key
+        whose time has passed is simply a full bucket and can be dropped.
+
+        Args:
+            rate (float): Tokens added per second
+            burst (float): Bucket capacity
+            max_keys (int): Upper bound on tracked keys; least recently
+                used keys are evicted, which resets them to a full bucket
+            clock (callable): Monotonic time source, for tests
+        """
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._full_at: 'OrderedDict[Hashable, float]' = OrderedDict()
+        self.update(rate, burst)
+
+    def update(self, rate: float, burst: float) -> None:
+        """
+        Change the limits without discarding existing bucket state.
+
+        Args:
+            rate (float): Tokens added per second
+            burst (float): Bucket capacity
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("Rate must be positive and burst at least 1")
+        with self._lock:
+            self.rate = rate
+            self.burst = burst
+            self._interval = 1.0 / rate
+            self._capacity = burst * self._interval
+
+    def allow(self, key: Hashable, cost: float = 1.0) -> bool:
+        """
+        Take tokens from a key's bucket if enough are available.
+
+        Args:
+            key (Hashable): Bucket key, e.g. a username or IP address
+            cost (float): Tokens to take
+
+        Returns:
+            bool: True if the action is allowed
+        """
+        now = self._clock()
+        with self._lock:
+            full_at = max(self._full_at.get(key, now), now) + cost * self._interval
+            # Tolerance for rounding in (now + capacity) - now at large clock values
+            if full_at - now > self._capacity * (1 + 1e-9):
+                return False
+
+            self._full_at[key] = full_at
+            self._full_at.move_to_end(key)
+            self._evict(now)
+            return True
+
+    def _evict(self, now: float) -> None:
+        """
+        Drop buckets that have refilled, oldest first, and enforce max_keys.
+        """
+        full_at = self._full_at
+        while full_at:
+            oldest = next(iter(full_at.values()))
+            if oldest > now and len(full_at) <= self.max_keys:
+                break
+            full_at.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._full_at)
+
+class EventCounters:
+    def __init__(self):
+        """
+        Thread-safe counters for throttling and admission events.
+        """
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def increment(self, event: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[event] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+class ServerRateLimits:
+    def __init__(
+        self,
+        messages_per_second: float = 5.0,
+        message_burst: float = 10.0,
+        ip_messages_per_second: float = 20.0,
+        ip_message_burst: float = 40.0,
+        auth_attempts_per_minute: float = 10.0,
+        auth_burst: float = 5.0,
+        upload_bytes_per_second: float = 4 * 1024 * 1024,
+        upload_burst_bytes: float = 8 * 1024 * 1024,
+        max_keys: int = 100000
+    ):
+        """
+        Bundle the limiters the chat server applies to each client.
+
+        Args:
+            messages_per_second (float): Sustained messages per user
+            message_burst (float): Message burst per user
+            ip_messages_per_second (float): Sustained messages per IP address
+            ip_message_burst (float): Message burst per IP address
+            auth_attempts_per_minute (float): Login attempts per user and per IP
+            auth_burst (float): Login attempt burst
+            upload_bytes_per_second (float): Sustained attachment bytes per user
+            upload_burst_bytes (float): Attachment byte burst per user
+            max_keys (int): Tracked keys per limiter
+        """
+        self.user_messages = TokenBucketLimiter(messages_per_second, message_burst, max_keys)
+        self.ip_messages = TokenBucketLimiter(ip_messages_per_second, ip_message_burst, max_keys)
+        self.user_auth = TokenBucketLimiter(auth_attempts_per_minute / 60, auth_burst, max_keys)
+        self.ip_auth = TokenBucketLimiter(auth_attempts_per_minute / 60, auth_burst, max_keys)
+        self.user_upload_bytes = TokenBucketLimiter(upload_bytes_per_second, upload_burst_bytes, max_keys)
+        self.counters = EventCounters()
+
+    @classmethod
+    def from_config(cls, settings) -> 'ServerRateLimits':
+        """
+        Build limits from the rate_limit section of a Configuration.
+
+        Args:
+            settings (RateLimitSettings): Rate limit configuration section
+
+        Returns:
+            ServerRateLimits: Configured limits
+        """
+        return cls(
+            messages_per_second=settings.messages_per_second,
+            message_burst=settings.message_burst,
+            ip_messages_per_second=settings.ip_messages_per_second,
+            ip_message_burst=settings.ip_message_burst,
+            auth_attempts_per_minute=settings.auth_attempts_per_minute,
+            auth_burst=settings.auth_burst,
+            upload_bytes_per_second=settings.upload_mb_per_second * 1024 * 1024,
+            upload_burst_bytes=settings.upload_burst_mb * 1024 * 1024,
+            max_keys=settings.max_tracked_keys
+        )
+
+    def apply_config(self, settings) -> None:
+        """
+        Change every limit in place, keeping per-key bucket state.
+
+        Args:
+            settings (RateLimitSettings): Rate limit configuration section
+        """
+        self.user_messages.update(settings.messages_per_second, settings.message_burst)
+        self.ip_messages.update(settings.ip_messages_per_second, settings.ip_message_burst)
+        for limiter in (self.user_auth, self.ip_auth):
+            limiter.update(settings.auth_attempts_per_minute / 60, settings.auth_burst)
+        self.user_upload_bytes.update(
+            settings.upload_mb_per_second * 1024 * 1024,
+            settings.upload_burst_mb * 1024 * 1024
+        )
+        for limiter in (self.user_messages, self.ip_messages, self.user_auth, self.ip_auth, self.user_upload_bytes):
+            limiter.max_keys = settings.max_tracked_keys
+
+    def allow_message(self, username: str, ip_address: str = None) -> bool:
+        """
+        Check a chat message against the per-user and per-IP limits.
+
+        Returns:
+            bool: True if the message may be processed
+        """
+        if not self.user_messages.allow(username):
+            self.counters.increment('message_throttled_user')
+            return False
+        if ip_address is not None and not self.ip_messages.allow(ip_address):
+            self.counters.increment('message_throttled_ip')
+            return False
+        return True
+
+    def allow_upload(self, username: str, size: int) -> bool:
+        """
+        Check a chunk of attachment data against the per-user byte limit.
+
+        Returns:
+            bool: True if the chunk may be stored
+        """
+        if not self.user_upload_bytes.allow(username, cost=size):
+            self.counters.increment('upload_throttled_user')
+            return False
+        return True
+
+    def allow_auth(self, username: str, ip_address: str = None) -> bool:
+        """
+        Check a login attempt against the per-user and per-IP limits.
+
+        Returns:
+            bool: True if the attempt may be verified
+        """
+        if ip_address is not None and not self.ip_auth.allow(ip_address):
+            self.counters.increment('auth_throttled_ip')
+            return False
+        if not self.user_auth.allow(username):
+            self.counters.increment('auth_throttled_user')
+            return False
+        return True
@@ -0,0 +1,393 @@
+"""
+Selector-based connection reactor for the distributed chat server.
+Multiplexes idle sockets on one thread and hands ready ones to a bounded pool.
+"""
+
+import logging
+import selectors
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, Optional
+from security.key_exchange import KeyExchange
+from utils.protocol import FrameBuffer
+from .session import ClientSession
+
+# Bytes taken from a ready socket per read
+RECV_SIZE = 64 * 1024
+
+# How often connections past their login deadline are looked for, in seconds
+HANDSHAKE_SWEEP_INTERVAL = 0.5
+
+class Connection:
+    # Slots keep the per-connection footprint small with many clients
+    __slots__ = ('socket', 'address', 'stage', 'deadline', 'frames', 'key_exchange', 'session')
+
+    def __init__(self, client_socket: socket.socket, address: tuple, deadline: float):
+        """
+        Track one socket from accept through login, and its partial frames.
+
+        Stages run 'tls' (only with TLS), 'key_exchange', 'auth', then
+        'session' once the user is logged in.
+
+        Args:
+            client_socket (socket): Accepted non-blocking socket
+            address (tuple): Client network address
+            deadline (float): time.monotonic() by which login must finish
+        """
+        self.socket = client_socket
+        self.address = address
+        self.stage = 'tls' if isinstance(client_socket, ssl.SSLSocket) else 'key_exchange'
+        self.deadline = deadline
+        self.frames = FrameBuffer()
+        # Set once the server's hello has been sent
+        self.key_exchange: Optional[KeyExchange] = None
+        # Set once the key exchange is done; registered after login
+        self.session: Optional[ClientSession] = None
+
+class SelectorReactor:
+    def __init__(
+        self,
+        server,
+        pool_size: int = 32
+    ):
+        """
+        Create a reactor driving a ChatServer.
+
+        One thread waits on every socket with selectors.DefaultSelector;
+        a socket is dispatched to the worker pool only when it is ready,
+        and is not watched again until its worker is done. A session is
+        therefore handled by at most one worker at a time, which keeps
+        each sender's messages in order.
+
+        Sockets are non-blocking: a worker reads what has arrived, keeps
+        any partial frame for next time and returns, so a slow client,
+        whether still in its TLS handshake, key exchange or login or
+        already chatting, never holds a worker. Connections that have not
+        logged in within the server's handshake_timeout are closed.
+
+        Args:
+            server (ChatServer): Server whose session logic is reused
+            pool_size (int): Worker threads for handshakes, decryption and storage
+        """
+        self.server = server
+        self.pool_size = pool_size
+        self.logger = logging.getLogger(__name__)
+
+        self.selector = selectors.DefaultSelector()
+        self.executor = ThreadPoolExecutor(
+            max_workers=pool_size,
+            thread_name_prefix='chat-worker'
+        )
+
+        # Selectors are not thread-safe: workers queue changes and wake us up.
+        # The lock keeps the wakeup pair open while anyone is posting to it
+        self._pending: deque = deque()
+        self._wakeup_receiver, self._wakeup_sender = socket.socketpair()
+        self._wakeup_receiver.setblocking(False)
+        self._wakeup_sender.setblocking(False)
+        self._wakeup_lock = threading.Lock()
+        self._closed = False
+        self._running = threading.Event()
+        self._server_socket: Optional[socket.socket] = None
+
+        # Connections still logging in; only touched on the reactor thread
+        self._handshaking: Dict[Connection, None] = {}
+
+    def _call_soon(self, callback: Callable, *args) -> None:
+        """
+        Run a callback on the reactor thread.
+        """
+        with self._wakeup_lock:
+            if self._closed:
+                return  # Shut down; nothing will run it
+            self._pending.append((callback, args))
+            try:
+                self._wakeup_sender.send(b'\0')
+            except BlockingIOError:
+                pass  # A wakeup is already pending
+            except OSError as e:
+                self.logger.debug(f"Reactor wakeup failed: {e}")
+
+    def _run_pending(self) -> None:
+        try:
+            while self._wakeup_receiver.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        while self._pending:
+            callback, args = self._pending.popleft()
+            callback(*args)
+
+    def _watch(self, connection: Connection, events: int = selectors.EVENT_READ) -> None:
+        if connection.stage == 'session':
+            self._handshaking.pop(connection, None)
+        elif connection.deadline <= time.monotonic():
+            # Kept busy by a trickle of bytes, so the sweep never finds it idle
+            self._expire(connection)
+            return
+        try:
+            self.selector.register(connection.socket, events, connection)
+        except (ValueError, KeyError, OSError):
+            # Closed while queued; the worker already cleaned it up
+            pass
+
+    def run(self, server_socket: socket.socket) -> None:
+        """
+        Serve connections until stop() is called.
+
+        Args:
+            server_socket (socket): Bound, listening socket
+        """
+        server_socket.setblocking(False)
+        self._server_socket = server_socket
+        self.selector.register(server_socket, selectors.EVENT_READ, 'accept')
+        self.selector.register(self._wakeup_receiver, selectors.EVENT_READ, 'wakeup')
+        self._running.set()
+        self.logger.info(f"[*] Reactor running with {self.pool_size} workers")
+
+        next_sweep = time.monotonic() + HANDSHAKE_SWEEP_INTERVAL
+        try:
+            while self._running.is_set():
+                # Only wake up on a timer while someone could miss their deadline
+                timeout = HANDSHAKE_SWEEP_INTERVAL if self._handshaking else None
+                for key, _ in self.selector.select(timeout):
+                    if key.data == 'accept':
+                        self._accept(server_socket)
+                    elif key.data == 'wakeup':
+                        self._run_pending()
+                    else:
+                        # Stop watching until the worker hands it back
+                        self.selector.unregister(key.fileobj)
+                        self.executor.submit(self._serve_ready, key.data)
+
+                now = time.monotonic()
+                if now >= next_sweep:
+                    next_sweep = now + HANDSHAKE_SWEEP_INTERVAL
+                    self._expire_handshakes(now)
+        finally:
+            with self._wakeup_lock:
+                self._closed = True
+                self._wakeup_receiver.close()
+                self._wakeup_sender.close()
+            self.selector.close()
+            self.executor.shutdown(wait=False)
+
+    def stop(self) -> None:
+        """
+        Ask the reactor loop to exit.
+        
+        The loop clears the flag itself, so the wakeup is always posted
+        while the loop, and with it the wakeup pair, is still alive.
+        """
+        self._call_soon(self._running.clear)
+
+    def stop_accepting(self) -> None:
+        """
+        Stop accepting new connections; existing sessions keep being served.
+        """
+        self._call_soon(self._unwatch_listener)
+
+    def _unwatch_listener(self) -> None:
+        try:
+            self.selector.unregister(self._server_socket)
+        except (ValueError, KeyError):
+            pass
+
+    def resize(self, pool_size: int) -> None:
+        """
+        Change the worker pool size without dropping connections.
+
+        A new executor takes all further work; the old one finishes what
+        it is running and then exits. Swapping on the reactor thread means
+        nothing is ever submitted to the executor being retired.
+
+        Args:
+            pool_size (int): New number of worker threads
+        """
+        self._call_soon(self._swap_executor, pool_size)
+
+    def _swap_executor(self, pool_size: int) -> None:
+        if pool_size == self.pool_size:
+            return
+        retired = self.executor
+        self.executor = ThreadPoolExecutor(
+            max_workers=pool_size,
+            thread_name_prefix='chat-worker'
+        )
+        self.pool_size = pool_size
+        retired.shutdown(wait=False)
+        self.logger.info(f"[*] Reactor resized to {pool_size} workers")
+
+    def run_steps(self, steps: Iterator) -> None:
+        """
+        Run a long task on the pool one step at a time.
+
+        Each step goes to the back of the pool's queue, so the task takes
+        turns with ready sockets instead of holding a worker throughout.
+
+        Args:
+            steps (Iterator): Generator doing one bounded piece of work per step
+        """
+        self._call_soon(self._submit_step, steps)
+
+    def _submit_step(self, steps: Iterator) -> None:
+        self.executor.submit(self._run_step, steps)
+
+    def _run_step(self, steps: Iterator) -> None:
+        try:
+            next(steps)
+        except StopIteration:
+            return
+        except Exception as e:
+            self.logger.error(f"[!] Background task error: {e}")
+            return
+        self._call_soon(self._submit_step, steps)
+
+    def _accept(self, server_socket: socket.socket) -> None:
+        """
+        Accept every pending connection without blocking the loop.
+        """
+        while True:
+            try:
+                client_socket, address = server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+
+            self.logger.debug(f"New connection from {address}")
+            if not self.server._admit_connection():
+                self.server._reject_connection(client_socket, address)
+                continue
+
+            client_socket.setblocking(False)
+            if self.server.ssl_context:
+                client_socket = self.server.ssl_context.wrap_socket(
+                    client_socket,
+                    server_side=True,
+                    do_handshake_on_connect=False
+                )
+            connection = Connection(client_socket, address, time.monotonic() + self.server.handshake_timeout)
+            self._handshaking[connection] = None
+            self.executor.submit(self._serve_ready, connection)
+
+    def _expire_handshakes(self, now: float) -> None:
+        """
+        Close connections still logging in past their deadline.
+        """
+        for connection in [c for c in self._handshaking if c.deadline <= now]:
+            try:
+                self.selector.unregister(connection.socket)
+            except (KeyError, ValueError):
+                # With a worker; checked again once it is handed back
+                continue
+            self._expire(connection)
+
+    def _expire(self, connection: Connection) -> None:
+        self._handshaking.pop(connection, None)
+        self.logger.warning(
+            f"[!] {connection.address} did not log in within {self.server.handshake_timeout}s"
+        )
+        self._finish(connection)
+
+    def _serve_ready(self, connection: Connection) -> None:
+        """
+        Worker: advance a ready connection as far as the bytes it has allow.
+        """
+        try:
+            if connection.stage == 'tls':
+                waiting_for = self._continue_tls(connection)
+                if waiting_for:
+                    self._call_soon(self._watch, connection, waiting_for)
+                    return
+            if connection.stage == 'key_exchange' and connection.key_exchange is None:
+                connection.key_exchange = self.server._begin_key_exchange(connection.socket)
+            if not self._read_frames(connection):
+                self._finish(connection)
+                return
+        except Exception as e:
+            username = connection.session.username if connection.session else None
+            self.logger.error(f"[!] Client handling error for {username or connection.address}: {e}")
+            self._finish(connection)
+            return
+
+        self._call_soon(self._watch, connection)
+
+    def _continue_tls(self, connection: Connection) -> int:
+        """
+        Take the TLS handshake a step further.
+
+        Returns:
+            int: Selector event to wait for, or 0 once the handshake is done
+        """
+        try:
+            connection.socket.do_handshake()
+        except ssl.SSLWantReadError:
+            return selectors.EVENT_READ
+        except ssl.SSLWantWriteError:
+            return selectors.EVENT_WRITE
+        self.logger.debug(
+            f"TLS established with {connection.address} "
+            f"(resumed={connection.socket.session_reused})"
+        )
+        connection.stage = 'key_exchange'
+        return 0
+
+    def _read_frames(self, connection: Connection) -> bool:
+        """
+        Read until the socket has nothing more and handle each complete frame.
+
+        Returns:
+            bool: False if the connection should be closed
+        """
+        while True:
+            try:
+                data = connection.socket.recv(RECV_SIZE)
+            except (BlockingIOError, ssl.SSLWantReadError, ssl.SSLWantWriteError):
+                return True
+            if not data:
+                return False
+            for frame in connection.frames.feed(data):
+                if not self._handle_frame(connection, frame):
+                    return False
+
+    def _handle_frame(self, connection: Connection, frame: bytes) -> bool:
+        """
+        Handle one frame according to how far the connection has got.
+
+        Returns:
+            bool: False if login failed and the connection should be closed
+        """
+        server = self.server
+        if connection.stage == 'session':
+            server._process_frame(connection.session, frame)
+            return True
+
+        if connection.stage == 'key_exchange':
+            connection.session = server._complete_key_exchange(
+                connection.socket,
+                connection.address,
+                connection.key_exchange,
+                frame
+            )
+            connection.key_exchange = None
+            connection.stage = 'auth'
+            server._send_to_session(connection.session, "AUTH_REQUEST")
+            return True
+
+        username = server._check_credentials(connection.session, frame)
+        if not username:
+            return False
+        server._register_session(connection.session, username)
+        connection.stage = 'session'
+        return True
+
+    def _finish(self, connection: Connection) -> None:
+        try:
+            self.server._close_client(connection.socket, connection.session)
+        finally:
+            self.server._release_connection()
+            if connection.stage != 'session':
+                self._call_soon(self._handshaking.pop, connection, None)
@@ -1,11 +1,39 @@
 import socket
+import ssl
 import threading
 import json
 import logging
-from typing import List, Dict, Optional
+import random
+import time
+from typing import Iterator, List, Dict, Optional
+from security.cipher_backends import resolve_backend_name
 from security.encryption import SecureEncryption
+from security.key_exchange import KeyExchange
+from utils.protocol import CHUNK_SIZE, FrameError, is_chunk, pack_chunk, recv_frame, send_frame, unpack_chunk
+from .attachments import AttachmentStore
 from .authentication import AuthenticationManager
-from .database import DatabaseManager
+from .dedup import DeduplicationWindow
+from .notifications import NotificationIndex
+from .presence import PresenceTracker
+from .profiling import Profiler
+from .rate_limiter import ServerRateLimits
+from .reactor import SelectorReactor
+from .session import ClientSession, SessionRegistry
+from .storage import StorageBackend
+from .tracing import MessageTracer
+
+# Largest page of history a client can request at once
+HISTORY_PAGE_LIMIT = 200
+
+# Attachment uploads one session may have in progress at once
+MAX_UPLOADS_PER_SESSION = 4
+
+# How often the accept loop and drain check for progress, in seconds
+ACCEPT_POLL_INTERVAL = 0.5
+DRAIN_POLL_INTERVAL = 0.1
+
+# Sent in plain text, before the key exchange, when the server is full
+SERVER_BUSY_FRAME = json.dumps({'type': 'server_busy'}).encode('utf-8')
 
 class ChatServer:
     def __init__(
@@ -13,7 +41,25 @@ class ChatServer:
         host: str = '0.0.0.0', 
         port: int = 5000, 
         max_connections: int = 100,
-        debug: bool = False  # Add debug parameter
+        debug: bool = False,  # Add debug parameter
+        ssl_context: Optional[ssl.SSLContext] = None,
+        cipher_backend: str = 'fernet',
+        auth_manager: Optional[AuthenticationManager] = None,
+        database_manager: Optional[StorageBackend] = None,
+        rate_limits: Optional[ServerRateLimits] = None,
+        mode: str = 'threaded',
+        worker_pool_size: int = 32,
+        handshake_timeout: float = 10.0,
+        presence_push_interval: float = 1.0,
+        presence_flush_interval: float = 5.0,
+        ack_flush_interval: float = 0.05,
+        dedup_window: int = 100000,
+        listen_fd: Optional[int] = None,
+        trace_sample_rate: float = 0.0,
+        trace_buffer_size: int = 4096,
+        profile_dir: str = 'profiles',
+        attachment_dir: str = 'attachments',
+        max_attachment_size: int = 50 * 1024 * 1024
     ):
         """
         Initialize the chat server with network and system configurations.
@@ -23,10 +69,50 @@ class ChatServer:
             port (int): Server listening port
             max_connections (int): Maximum simultaneous client connections
             debug (bool): Enable debug logging
+            ssl_context (ssl.SSLContext, optional): Shared server context; enables TLS
+            cipher_backend (str): Message cipher, 'fernet', 'aes-gcm',
+                'chacha20-poly1305' or 'aead' to pick by CPU support
+            auth_manager (AuthenticationManager, optional): Defaults to one
+                sharing database_manager's storage
+            database_manager (StorageBackend, optional): Defaults to the SQLite
+                chat_database.db; see server.storage.create_storage
+            rate_limits (ServerRateLimits, optional): Per-user and per-IP limits
+            mode (str): 'threaded' for a thread per client, or 'reactor' to
+                multiplex sockets and process ready ones on a bounded pool
+            worker_pool_size (int): Worker threads in reactor mode
+            handshake_timeout (float): Seconds a new connection has to finish
+                TLS, key exchange and login before it is dropped
+            presence_push_interval (float): Minimum seconds between presence pushes
+            presence_flush_interval (float): Seconds between last-seen batch writes
+            ack_flush_interval (float): Longest an ACK waits for a frame to ride on
+            dedup_window (int): Recent client message IDs remembered for de-duplication
+            listen_fd (int, optional): Inherited listening socket to serve
+                instead of binding host and port, see server.handoff
+            trace_sample_rate (float): Fraction of messages traced per stage
+            trace_buffer_size (int): Finished traces kept for dumping
+            profile_dir (str): Directory on-demand profiles are written to
+            attachment_dir (str): Directory attachments are stored in by content hash
+            max_attachment_size (int): Largest accepted attachment in bytes
         """
+        if mode not in ('threaded', 'reactor'):
+            raise ValueError(f"Unknown server mode: {mode}")
+
         self.host = host
         self.port = port
         self.max_connections = max_connections
+        self.ssl_context = ssl_context
+        self.cipher_backend = resolve_backend_name(cipher_backend)
+        self.mode = mode
+        self.worker_pool_size = worker_pool_size
+        self.handshake_timeout = handshake_timeout
+        self.reactor: Optional[SelectorReactor] = None
+        self.ready = threading.Event()
+
+        # Listening socket, possibly inherited from a predecessor process
+        self.listen_fd = listen_fd
+        self.listen_socket: Optional[socket.socket] = None
+        self._draining = threading.Event()
+        self._drained = threading.Event()
         
         # Configure logging based on debug mode
         logging.basicConfig(
@@ -35,40 +121,271 @@ class ChatServer:
         )
         self.logger = logging.getLogger(__name__)
         
-        # Security and management components
-        self.encryption = SecureEncryption()
-        self.auth_manager = AuthenticationManager()
-        self.database_manager = DatabaseManager()
+        # Security and management components; message ciphers are per session
+        if database_manager is None:
+            # sqlite3 is only loaded when no other backend is supplied
+            from .database import DatabaseManager
+            database_manager = DatabaseManager()
+        self.database_manager = database_manager
+        self.auth_manager = auth_manager or AuthenticationManager(storage=self.database_manager)
         
         # Client tracking
-        self.clients: Dict[str, socket.socket] = {}
-        self.client_locks: List[threading.Lock] = [
-            threading.Lock() for _ in range(max_connections)
-        ]
+        self.clients = SessionRegistry()
+
+        # Presence is kept in memory and written/pushed in coalesced batches
+        self.presence = PresenceTracker(
+            self.database_manager,
+            push_interval=presence_push_interval,
+            flush_interval=presence_flush_interval
+        )
+
+        # Watched keywords of connected users, matched once per room message
+        self.notifications = NotificationIndex()
+
+        # Content-addressed attachments; the directory is created on first upload
+        self.attachment_dir = attachment_dir
+        self.max_attachment_size = max_attachment_size
+        self._attachments: Optional[AttachmentStore] = None
+        self._attachments_lock = threading.Lock()
+
+        # Delivery acknowledgements and de-duplication of resent messages
+        self.dedup = DeduplicationWindow(max_entries=dedup_window)
+        self.ack_flush_interval = ack_flush_interval
+        self._ack_lock = threading.Lock()
+        self._sessions_with_acks = set()
+        self._shutdown = threading.Event()
+
+        # Opt-in latency tracing and on-demand profiling of the message path
+        self.tracer = MessageTracer(sample_rate=trace_sample_rate, capacity=trace_buffer_size)
+        self.profiler = Profiler(output_dir=profile_dir)
+
+        # Admission control: connections in any state, capped at max_connections
+        self.rate_limits = rate_limits or ServerRateLimits()
+        self._connection_count = 0
+        self._connection_lock = threading.Lock()
 
     def start(self):
         """
         Start the chat server and begin listening for client connections.
+        
+        Returns after drain() completes or on KeyboardInterrupt.
         """
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.bind((self.host, self.port))
-        server_socket.listen(self.max_connections)
+        server_socket = self._create_listener()
+        self.listen_socket = server_socket
+
+        # Port 0 asks the OS for a free port; report the real one
+        self.port = server_socket.getsockname()[1]
+        self.presence.start(self._push_presence)
+        ack_flusher = threading.Thread(target=self._run_ack_flusher, name='ack-flusher', daemon=True)
+        ack_flusher.start()
+        if self.mode == 'reactor':
+            # Exists before ready is set, so drain() can always reach it
+            self.reactor = SelectorReactor(self, pool_size=self.worker_pool_size)
+        self.ready.set()
         
         self.logger.info(f"[*] Server listening on {self.host}:{self.port}")
+
+        if self.mode == 'reactor':
+            try:
+                self.reactor.run(server_socket)
+            except KeyboardInterrupt:
+                self.logger.info("[!] Server shutting down...")
+            finally:
+                server_socket.close()
+                self._stop_background(ack_flusher)
+            return
         
+        # Wake up periodically so a drain can stop the accept loop
+        server_socket.settimeout(ACCEPT_POLL_INTERVAL)
         try:
-            while True:
-                client_socket, address = server_socket.accept()
+            while not self._draining.is_set():
+                try:
+                    client_socket, address = server_socket.accept()
+                except socket.timeout:
+                    continue
                 self.logger.debug(f"New connection from {address}")
+                if not self._admit_connection():
+                    self._reject_connection(client_socket, address)
+                    continue
+                if self.ssl_context:
+                    # Handshake runs in the client thread, not the accept loop
+                    client_socket = self.ssl_context.wrap_socket(
+                        client_socket,
+                        server_side=True,
+                        do_handshake_on_connect=False
+                    )
                 client_thread = threading.Thread(
-                    target=self.handle_client, 
+                    target=self._serve_admitted, 
                     args=(client_socket, address)
                 )
                 client_thread.start()
+            self._drained.wait()
         except KeyboardInterrupt:
             self.logger.info("[!] Server shutting down...")
         finally:
             server_socket.close()
+            self._stop_background(ack_flusher)
+
+    def _stop_background(self, ack_flusher: threading.Thread):
+        """
+        Stop the ACK flusher, presence and notification threads, however start() is exiting.
+        """
+        self._shutdown.set()
+        ack_flusher.join()
+        self.presence.stop()
+        self.notifications.close()
+
+    def _create_listener(self) -> socket.socket:
+        """
+        Bind a new listening socket, or adopt the one a predecessor passed on.
+        """
+        if self.listen_fd is not None:
+            server_socket = socket.socket(fileno=self.listen_fd)
+            self.logger.info(f"[*] Serving inherited listening socket (fd {self.listen_fd})")
+            return server_socket
+
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server_socket.bind((self.host, self.port))
+        server_socket.listen(self.max_connections)
+        return server_socket
+
+    def drain(self, reconnect_window: float = 5.0, timeout: float = 30.0) -> bool:
+        """
+        Stop accepting, send every client a reconnect hint and shut down.
+        
+        Each client is told to reconnect after its own random delay within
+        reconnect_window, so a restart spreads logins (and their PBKDF2
+        cost) out instead of having everyone log in at once. Pending ACKs
+        ride on the hint, and last-seen times are flushed as start()
+        returns. Call it from any thread but the one running start().
+        
+        Args:
+            reconnect_window (float): Seconds over which reconnects are spread
+            timeout (float): Seconds to wait for connections to close
+        
+        Returns:
+            bool: True if every connection closed before the timeout
+        """
+        self._draining.set()
+        if self.reactor:
+            self.reactor.stop_accepting()
+        self.logger.info("[*] Draining: no longer accepting connections")
+
+        # Sessions still authenticating are picked up on a later pass
+        notified = set()
+        deadline = time.monotonic() + timeout
+        while True:
+            for session in self.clients.snapshot():
+                if session not in notified:
+                    notified.add(session)
+                    self._send_reconnect(session, random.uniform(0, reconnect_window))
+            with self._connection_lock:
+                remaining = self._connection_count
+            if remaining == 0 or time.monotonic() >= deadline:
+                break
+            time.sleep(DRAIN_POLL_INTERVAL)
+
+        if remaining:
+            self.logger.warning(f"[!] Drain timed out with {remaining} connections open")
+        else:
+            self.logger.info(f"[*] Drained {len(notified)} sessions")
+
+        self._shutdown.set()
+        self._drained.set()
+        if self.reactor:
+            self.reactor.stop()
+        return remaining == 0
+
+    def _send_reconnect(self, session: ClientSession, delay: float):
+        try:
+            self._send_to_session(session, json.dumps({
+                'type': 'reconnect',
+                'delay': round(delay, 3)
+            }))
+        except OSError as e:
+            self.logger.debug(f"Reconnect hint to {session.username} failed: {e}")
+        self._close_session(session)
+
+    def _admit_connection(self) -> bool:
+        """
+        Reserve a connection slot if the server is below max_connections.
+        
+        Returns:
+            bool: True if the connection may proceed
+        """
+        with self._connection_lock:
+            if self._connection_count >= self.max_connections:
+                return False
+            self._connection_count += 1
+            return True
+
+    def _release_connection(self):
+        with self._connection_lock:
+            self._connection_count -= 1
+
+    def _reject_connection(self, client_socket: socket.socket, address: tuple):
+        """
+        Turn a connection away without spending a thread or a handshake on it.
+        
+        Args:
+            client_socket (socket): Freshly accepted socket
+            address (tuple): Client network address
+        """
+        self.rate_limits.counters.increment('connection_rejected')
+        self.logger.warning(f"[!] At capacity, rejecting connection from {address}")
+        if not self.ssl_context:
+            try:
+                client_socket.setblocking(False)
+                send_frame(client_socket, SERVER_BUSY_FRAME)
+            except OSError:
+                pass
+        client_socket.close()
+
+    def _serve_admitted(self, client_socket: socket.socket, address: tuple):
+        try:
+            self.handle_client(client_socket, address)
+        finally:
+            self._release_connection()
+
+    def get_throttle_stats(self) -> Dict[str, int]:
+        """
+        Report throttling and admission counters.
+        
+        Returns:
+            Dict of event name to count
+        """
+        return self.rate_limits.counters.snapshot()
+
+    def apply_config(self, config):
+        """
+        Apply reloadable settings from a Configuration while running.
+
+        Connected clients are untouched: limits keep their bucket state,
+        loops pick up new intervals on their next wait, and the reactor
+        swaps its worker pool without dropping sessions. Host, port, mode
+        and TLS settings still need a restart.
+
+        Args:
+            config (Configuration): Newly loaded configuration
+        """
+        level = 'DEBUG' if config.server.debug else config.logging.level.upper()
+        logging.getLogger().setLevel(level)
+
+        self.max_connections = config.rate_limit.max_connections
+        self.handshake_timeout = config.server.handshake_timeout
+        self.rate_limits.apply_config(config.rate_limit)
+
+        self.presence.push_interval = config.presence.push_interval
+        self.presence.flush_interval = config.presence.flush_interval
+        self.ack_flush_interval = config.delivery.ack_flush_interval
+        self.dedup.max_entries = config.delivery.dedup_window
+        self.tracer.sample_rate = config.tracing.sample_rate
+        self.max_attachment_size = config.attachments.max_size
+
+        self.worker_pool_size = config.server.worker_pool_size
+        if self.reactor:
+            self.reactor.resize(self.worker_pool_size)
 
     def handle_client(self, client_socket: socket.socket, address: tuple):
         """
@@ -78,91 +395,830 @@ class ChatServer:
             client_socket (socket): Connected client socket
             address (tuple): Client network address
         """
-        username = None  # Initialize username 
+        session = None
         try:
-            # Authentication process
-            username = self._authenticate_client(client_socket)
-            if not username:
-                client_socket.close()
+            # A connection holds a slot from accept, so one that never logs
+            # in is dropped at the deadline instead of keeping it forever
+            client_socket.settimeout(self.handshake_timeout)
+            deadline = time.monotonic() + self.handshake_timeout
+            session = self._open_session(client_socket, address, deadline)
+            if session is None:
                 return
-
-            # Add client to active connections
-            with self.client_locks[len(self.clients) % self.max_connections]:
-                self.clients[username] = client_socket
-            
-            self.logger.info(f"User {username} authenticated and connected")
+            client_socket.settimeout(None)
 
             # Message handling loop
             while True:
-                data = client_socket.recv(1024).decode('utf-8')
-                if not data:
+                data = recv_frame(client_socket)
+                if data is None:
                     break
+                self._process_frame(session, data)
 
-                # Decrypt and process message
-                decrypted_message = self.encryption.decrypt(data)
-                self.logger.debug(f"Received message from {username}: {decrypted_message}")
-                self._broadcast_message(username, decrypted_message)
-
+        except socket.timeout:
+            self.logger.warning(f"[!] {address} did not log in within {self.handshake_timeout}s")
         except Exception as e:
+            username = session.username if session else None
             self.logger.error(f"[!] Client handling error for {username}: {e}")
         finally:
-            # Cleanup
-            if username and username in self.clients:
-                del self.clients[username]
-                self.logger.info(f"User {username} disconnected")
+            self._close_client(client_socket, session)
+
+    def _open_session(
+        self,
+        client_socket: socket.socket,
+        address: tuple,
+        deadline: Optional[float] = None
+    ) -> Optional[ClientSession]:
+        """
+        Run the TLS handshake, key exchange and login for a new connection.
+        
+        Args:
+            client_socket (socket): Connected client socket
+            address (tuple): Client network address
+            deadline (float, optional): time.monotonic() by which each
+                client frame of the handshake must have arrived
+        
+        Returns:
+            Optional registered session, None if authentication failed
+        """
+        if isinstance(client_socket, ssl.SSLSocket):
+            client_socket.do_handshake()
+            self.logger.debug(
+                f"TLS established with {address} "
+                f"(resumed={client_socket.session_reused})"
+            )
+
+        # Agree on a per-connection key before anything else is sent
+        session = self._establish_session(client_socket, address, deadline)
+
+        # Authentication process
+        username = self._authenticate_client(session, deadline)
+        if not username:
             client_socket.close()
+            return None
+        try:
+            self._register_session(session, username)
+        except Exception:
+            # Already registered; the caller never gets the session to remove
+            self._close_client(client_socket, session)
+            raise
+        return session
+
+    def _register_session(self, session: ClientSession, username: str):
+        """
+        Make a freshly authenticated session the user's active connection.
+        
+        Args:
+            session (ClientSession): Session that just logged in
+            username (str): Authenticated username
+        """
+        session.username = username
+
+        # Add client to active connections. Held until any older connection
+        # has finished the frame it is on, so resends on this one find
+        # everything it stored in the dedup window; a login arriving
+        # meanwhile waits on this session in turn
+        with session.process_lock:
+            previous = self.clients.add(session)
+            if previous is not None:
+                self.logger.info(f"User {username} logged in again; closing older connection")
+                self.notifications.unsubscribe(username)
+                self._close_session(previous)
+                with previous.process_lock:
+                    previous.superseded = True
+        
+        self.logger.info(f"User {username} authenticated and connected")
+        self.presence.connected(username)
+        self._send_to_session(session, json.dumps({
+            'type': 'presence',
+            'online': self.presence.online_users()
+        }))
+        self._deliver_offline_messages(session)
+
+    def _process_frame(self, session: ClientSession, data: bytes):
+        """
+        Throttle, decrypt and dispatch one frame from an authenticated client.
+        
+        Args:
+            session (ClientSession): Sending client's session
+            data (bytes): Encrypted frame payload
+        """
+        # A connection replaced by a newer login drops its remaining frames;
+        # the client resends whatever is unacknowledged on the new one
+        with session.process_lock:
+            if session.superseded:
+                return
+            self.tracer.begin()
+            try:
+                with self.profiler.profiling():
+                    # Throttled messages are dropped before paying for decryption.
+                    # While uploading, the frame may be file data, which is limited
+                    # by bytes rather than the message rate once it is decrypted
+                    ip_address = session.address[0] if session.address else None
+                    uploading = bool(session.uploads)
+                    if not uploading and not self._allow_message(session, ip_address):
+                        return
+                    self.tracer.mark('throttle')
+
+                    # Decrypt and process message
+                    payload = session.cipher.decrypt_bytes(data)
+                    if is_chunk(payload):
+                        self.tracer.label('chunk')
+                        self._receive_chunk(session, payload, charged=not uploading)
+                        return
+                    if uploading and not self._allow_message(session, ip_address):
+                        return
+                    decrypted_message = payload.decode('utf-8')
+                    self.tracer.mark('decrypt')
+                    self.logger.debug(f"Received message from {session.username}: {decrypted_message}")
+                    self._handle_message(session, decrypted_message)
+            finally:
+                self.tracer.end()
+
+    def _allow_message(self, session: ClientSession, ip_address: Optional[str]) -> bool:
+        if self.rate_limits.allow_message(session.username, ip_address):
+            return True
+        self._send_error(session, "Rate limit exceeded, message dropped")
+        return False
+
+    def _close_client(
+        self,
+        client_socket: socket.socket,
+        session: Optional[ClientSession]
+    ):
+        """
+        Unregister a client and close its socket.
+        
+        Args:
+            client_socket (socket): Client socket
+            session (ClientSession, optional): Session, if one was opened
+        """
+        # Only removes this connection, not a newer login
+        username = session.username if session else None
+        if username and self.clients.remove(username, session):
+            self.presence.disconnected(username)
+            self.notifications.unsubscribe(username)
+            self.logger.info(f"User {username} disconnected")
+        if session:
+            self._abort_uploads(session)
+        client_socket.close()
+
+    def _abort_uploads(self, session: ClientSession):
+        for upload in session.uploads.values():
+            upload.abort()
+        session.uploads.clear()
+
+    def _establish_session(
+        self,
+        client_socket: socket.socket,
+        address: tuple,
+        deadline: Optional[float] = None
+    ) -> ClientSession:
+        """
+        Run the X25519 key exchange and create the client's session.
+        
+        Args:
+            client_socket (socket): Connected client socket
+            address (tuple): Client network address
+            deadline (float, optional): time.monotonic() by which the client's hello must arrive
+        
+        Returns:
+            ClientSession: Session holding the per-connection cipher
+        """
+        key_exchange = self._begin_key_exchange(client_socket)
+        hello = recv_frame(client_socket, deadline)
+        if hello is None:
+            raise ConnectionError("Client closed during key exchange")
+        return self._complete_key_exchange(client_socket, address, key_exchange, hello)
 
-    def _authenticate_client(self, client_socket: socket.socket) -> Optional[str]:
+    def _begin_key_exchange(self, client_socket: socket.socket) -> KeyExchange:
+        """
+        Send the server's key exchange hello, announcing the cipher.
+        """
+        key_exchange = KeyExchange()
+        send_frame(client_socket, key_exchange.hello_frame(cipher=self.cipher_backend))
+        return key_exchange
+
+    def _complete_key_exchange(
+        self,
+        client_socket: socket.socket,
+        address: tuple,
+        key_exchange: KeyExchange,
+        hello: bytes
+    ) -> ClientSession:
+        """
+        Derive the session key from the client's hello and create its session.
+        
+        Args:
+            client_socket (socket): Connected client socket
+            address (tuple): Client network address
+            key_exchange (KeyExchange): Keys whose hello was sent to the client
+            hello (bytes): Client's hello frame
+        
+        Returns:
+            ClientSession: Session holding the per-connection cipher
+        """
+        client_public_key, _ = KeyExchange.parse_hello(hello)
+        session_key = key_exchange.derive_session_key(client_public_key, is_server=True)
+        return ClientSession(
+            client_socket,
+            address,
+            SecureEncryption.from_session_key(session_key, backend=self.cipher_backend)
+        )
+
+    def _send_to_session(self, session: ClientSession, message: str):
+        """
+        Encrypt a message with the session's key and send it as one frame.
+        
+        Pending ACKs for the session are appended to JSON object messages,
+        so acknowledgements cost no extra frame when traffic is flowing.
+        
+        Args:
+            session (ClientSession): Recipient session
+            message (str): Plain-text message
+        """
+        with session.send_lock:
+            if session.pending_acks and message.startswith('{'):
+                message = f'{message[:-1]}, "acks": {json.dumps(session.pending_acks)}}}'
+                session.pending_acks = []
+            frame = session.cipher.encrypt_bytes(message.encode('utf-8'))
+            self._send_frame(session, frame)
+
+    def _send_frame(self, session: ClientSession, frame: bytes):
+        """
+        Send one encrypted frame; the caller holds the session's send lock.
+        
+        A send that fails may have written part of the frame, and anything
+        sent after it would be misread, so the session is closed instead.
+        """
+        try:
+            send_frame(session.socket, frame)
+        except OSError:
+            self._close_session(session)
+            raise
+
+    def _close_session(self, session: ClientSession):
+        """
+        Shut down a session's socket from another thread.
+        
+        The owner sees end-of-stream and closes the socket itself, so the
+        file descriptor is never released while it is still in use.
+        
+        Args:
+            session (ClientSession): Session to close
+        """
+        try:
+            session.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _authenticate_client(self, session: ClientSession, deadline: Optional[float] = None) -> Optional[str]:
         """
         Authenticate incoming client connection.
         
         Args:
-            client_socket (socket): Client connection socket
+            session (ClientSession): Session with an established key
+            deadline (float, optional): time.monotonic() by which the credentials must arrive
         
         Returns:
             Optional username if authentication successful
         """
         try:
             # Send authentication request
-            client_socket.send("AUTH_REQUEST".encode('utf-8'))
+            self._send_to_session(session, "AUTH_REQUEST")
             
-            # Receive credentials
-            credentials = client_socket.recv(1024).decode('utf-8')
-            username, password = credentials.split(':')
-            
-            # Verify credentials
-            if self.auth_manager.authenticate_user(username, password):
-                client_socket.send("AUTH_SUCCESS".encode('utf-8'))
-                self.logger.info(f"Authentication successful for user {username}")
-                return username
-            
-            client_socket.send("AUTH_FAILED".encode('utf-8'))
-            self.logger.warning(f"Authentication failed for user {username}")
-            return None
+            # Receive credentials, encrypted with the session key
+            frame = recv_frame(session.socket, deadline)
+            if frame is None:
+                return None
+            return self._check_credentials(session, frame)
         
         except Exception as e:
             self.logger.error(f"[!] Authentication error: {e}")
             return None
 
-    def _broadcast_message(self, sender: str, message: str):
+    def _check_credentials(self, session: ClientSession, frame: bytes) -> Optional[str]:
+        """
+        Verify an encrypted credentials frame and tell the client the result.
+        
+        Args:
+            session (ClientSession): Session with an established key
+            frame (bytes): Encrypted "username:password" frame
+        
+        Returns:
+            Optional username if authentication successful
+        """
+        credentials = session.cipher.decrypt_bytes(frame).decode('utf-8')
+        username, password = credentials.split(':', 1)
+
+        # Throttle guessing before paying for password hashing
+        ip_address = session.address[0] if session.address else None
+        if not self.rate_limits.allow_auth(username, ip_address):
+            self._send_to_session(session, "AUTH_THROTTLED")
+            self.logger.warning(f"Authentication throttled for user {username}")
+            return None
+        
+        # Verify credentials
+        if self.auth_manager.authenticate_user(username, password):
+            self._send_to_session(session, "AUTH_SUCCESS")
+            self.logger.info(f"Authentication successful for user {username}")
+            return username
+        
+        self._send_to_session(session, "AUTH_FAILED")
+        self.logger.warning(f"Authentication failed for user {username}")
+        return None
+
+    def _handle_message(self, session: ClientSession, decrypted_message: str):
+        """
+        Dispatch a decrypted client message by its type.
+        
+        Clients send JSON envelopes with a 'type' field; anything without
+        one is treated as a room message. The sender is always the
+        authenticated username, never a name taken from the payload.
+        
+        Args:
+            session (ClientSession): Sending client's session
+            decrypted_message (str): Decrypted message payload
+        """
+        try:
+            payload = json.loads(decrypted_message)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            payload = {'message': decrypted_message}
+
+        message_type = payload.get('type', 'message')
+        self.tracer.label(str(message_type))
+        self.tracer.mark('parse')
+        if message_type in ('message', 'direct', 'upload_end'):
+            self.presence.activity(session.username)
+
+            # A resend after reconnect is acknowledged again but not re-stored
+            client_message_id = payload.get('msg_id')
+            if client_message_id is not None:
+                stored_id = self.dedup.get(session.username, client_message_id)
+                if stored_id is not None:
+                    self.logger.debug(f"Duplicate message {client_message_id} from {session.username}")
+                    self._queue_ack(session, client_message_id, stored_id)
+                    return
+
+            # Rejections echo client_message_id, so the client stops resending
+            if message_type == 'direct':
+                stored_id = self._send_direct_message(
+                    session, payload.get('to'), payload.get('message', ''), client_message_id
+                )
+            elif message_type == 'upload_end':
+                stored_id = self._finish_upload(session, payload.get('transfer_id'), client_message_id)
+            else:
+                stored_id = self._broadcast_message(session.username, payload.get('message', ''))
+
+            if client_message_id is not None and stored_id is not None:
+                self.dedup.record(session.username, client_message_id, stored_id)
+                self._queue_ack(session, client_message_id, stored_id)
+        elif message_type == 'typing':
+            self.presence.typing(session.username, bool(payload.get('typing', True)))
+        elif message_type == 'history':
+            self._send_history(session, payload.get('before_id'), payload.get('limit', 50))
+        elif message_type == 'upload_start':
+            self._start_upload(session, payload)
+        elif message_type == 'upload_abort':
+            upload = session.uploads.pop(str(payload.get('transfer_id')), None)
+            if upload is not None:
+                upload.abort()
+        elif message_type == 'download':
+            self._send_attachment(session, payload.get('transfer_id'), payload.get('sha256'))
+        elif message_type == 'subscribe':
+            self._subscribe(session, payload.get('keywords', []), payload.get('notify_only', False))
+        else:
+            self._send_error(session, f"Unknown message type: {message_type}")
+
+    def _queue_ack(self, session: ClientSession, client_message_id, stored_id: int):
+        """
+        Queue an acknowledgement carrying the stored row ID.
+        
+        The ACK rides on the next frame sent to the client; if none goes
+        out within ack_flush_interval, the flusher sends it on its own,
+        batched with any others that accumulated.
+        
+        Args:
+            session (ClientSession): Sender's session
+            client_message_id: Client-generated message ID
+            stored_id (int): Row ID from the database
+        """
+        with session.send_lock:
+            session.pending_acks.append([client_message_id, stored_id])
+        with self._ack_lock:
+            self._sessions_with_acks.add(session)
+
+    def _flush_acks(self):
+        """
+        Send standalone ACK frames for sessions with nothing to piggyback on.
+        """
+        with self._ack_lock:
+            sessions, self._sessions_with_acks = self._sessions_with_acks, set()
+        for session in sessions:
+            with session.send_lock:
+                acks, session.pending_acks = session.pending_acks, []
+            if not acks:
+                continue  # Already piggybacked
+            try:
+                self._send_to_session(session, json.dumps({'type': 'ack', 'acks': acks}))
+            except OSError as e:
+                # The client resends unacknowledged messages after reconnecting
+                self.logger.debug(f"ACK to {session.username} failed: {e}")
+
+    def _run_ack_flusher(self):
+        while not self._shutdown.wait(self.ack_flush_interval):
+            try:
+                self._flush_acks()
+            except Exception as e:
+                self.logger.error(f"[!] ACK flush error: {e}")
+
+    def _send_error(self, session: ClientSession, error: str, client_message_id=None):
+        """
+        Tell a client something it sent was refused.
+        
+        Args:
+            session (ClientSession): Client to tell
+            error (str): Reason shown to the user
+            client_message_id: ID of the refused tracked message, if any;
+                echoed back so the client drops it instead of resending it
+        """
+        error_data = {'type': 'error', 'message': error}
+        if client_message_id is not None:
+            error_data['msg_id'] = client_message_id
+        self._send_to_session(session, json.dumps(error_data))
+
+    def _send_direct_message(
+        self,
+        session: ClientSession,
+        recipient: str,
+        message: str,
+        client_message_id=None
+    ) -> Optional[int]:
+        """
+        Route a direct message to one user.
+        
+        The recipient is found with a single lookup in the connection table.
+        The message is stored as undelivered and only marked delivered once
+        it has been sent, so if they are offline or the send fails it is
+        delivered at their next login.
+        
+        Args:
+            session (ClientSession): Sending client's session
+            recipient (str): Recipient's username
+            message (str): Message content
+            client_message_id: Sender's message ID, echoed in rejections
+        
+        Returns:
+            Optional stored message ID, None if the message was rejected
+        """
+        sender = session.username
+        if not recipient or not isinstance(recipient, str):
+            self._send_error(session, "Direct message needs a recipient", client_message_id)
+            return None
+
+        recipient_session = self.clients.get(recipient)
+        if recipient_session is None and not self.auth_manager.user_exists(recipient):
+            self._send_error(session, f"Unknown user: {recipient}", client_message_id)
+            return None
+
+        message_id = self.database_manager.store_direct_message(
+            sender,
+            recipient,
+            message,
+            delivered=False
+        )
+        self.tracer.mark('store')
+        if recipient_session is None:
+            self.logger.debug(f"Stored direct message {message_id} for offline user {recipient}")
+            return message_id
+
+        payload = json.dumps({
+            'type': 'direct',
+            'id': message_id,
+            'sender': sender,
+            'to': recipient,
+            'message': message
+        })
+        self.tracer.mark('encode')
+        try:
+            self._send_to_session(recipient_session, payload)
+            self.tracer.mark('send')
+        except OSError as e:
+            # A dying recipient connection must not take the sender down with it
+            self.logger.debug(f"Direct message to {recipient} failed; kept for next login: {e}")
+            return message_id
+        self.database_manager.mark_messages_delivered([message_id])
+        self.logger.debug(f"Direct message from {sender} to {recipient}")
+        return message_id
+
+    def _deliver_offline_messages(self, session: ClientSession):
+        """
+        Send direct messages that arrived while the user was offline.
+        
+        Args:
+            session (ClientSession): Newly authenticated session
+        """
+        pending = self.database_manager.get_undelivered_messages(session.username)
+        for row in pending:
+            self._send_to_session(session, json.dumps({
+                'type': 'direct',
+                'id': row['id'],
+                'sender': row['sender'],
+                'to': row['recipient'],
+                'message': row['content'],
+                'timestamp': row['timestamp']
+            }))
+        self.database_manager.mark_messages_delivered([row['id'] for row in pending])
+
+    def _send_history(self, session: ClientSession, before_id: Optional[int], limit: int):
+        """
+        Send one page of room history older than before_id.
+        
+        Args:
+            session (ClientSession): Requesting session
+            before_id (int, optional): Only messages older than this ID
+            limit (int): Requested page size, capped at HISTORY_PAGE_LIMIT
+        """
+        try:
+            limit = max(1, min(int(limit), HISTORY_PAGE_LIMIT))
+            before_id = int(before_id) if before_id is not None else None
+        except (TypeError, ValueError):
+            self._send_error(session, "Invalid history request")
+            return
+
+        rows = self.database_manager.get_messages_before(before_id=before_id, limit=limit)
+        self._send_to_session(session, json.dumps({
+            'type': 'history',
+            'before_id': before_id,
+            'messages': [
+                {
+                    'id': row['id'],
+                    'sender': row['sender'],
+                    'message': row['content'],
+                    'timestamp': row['timestamp']
+                }
+                for row in rows
+            ]
+        }))
+
+    def _subscribe(self, session: ClientSession, keywords, notify_only):
+        """
+        Set a session's watched keywords and delivery mode.
+        
+        @mentions of the user always notify; keywords add to them. In
+        notify_only mode the session receives only room messages that
+        notify it, which saves bandwidth on slow or metered links.
+        
+        Args:
+            session (ClientSession): Subscribing session
+            keywords (list): Words or phrases to watch, replacing earlier ones
+            notify_only (bool): Whether to skip room messages that do not notify
+        """
+        if not isinstance(keywords, list):
+            self._send_error(session, "Invalid subscription")
+            return
+
+        watched = self.notifications.subscribe(session.username, keywords)
+        session.notify_only = bool(notify_only)
+        self._send_to_session(session, json.dumps({
+            'type': 'subscribed',
+            'keywords': sorted(watched),
+            'notify_only': session.notify_only
+        }))
+
+    def _attachment_store(self) -> AttachmentStore:
+        with self._attachments_lock:
+            if self._attachments is None:
+                self._attachments = AttachmentStore(self.attachment_dir, self.max_attachment_size)
+            self._attachments.max_size = self.max_attachment_size
+            return self._attachments
+
+    def _start_upload(self, session: ClientSession, payload: Dict):
+        """
+        Accept an attachment announcement and tell the client whether to send it.
+        
+        Content already in the store is not sent again: the reply has
+        'skip' set and the client goes straight to 'upload_end'.
+        
+        Args:
+            session (ClientSession): Uploading session
+            payload (Dict): 'upload_start' envelope with transfer_id, name, size and sha256
+        """
+        transfer_id = payload.get('transfer_id')
+        try:
+            bytes.fromhex(transfer_id)
+            if len(transfer_id) != 32:
+                raise ValueError
+        except (TypeError, ValueError):
+            self._send_error(session, "Invalid transfer ID")
+            return
+        if transfer_id in session.uploads or len(session.uploads) >= MAX_UPLOADS_PER_SESSION:
+            self._send_error(session, "Too many uploads in progress")
+            return
+
+        name = str(payload.get('name') or 'attachment')[:255]
+        try:
+            upload = self._attachment_store().begin(name, payload.get('size'), payload.get('sha256'))
+        except ValueError as e:
+            self._send_error(session, str(e))
+            return
+        session.uploads[transfer_id] = upload
+        self._send_to_session(session, json.dumps({
+            'type': 'upload_ready',
+            'transfer_id': transfer_id,
+            'skip': upload.stored,
+            'chunk_size': CHUNK_SIZE,
+            # Sending faster than this aborts the upload
+            'bytes_per_second': self.rate_limits.user_upload_bytes.rate
+        }))
+
+    def _receive_chunk(self, session: ClientSession, payload: bytes, charged: bool = False):
+        """
+        Append one chunk of file data to its upload.
+        
+        Each chunk is written straight to the upload's temporary file, so
+        memory use does not depend on the attachment's size. Chunks count
+        against the per-user upload byte limit; going over it aborts every
+        upload of the session, so frames after it are throttled as messages
+        again before they are decrypted.
+        
+        Args:
+            session (ClientSession): Uploading session
+            payload (bytes): Decrypted chunk payload
+            charged (bool): Whether the frame already passed the message limit
+        """
+        try:
+            transfer_id, data = unpack_chunk(payload)
+        except FrameError as e:
+            self._send_error(session, str(e))
+            return
+        if not charged and not self.rate_limits.allow_upload(session.username, len(data)):
+            self._abort_uploads(session)
+            self._send_error(session, "Upload rate limit exceeded, uploads aborted")
+            return
+        upload = session.uploads.get(transfer_id)
+        if upload is None:
+            self._send_error(session, "Unknown transfer")
+            return
+        try:
+            upload.write(data)
+        except (ValueError, OSError) as e:
+            del session.uploads[transfer_id]
+            upload.abort()
+            self._send_error(session, f"Upload failed: {e}")
+
+    def _finish_upload(self, session: ClientSession, transfer_id, client_message_id=None) -> Optional[int]:
+        """
+        Store a completed upload and broadcast a reference to it.
+        
+        The room message carries the name, size and hash; clients fetch
+        the content with 'download' only if they want it. Rejections echo
+        client_message_id, the sender's ID for the upload_end message.
+        
+        Returns:
+            Optional stored message ID, None if the upload was rejected
+        """
+        upload = session.uploads.pop(str(transfer_id), None)
+        if upload is None:
+            self._send_error(session, "Unknown upload", client_message_id)
+            return None
+        try:
+            sha256 = self._attachment_store().commit(upload)
+        except (ValueError, OSError) as e:
+            self._send_error(session, f"Upload failed: {e}", client_message_id)
+            return None
+
+        attachment = {'sha256': sha256, 'name': upload.name, 'size': upload.size}
+        message = f"[attachment] {upload.name} ({upload.size} bytes) sha256:{sha256}"
+        return self._broadcast_message(session.username, message, attachment=attachment)
+
+    def _send_attachment(self, session: ClientSession, transfer_id, sha256):
+        """
+        Start streaming a stored attachment to one client in encrypted chunks.
+        
+        Chunks are sent in the background, one per step, so the client's
+        next frames are processed meanwhile. The send lock is taken per
+        chunk, so room messages to the same client go out between chunks
+        instead of waiting for the file.
+        
+        Args:
+            session (ClientSession): Requesting session
+            transfer_id (str): Client-chosen ID the chunks are tagged with
+            sha256 (str): Attachment to send
+        """
+        store = self._attachment_store()
+        try:
+            bytes.fromhex(transfer_id)
+            size = store.size_of(sha256)
+        except (TypeError, ValueError, OSError):
+            self._send_error(session, "Unknown attachment")
+            return
+
+        self._send_to_session(session, json.dumps({
+            'type': 'download_start',
+            'transfer_id': transfer_id,
+            'sha256': sha256,
+            'size': size
+        }))
+        steps = self._download_steps(session, transfer_id, store.iter_chunks(sha256, CHUNK_SIZE))
+        if self.reactor:
+            # Each chunk waits its turn behind sockets that are ready
+            self.reactor.run_steps(steps)
+        else:
+            threading.Thread(target=self._run_steps, args=(steps,), name='attachment-send', daemon=True).start()
+
+    def _download_steps(self, session: ClientSession, transfer_id: str, chunks: Iterator[bytes]) -> Iterator[None]:
+        """
+        Send a download's chunks and its end marker, yielding after each chunk.
+        """
+        try:
+            for chunk in chunks:
+                with session.send_lock:
+                    self._send_frame(session, session.cipher.encrypt_bytes(pack_chunk(transfer_id, chunk)))
+                yield
+            self._send_to_session(session, json.dumps({
+                'type': 'download_end',
+                'transfer_id': transfer_id
+            }))
+        except OSError as e:
+            # The client asks again after reconnecting
+            self.logger.debug(f"Download to {session.username} stopped: {e}")
+
+    def _run_steps(self, steps: Iterator[None]):
+        try:
+            for _ in steps:
+                pass
+        except Exception as e:
+            self.logger.error(f"[!] Background task error: {e}")
+
+    def _push_presence(self, changes: List[Dict]):
+        """
+        Send one coalesced presence update to every room member.
+        
+        Called by the presence thread at most once per push interval;
+        with a single global room, every connected client is a member.
+        
+        Args:
+            changes (List[Dict]): Latest presence state per changed user
+        """
+        payload = json.dumps({'type': 'presence', 'changes': changes})
+        for session in self.clients.snapshot():
+            try:
+                self._send_to_session(session, payload)
+            except OSError as e:
+                self.logger.debug(f"Presence update to {session.username} failed: {e}")
+
+    def _broadcast_message(self, sender: str, message: str, attachment: Optional[Dict] = None) -> int:
         """
         Broadcast message to all connected clients.
         
+        Users the message mentions or matches a keyword of get it with
+        'notify' set; sessions in notify_only mode get nothing else.
+        
         Args:
             sender (str): Message sender's username
             message (str): Encrypted message content
+            attachment (Dict, optional): Reference to a stored attachment
+        
+        Returns:
+            int: Stored message ID
         """
         # Store message in database
-        self.database_manager.store_message(sender, message)
-        
-        # Encrypt and send to all clients
-        for username, client_socket in self.clients.items():
-            if username != sender:
-                encrypted_msg = self.encryption.encrypt(
-                    json.dumps({
-                        'sender': sender,
-                        'message': message
-                    })
-                )
-                client_socket.send(encrypted_msg.encode('utf-8'))
-                self.logger.debug(f"Broadcasted message from {sender} to {username}")
\ No newline at end of file
+        message_id = self.database_manager.store_message(sender, message)
+        self.tracer.mark('store')
+        
+        # One pass over the message finds everyone it notifies
+        notified = self.notifications.match(message)
+        self.tracer.mark('match')
+
+        # Encrypt with each recipient's session key and send
+        message_data = {
+            'type': 'message',
+            'id': message_id,
+            'sender': sender,
+            'message': message
+        }
+        if attachment is not None:
+            message_data['attachment'] = attachment
+        payload = json.dumps(message_data)
+        notify_payload = json.dumps(dict(message_data, notify=True)) if notified else None
+        self.tracer.mark('encode')
+        # Snapshot iteration: connects and disconnects never disturb the loop
+        for session in self.clients.snapshot():
+            if session.username == sender:
+                continue
+            if session.username in notified:
+                frame = notify_payload
+            elif session.notify_only:
+                continue
+            else:
+                frame = payload
+            try:
+                self._send_to_session(session, frame)
+            except OSError as e:
+                # The recipient's own handler thread cleans it up
+                self.logger.debug(f"Broadcast to {session.username} failed: {e}")
+                continue
+            self.logger.debug(f"Broadcasted message from {sender} to {session.username}")
+        self.tracer.mark('send')
+        return message_id
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Client session module for the distributed chat server.
+Holds per-connection state and the concurrent registry of active sessions.
+"""
+
+import socket
+import threading
+from typing import Dict, List, Optional, Tuple
+from security.encryption import SecureEncryption
+from .attachments import Upload
+
+class ClientSession:
+    # Slots keep the per-connection footprint small with many clients
+    __slots__ = (
+        'socket', 'address', 'cipher', 'username', 'send_lock', 'pending_acks', 'notify_only', 'uploads',
+        'process_lock', 'superseded'
+    )
+
+    def __init__(
+        self,
+        client_socket: socket.socket,
+        address: Tuple,
+        cipher: SecureEncryption,
+        username: Optional[str] = None
+    ):
+        """
+        Create the state for one connected client.
+
+        Args:
+            client_socket (socket): Connected client socket
+            address (tuple): Client network address
+            cipher (SecureEncryption): Cipher keyed for this connection only
+            username (str, optional): Set once the client authenticates
+        """
+        self.socket = client_socket
+        self.address = address
+        self.cipher = cipher
+        self.username = username
+        # Several threads fan out to the same client; frames must not interleave
+        self.send_lock = threading.Lock()
+        # [client message ID, stored row ID] pairs waiting to ride on the next frame
+        self.pending_acks: List[List] = []
+        # Low-bandwidth mode: only room messages that mention or match this user
+        self.notify_only = False
+        # Attachment uploads in progress, by transfer ID
+        self.uploads: Dict[str, Upload] = {}
+        # Held while a frame is processed; a newer login of the same user
+        # waits on it, then marks this session superseded
+        self.process_lock = threading.Lock()
+        self.superseded = False
+
+class SessionRegistry:
+    def __init__(self, shard_count: int = 32):
+        """
+        Create a registry of authenticated sessions keyed by username.
+
+        Writes lock only the shard the username hashes to, so connects and
+        disconnects of different users do not contend. Fan-out iterates an
+        immutable snapshot that is rebuilt only after the registry changes.
+
+        Args:
+            shard_count (int): Number of independently locked shards
+        """
+        self._shards: List[Tuple[Dict[str, ClientSession], threading.Lock]] = [
+            ({}, threading.Lock()) for _ in range(shard_count)
+        ]
+        self._snapshot_lock = threading.Lock()
+        self._snapshot: Optional[Tuple[ClientSession, ...]] = ()
+        self._version = 0
+
+    def _shard(self, username: str) -> Tuple[Dict[str, ClientSession], threading.Lock]:
+        return self._shards[hash(username) % len(self._shards)]
+
+    def _invalidate_snapshot(self) -> None:
+        with self._snapshot_lock:
+            self._version += 1
+            self._snapshot = None
+
+    def add(self, session: ClientSession) -> Optional[ClientSession]:
+        """
+        Register an authenticated session.
+
+        Args:
+            session (ClientSession): Session with its username set
+
+        Returns:
+            Optional session previously registered under the same username
+        """
+        sessions, lock = self._shard(session.username)
+        with lock:
+            previous = sessions.get(session.username)
+            sessions[session.username] = session
+        self._invalidate_snapshot()
+        return previous
+
+    def remove(self, username: str, session: Optional[ClientSession] = None) -> bool:
+        """
+        Unregister a user.
+
+        Passing the session makes removal conditional on it still being the
+        registered one, so a stale connection cleaning up cannot remove a
+        newer login under the same name.
+
+        Args:
+            username (str): Username to remove
+            session (ClientSession, optional): Only remove this exact session
+
+        Returns:
+            bool: True if a session was removed
+        """
+        sessions, lock = self._shard(username)
+        with lock:
+            current = sessions.get(username)
+            if current is None or (session is not None and current is not session):
+                return False
+            del sessions[username]
+        self._invalidate_snapshot()
+        return True
+
+    def get(self, username: str) -> Optional[ClientSession]:
+        """
+        Look up a session by username.
+
+        Args:
+            username (str): Username to look up
+
+        Returns:
+            Optional registered session
+        """
+        sessions, lock = self._shard(username)
+        with lock:
+            return sessions.get(username)
+
+    def snapshot(self) -> Tuple[ClientSession, ...]:
+        """
+        Return an immutable view of all sessions for iteration.
+
+        The tuple is shared by every caller until the next add or remove,
+        so repeated broadcasts on a stable registry copy nothing.
+
+        Returns:
+            Tuple of registered sessions
+        """
+        with self._snapshot_lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            version = self._version
+
+        collected = []
+        for sessions, lock in self._shards:
+            with lock:
+                collected.extend(sessions.values())
+        snapshot = tuple(collected)
+
+        with self._snapshot_lock:
+            # Only cache if no write happened while we were collecting
+            if self._version == version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def __contains__(self, username: str) -> bool:
+        return self.get(username) is not None
+
+    def __len__(self) -> int:
+        return len(self.snapshot())
@@ -0,0 +1,142 @@
+"""
+Per-message latency tracing for the distributed chat server.
+Records sampled stage timings on the message path into a bounded ring buffer.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+class _Trace:
+    __slots__ = ('kind', 'start_ns', 'last_ns', 'stages')
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.start_ns = self.last_ns = time.perf_counter_ns()
+        self.stages: List[tuple] = []
+
+class MessageTracer:
+    def __init__(self, sample_rate: float = 0.0, capacity: int = 4096):
+        """
+        Trace a sample of messages through the server's processing stages.
+
+        A trace is bound to the thread handling the frame, so the message
+        path only calls mark() and never passes a trace object around.
+        Unsampled messages cost one random() call and a thread-local lookup
+        per stage, so a low sample rate can stay on in production.
+
+        Finished traces go into a deque with a fixed maxlen. Appending to
+        it is atomic under the GIL, so recording takes no lock and the
+        oldest traces simply fall off the end.
+
+        Args:
+            sample_rate (float): Fraction of messages traced, 0.0 to 1.0
+            capacity (int): Finished traces kept for dump()
+        """
+        self.sample_rate = sample_rate
+        self._traces: deque = deque(maxlen=capacity)
+        self._local = threading.local()
+
+    def begin(self, kind: str = 'frame') -> bool:
+        """
+        Start tracing the current thread's message if it is sampled.
+
+        Returns:
+            bool: Whether this message is traced
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            self._local.trace = None
+            return False
+        self._local.trace = _Trace(kind)
+        return True
+
+    def mark(self, stage: str) -> None:
+        """
+        Record that a stage finished, timed from the previous mark.
+        """
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            now = time.perf_counter_ns()
+            trace.stages.append((stage, now - trace.last_ns))
+            trace.last_ns = now
+
+    def label(self, kind: str) -> None:
+        """
+        Name the current trace, e.g. with the message type once it is known.
+        """
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace.kind = kind
+
+    def end(self) -> None:
+        """
+        Finish the current thread's trace and store it.
+        """
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            self._local.trace = None
+            self._traces.append(trace)
+
+    def dump(self) -> List[Dict]:
+        """
+        Return the buffered traces, oldest first.
+
+        Returns:
+            List of dictionaries with kind, start_ns, total_ns and
+            stages as (name, nanoseconds) pairs in order
+        """
+        return [
+            {
+                'kind': trace.kind,
+                'start_ns': trace.start_ns,
+                'total_ns': trace.last_ns - trace.start_ns,
+                'stages': list(trace.stages)
+            }
+            for trace in list(self._traces)
+        ]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize buffered traces per stage.
+
+        Returns:
+            Stage name to count and p50/p99/max latency in microseconds
+        """
+        durations: Dict[str, List[int]] = {}
+        for trace in self.dump():
+            for stage, duration in trace['stages']:
+                durations.setdefault(stage, []).append(duration)
+            durations.setdefault('total', []).append(trace['total_ns'])
+
+        summary = {}
+        for stage, values in durations.items():
+            values.sort()
+            summary[stage] = {
+                'count': len(values),
+                'p50_us': values[len(values) // 2] / 1000,
+                'p99_us': values[min(len(values) - 1, int(len(values) * 0.99))] / 1000,
+                'max_us': values[-1] / 1000
+            }
+        return summary
+
+    def dump_to_file(self, path: str) -> int:
+        """
+        Write buffered traces as JSON lines.
+
+        Args:
+            path (str): Output file
+
+        Returns:
+            int: Number of traces written
+        """
+        traces = self.dump()
+        with open(path, 'w') as f:
+            for trace in traces:
+                f.write(json.dumps(trace) + '\n')
+        return len(traces)
+
+    def clear(self) -> None:
+        self._traces.clear()
@@ -0,0 +1,98 @@
+"""
+Shared setup for tests that run a real ChatServer in-process.
+Provides a working directory, servers on free ports and logged-in clients.
+"""
+
+import unittest
+import os
+import queue
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from client.client import ChatClient
+from server.database import DatabaseManager
+from server.server import ChatServer
+
+class ServerTestCase(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a working directory, removed once the test and its servers are done.
+        """
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+        self.servers_started = 0
+
+    def start_server(self, mode='threaded', users=('alice', 'bob'), rate_limits=None,
+                     attachment_dir=None, worker_pool_size=2, **options):
+        """
+        Start a server on a free port with a fresh database and an account,
+        password 'password', for each user. It is stopped when the test ends.
+        """
+        self.servers_started += 1
+        name = f'{mode}{self.servers_started}'
+        server = ChatServer(
+            host='127.0.0.1',
+            port=0,
+            database_manager=DatabaseManager(
+                os.path.join(self.workdir, f'{name}.db'), legacy_users_path=None
+            ),
+            rate_limits=rate_limits,
+            mode=mode,
+            worker_pool_size=worker_pool_size,
+            profile_dir=os.path.join(self.workdir, f'{name}_profiles'),
+            attachment_dir=attachment_dir or os.path.join(self.workdir, f'{name}_attachments'),
+            **options
+        )
+        server.logger.setLevel('WARNING')
+        for username in users:
+            server.auth_manager.register_user(username, 'password')
+        thread = threading.Thread(target=server.start, daemon=True)
+        thread.start()
+        server.ready.wait(timeout=5)
+        self.addCleanup(self.stop_server, server, thread)
+        return server, thread
+
+    def stop_server(self, server, thread):
+        """
+        Drain a server that is still running and wait for it to stop.
+        """
+        if thread.is_alive():
+            server.drain(reconnect_window=0, timeout=2)
+        thread.join(timeout=5)
+
+    def login(self, server, username):
+        """
+        Run the real client handshake without starting its print loop.
+        """
+        client = ChatClient('127.0.0.1', server.port)
+        client.socket = socket.create_connection(('127.0.0.1', server.port))
+        client.socket.settimeout(5)
+        client.encryption = client._exchange_keys()
+        self.assertTrue(client._authenticate(username, 'password'))
+        client.is_connected = True
+        return client
+
+    def connect(self, server, username):
+        """
+        Connect a client whose received messages are queued on its message_handler.
+        """
+        client = ChatClient('127.0.0.1', server.port)
+        client.message_handler = queue.Queue().put
+        self.assertTrue(client.connect(username, 'password'))
+        return client
+
+    def next_message(self, client, message_type, timeout=5):
+        """
+        Return the next queued message of a type from a client made by connect.
+        """
+        inbox = client.message_handler.__self__
+        while True:
+            message = inbox.get(timeout=timeout)
+            if message.get('type') == message_type:
+                return message
@@ -0,0 +1,102 @@
+"""
+Unit tests for history export and import.
+Validates archive round trips, filtering and batched re-import.
+"""
+
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.archive import export_messages, import_messages, read_archive, write_archive
+from server.database import DatabaseManager
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        """
+        Create source and target databases and a scratch directory.
+        """
+        self.workdir = tempfile.mkdtemp()
+        self.source = DatabaseManager(os.path.join(self.workdir, 'source.db'))
+        self.target = DatabaseManager(os.path.join(self.workdir, 'target.db'))
+
+    def set_timestamp(self, message_id, timestamp):
+        with sqlite3.connect(self.source.database_path) as conn:
+            conn.execute('UPDATE messages SET timestamp = ? WHERE id = ?', (timestamp, message_id))
+
+    def test_round_trip_in_both_layouts(self):
+        """
+        Test that every layout and compression restores the same messages.
+        """
+        self.source.store_messages([('alice', f'm{i}', 'global') for i in range(25)])
+        self.source.store_direct_message('alice', 'bob', 'pending', delivered=False)
+        original = list(self.source.iter_messages(None))
+
+        for name, layout in (('rows.jsonl', 'rows'), ('rows.jsonl.gz', 'rows'), ('cols.jsonl.gz', 'columns')):
+            path = os.path.join(self.workdir, name)
+            stats = export_messages(self.source, path, layout=layout, batch_size=7)
+            self.assertEqual(26, stats.messages)
+            self.assertEqual(original, list(read_archive(path)))
+
+        reports = []
+        stats = import_messages(
+            self.target,
+            os.path.join(self.workdir, 'cols.jsonl.gz'),
+            batch_size=10,
+            progress=lambda count, seconds: reports.append(count),
+            report_every=10
+        )
+
+        self.assertEqual(26, stats.messages)
+        self.assertEqual([10, 20], reports)
+        imported = list(self.target.iter_messages(None))
+        fields = ('sender', 'content', 'timestamp', 'room', 'recipient', 'conversation', 'delivered')
+        self.assertEqual(
+            [[row[field] for field in fields] for row in original],
+            [[row[field] for field in fields] for row in imported]
+        )
+        self.assertEqual(1, len(self.target.get_undelivered_messages('bob')))
+
+    def test_export_filters_by_room_and_time(self):
+        """
+        Test that since is inclusive, until exclusive, and room applies.
+        """
+        ids = self.source.store_messages([
+            ('alice', 'old', 'global'),
+            ('alice', 'january', 'global'),
+            ('alice', 'other room', 'dev'),
+            ('alice', 'february', 'global')
+        ])
+        for message_id, timestamp in zip(ids, (
+            '2023-12-31 23:59:59',
+            '2024-01-01 00:00:00',
+            '2024-01-15 12:00:00',
+            '2024-02-01 00:00:00'
+        )):
+            self.set_timestamp(message_id, timestamp)
+
+        path = os.path.join(self.workdir, 'january.jsonl')
+        export_messages(self.source, path, room='global', since='2024-01-01', until='2024-02-01')
+
+        self.assertEqual(['january'], [row['content'] for row in read_archive(path)])
+
+    def test_rejects_files_that_are_not_archives(self):
+        """
+        Test that importing an arbitrary file fails before inserting anything.
+        """
+        path = os.path.join(self.workdir, 'notes.txt')
+        with open(path, 'w') as f:
+            f.write('not an archive\n')
+
+        with self.assertRaises(ValueError):
+            import_messages(self.target, path)
+        with self.assertRaises(ValueError):
+            write_archive([], path, layout='parquet')
+        self.assertEqual([], list(self.target.iter_messages(None)))
+
+if __name__ == '__main__':
+    unittest.main()
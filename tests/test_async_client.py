@@ -0,0 +1,109 @@
+"""
+Integration tests for the asyncio chat client.
+Validates many sessions in one event loop against a real ChatServer.
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from client.async_client import AsyncChatClient
+from server.rate_limiter import ServerRateLimits
+from tests.server_harness import ServerTestCase
+
+class TestAsyncChatClient(ServerTestCase):
+    def setUp(self):
+        """
+        Start a reactor-mode server on a free port with generous limits.
+        """
+        super().setUp()
+        self.usernames = [f'bot{i}' for i in range(20)]
+        self.server, _ = self.start_server(
+            'reactor',
+            users=self.usernames,
+            rate_limits=ServerRateLimits(
+                messages_per_second=1000,
+                message_burst=1000,
+                ip_messages_per_second=1000,
+                ip_message_burst=1000,
+                auth_attempts_per_minute=6000,
+                auth_burst=1000
+            ),
+            worker_pool_size=4
+        )
+
+    async def login(self, username, **kwargs):
+        client = AsyncChatClient('127.0.0.1', self.server.port, **kwargs)
+        self.assertTrue(await client.connect(username, 'password'))
+        return client
+
+    async def next_chat(self, client):
+        """
+        Return the next room or direct message, skipping presence updates.
+        """
+        async for message in client.iter_messages():
+            if message['type'] in ('message', 'direct'):
+                return message
+        self.fail(f"Connection closed: {client.last_error}")
+
+    def test_many_sessions_in_one_loop(self):
+        """
+        Test that one event loop drives twenty sessions sending and receiving.
+        """
+        async def scenario():
+            clients = await asyncio.gather(*(self.login(name) for name in self.usernames))
+            await asyncio.sleep(0.2)  # Let the reactor start watching every socket
+
+            sender, receivers = clients[0], clients[1:]
+            await sender.send('hello bots')
+            await sender.send_direct('bot1', 'just for you')
+
+            received = await asyncio.wait_for(
+                asyncio.gather(*(self.next_chat(client) for client in receivers)),
+                timeout=5
+            )
+            direct = await asyncio.wait_for(self.next_chat(receivers[0]), timeout=5)
+
+            await asyncio.gather(*(client.close() for client in clients))
+            return received, direct
+
+        received, direct = asyncio.run(scenario())
+
+        self.assertEqual({'hello bots'}, {message['message'] for message in received})
+        self.assertEqual({'bot0'}, {message['sender'] for message in received})
+        self.assertEqual(('direct', 'just for you'), (direct['type'], direct['message']))
+
+    def test_slow_consumer_applies_backpressure(self):
+        """
+        Test that a full queue pauses reading without losing or reordering messages.
+        """
+        async def scenario():
+            sender = await self.login('bot0')
+            reader = await self.login('bot1', max_pending=2)
+            await asyncio.sleep(0.2)
+
+            for i in range(10):
+                await sender.send(f'message {i}')
+            await asyncio.sleep(0.5)
+            buffered = reader._messages.qsize()
+
+            received = []
+            while len(received) < 10:
+                message = await asyncio.wait_for(self.next_chat(reader), timeout=5)
+                received.append(message['message'])
+
+            await sender.close()
+            await reader.close()
+            return buffered, received
+
+        buffered, received = asyncio.run(scenario())
+
+        self.assertEqual(2, buffered)
+        self.assertEqual([f'message {i}' for i in range(10)], received)
+
+if __name__ == '__main__':
+    unittest.main()
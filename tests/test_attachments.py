@@ -0,0 +1,149 @@
+"""
+Tests for chunked attachment transfer.
+Validates the content-addressed store and uploads and downloads through a running server.
+"""
+
+import unittest
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+from unittest import mock
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.attachments import AttachmentStore
+from server.rate_limiter import ServerRateLimits
+from tests.server_harness import ServerTestCase
+from utils.protocol import CHUNK_SIZE, pack_chunk
+
+class TestAttachmentStore(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a store in a temporary directory.
+        """
+        self.root = tempfile.mkdtemp()
+        self.store = AttachmentStore(self.root, max_size=1024)
+
+    def upload(self, data, sha256=None):
+        upload = self.store.begin('notes.txt', len(data), sha256 or hashlib.sha256(data).hexdigest())
+        if not upload.stored:
+            upload.write(data[:10])
+            upload.write(data[10:])
+        return self.store.commit(upload)
+
+    def test_identical_content_is_stored_once(self):
+        """
+        Test that a second upload of the same bytes needs no data and shares the file.
+        """
+        digest = self.upload(b'x' * 100)
+        self.assertTrue(self.store.begin('copy.txt', 100, digest).stored)
+        self.assertEqual(digest, self.upload(b'x' * 100))
+
+        self.assertEqual(b'x' * 100, b''.join(self.store.iter_chunks(digest, 30)))
+        self.assertEqual([], os.listdir(os.path.join(self.root, 'tmp')))
+
+    def test_rejects_mismatched_and_oversized_uploads(self):
+        """
+        Test that wrong hashes, oversized files and bad digests are refused.
+        """
+        with self.assertRaises(ValueError):
+            self.upload(b'actual content', sha256='0' * 64)
+        with self.assertRaises(ValueError):
+            self.store.begin('big.bin', 2048, '0' * 64)
+        with self.assertRaises(ValueError):
+            self.store.path_for('../../etc/passwd')
+
+        self.assertEqual([], os.listdir(os.path.join(self.root, 'tmp')))
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        shutil.rmtree(self.root)
+
+class TestAttachmentTransfer(ServerTestCase):
+    def setUp(self):
+        """
+        Create a file larger than one chunk in the working directory.
+        """
+        super().setUp()
+        self.data = os.urandom(CHUNK_SIZE * 2 + 1000)
+        self.path = os.path.join(self.workdir, 'report.bin')
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+
+    def test_upload_broadcasts_reference_and_download_matches(self):
+        """
+        Test a multi-chunk upload, the broadcast reference, a verified download and a de-duplicated resend.
+        """
+        for mode in ('threaded', 'reactor'):
+            with self.subTest(mode=mode):
+                server, thread = self.start_server(mode)
+                alice = self.connect(server, 'alice')
+                bob = self.connect(server, 'bob')
+                try:
+                    self.assertIsNotNone(alice.send_file(self.path))
+
+                    message = self.next_message(bob, 'message')
+                    attachment = message['attachment']
+                    self.assertEqual('report.bin', attachment['name'])
+                    self.assertEqual(len(self.data), attachment['size'])
+                    self.assertEqual(hashlib.sha256(self.data).hexdigest(), attachment['sha256'])
+
+                    target = os.path.join(self.workdir, f'{mode}_download.bin')
+                    self.assertTrue(bob.download_file(attachment['sha256'], target))
+                    with open(target, 'rb') as f:
+                        self.assertEqual(self.data, f.read())
+
+                    self.assertIsNotNone(bob.send_file(self.path, name='again.bin'))
+                    self.assertEqual('again.bin', self.next_message(alice, 'message')['attachment']['name'])
+                    blobs = [
+                        name for name in os.listdir(server.attachment_dir) if name != 'tmp'
+                    ]
+                    self.assertEqual(1, len(blobs))
+
+                    self.assertFalse(bob.download_file('0' * 64, target, timeout=1))
+                finally:
+                    alice.disconnect()
+                    bob.disconnect()
+                    self.stop_server(server, thread)
+
+    def test_uploads_are_limited_by_bytes(self):
+        """
+        Test that a paced upload fits the byte limit, a flood aborts and stray chunks are refused.
+        """
+        for mode in ('threaded', 'reactor'):
+            with self.subTest(mode=mode):
+                server, thread = self.start_server(mode, rate_limits=ServerRateLimits(
+                    upload_bytes_per_second=CHUNK_SIZE * 4,
+                    upload_burst_bytes=CHUNK_SIZE * 2
+                ))
+                alice = self.connect(server, 'alice')
+                bob = self.connect(server, 'bob')
+                try:
+                    self.assertIsNotNone(alice.send_file(self.path))
+                    self.assertEqual('report.bin', self.next_message(bob, 'message')['attachment']['name'])
+
+                    # Without pacing a four-chunk file overruns the two-chunk burst
+                    flood = os.path.join(self.workdir, f'{mode}_flood.bin')
+                    with open(flood, 'wb') as f:
+                        f.write(os.urandom(CHUNK_SIZE * 4))
+                    with mock.patch('client.client.time.sleep'):
+                        alice.send_file(flood)
+                    self.assertIn('Upload rate limit exceeded', self.next_message(alice, 'error')['message'])
+
+                    alice._send_payload(pack_chunk(uuid.uuid4().hex, b'stray'))
+                    errors = set()
+                    while 'Unknown transfer' not in errors:
+                        errors.add(self.next_message(alice, 'error')['message'])
+                finally:
+                    alice.disconnect()
+                    bob.disconnect()
+                    self.stop_server(server, thread)
+
+if __name__ == '__main__':
+    unittest.main()
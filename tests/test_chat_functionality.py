@@ -4,11 +4,28 @@ Validates message transmission and server-client interactions.
 """
 
 import unittest
+import json
+import os
+import sys
 import threading
 import socket
+import tempfile
 import time
 from typing import List
 
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from client.client import ChatClient
+from security.encryption import SecureEncryption
+from server.authentication import AuthenticationManager
+from server.database import DatabaseManager
+from server.rate_limiter import ServerRateLimits
+from server.server import ChatServer
+from server.session import ClientSession
+from tests.server_harness import ServerTestCase
+from utils.protocol import FRAME_HEADER, recv_frame
+
 class TestChatFunctionality(unittest.TestCase):
     def setUp(self):
         """
@@ -108,5 +125,238 @@ class TestChatFunctionality(unittest.TestCase):
         if self.server_socket:
             self.server_socket.close()
 
+class TestDirectMessages(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a server with temporary databases and two connected sessions.
+        """
+        self.temp_dbs = [tempfile.mktemp(), tempfile.mktemp()]
+        self.server = ChatServer(
+            auth_manager=AuthenticationManager(database_path=self.temp_dbs[0]),
+            database_manager=DatabaseManager(database_path=self.temp_dbs[1])
+        )
+        for username in ('alice', 'bob', 'carol'):
+            self.server.auth_manager.register_user(username, 'password')
+
+        self.peers = {}
+        for username in ('alice', 'bob'):
+            server_end, client_end = socket.socketpair()
+            client_end.settimeout(2)
+            session = ClientSession(server_end, None, SecureEncryption(), username)
+            self.server.clients.add(session)
+            self.peers[username] = (session, client_end)
+
+    def receive(self, username):
+        """
+        Read and decrypt the next frame delivered to a user.
+        """
+        session, client_end = self.peers[username]
+        return json.loads(session.cipher.decrypt_bytes(recv_frame(client_end)).decode('utf-8'))
+
+    def test_direct_message_reaches_only_recipient(self):
+        """
+        Test that a direct message is routed to the recipient alone.
+        """
+        alice_session, alice_end = self.peers['alice']
+        self.server._handle_message(
+            alice_session,
+            json.dumps({'type': 'direct', 'to': 'bob', 'message': 'secret'})
+        )
+
+        received = self.receive('bob')
+        self.assertEqual(('direct', 'alice', 'secret'), (
+            received['type'], received['sender'], received['message']
+        ))
+
+        alice_end.setblocking(False)
+        with self.assertRaises(BlockingIOError):
+            alice_end.recv(1)
+        self.assertEqual([], self.server.database_manager.get_undelivered_messages('bob'))
+
+    def test_failed_send_is_kept_for_next_login(self):
+        """
+        Test that a direct message whose send fails is delivered at the next login.
+        """
+        alice_session, _ = self.peers['alice']
+        _, bob_end = self.peers['bob']
+        bob_end.close()
+        self.server._handle_message(
+            alice_session,
+            json.dumps({'type': 'direct', 'to': 'bob', 'message': 'lost?'})
+        )
+
+        pending = self.server.database_manager.get_undelivered_messages('bob')
+        self.assertEqual(['lost?'], [row['content'] for row in pending])
+
+    def test_offline_recipient_gets_message_at_login(self):
+        """
+        Test that messages to an offline user are delivered when they log in.
+        """
+        alice_session, _ = self.peers['alice']
+        self.server._handle_message(
+            alice_session,
+            json.dumps({'type': 'direct', 'to': 'carol', 'message': 'later'})
+        )
+
+        server_end, client_end = socket.socketpair()
+        client_end.settimeout(2)
+        carol = ClientSession(server_end, None, SecureEncryption(), 'carol')
+        self.server._deliver_offline_messages(carol)
+        received = json.loads(carol.cipher.decrypt_bytes(recv_frame(client_end)).decode('utf-8'))
+
+        self.assertEqual('later', received['message'])
+        self.assertEqual([], self.server.database_manager.get_undelivered_messages('carol'))
+        server_end.close()
+        client_end.close()
+
+    def test_unknown_recipient_returns_error(self):
+        """
+        Test that messaging a user who does not exist reports an error to the sender.
+        """
+        alice_session, _ = self.peers['alice']
+        self.server._handle_message(
+            alice_session,
+            json.dumps({'type': 'direct', 'to': 'nobody', 'message': 'hello?'})
+        )
+
+        self.assertEqual('error', self.receive('alice')['type'])
+
+    def tearDown(self):
+        """
+        Close sockets and remove temporary databases.
+        """
+        for session, client_end in self.peers.values():
+            session.socket.close()
+            client_end.close()
+        for path in self.temp_dbs:
+            if os.path.exists(path):
+                os.unlink(path)
+
+class TestHandshakeDeadline(ServerTestCase):
+    def test_connections_that_never_log_in_free_their_slots(self):
+        """
+        Test that idle and trickling connections are dropped at the deadline.
+        """
+        for mode in ('threaded', 'reactor'):
+            with self.subTest(mode=mode):
+                server, thread = self.start_server(
+                    mode, users=('alice',), max_connections=2, handshake_timeout=0.5
+                )
+                idle = socket.create_connection(('127.0.0.1', server.port))
+                trickling = socket.create_connection(('127.0.0.1', server.port))
+                stop = threading.Event()
+
+                def trickle():
+                    # One byte of a frame at a time, well inside any per-read timeout
+                    for byte in FRAME_HEADER.pack(256) + b'x' * 256:
+                        if stop.wait(0.1):
+                            return
+                        try:
+                            trickling.send(bytes([byte]))
+                        except OSError:
+                            return
+
+                trickler = threading.Thread(target=trickle)
+                trickler.start()
+                try:
+                    for sock in (idle, trickling):
+                        sock.settimeout(5)
+                        self.assertIsNotNone(recv_frame(sock))  # Key exchange hello
+                        try:
+                            self.assertIsNone(recv_frame(sock))
+                        except ConnectionResetError:
+                            pass  # Closed with trickled bytes still unread
+
+                    client = ChatClient('127.0.0.1', server.port)
+                    client.message_handler = lambda message_data: None
+                    self.assertTrue(client.connect('alice', 'password'))
+                    client.disconnect()
+                finally:
+                    stop.set()
+                    trickler.join()
+                    idle.close()
+                    trickling.close()
+                    self.stop_server(server, thread)
+
+class TestReactorMode(ServerTestCase):
+    def setUp(self):
+        """
+        Start a reactor-mode server with a small worker pool on a free port.
+        """
+        super().setUp()
+        self.threads_before = threading.active_count()
+        self.server, self.server_thread = self.start_server(
+            'reactor',
+            rate_limits=ServerRateLimits(messages_per_second=1000, message_burst=1000)
+        )
+
+    def test_messages_flow_through_worker_pool(self):
+        """
+        Test broadcasts and direct messages, in order, through the reactor.
+        """
+        alice = self.login(self.server, 'alice')
+        bob = self.login(self.server, 'bob')
+        time.sleep(0.2)  # Let the reactor start watching both sockets
+
+        for i in range(20):
+            alice.send_message(f'message {i}', 'alice')
+        alice.send_direct_message('bob', 'private')
+
+        received = []
+        while len(received) < 21:
+            message = json.loads(bob._recv_decrypted())
+            if message['type'] in ('message', 'direct'):
+                received.append(message['message'])
+        self.assertEqual([f'message {i}' for i in range(20)] + ['private'], received)
+        # Reactor, presence and ACK threads plus at most two workers
+        self.assertLessEqual(threading.active_count() - self.threads_before, 5)
+
+        alice.disconnect()
+        bob.disconnect()
+
+    def test_stop_ends_background_threads(self):
+        """
+        Test that stopping the reactor directly, without a drain, stops the server's own threads.
+        """
+        def background_threads():
+            # Servers left running by other tests have their own
+            return sum(1 for thread in threading.enumerate() if thread.name in ('ack-flusher', 'presence'))
+
+        running = background_threads()
+        self.server.reactor.stop()
+        self.server_thread.join(timeout=5)
+
+        self.assertFalse(self.server_thread.is_alive())
+        self.assertEqual(running - 2, background_threads())
+
+    def test_stalled_clients_do_not_hold_workers(self):
+        """
+        Test that more half-sent frames than workers do not stop others logging in and chatting.
+        """
+        stalled = []
+        for _ in range(self.server.worker_pool_size + 1):
+            sock = socket.create_connection(('127.0.0.1', self.server.port))
+            sock.settimeout(5)
+            self.assertIsNotNone(recv_frame(sock))  # Key exchange hello
+            sock.sendall(FRAME_HEADER.pack(100) + b'partial')
+            stalled.append(sock)
+        time.sleep(0.2)  # Let workers pick up the partial frames
+
+        start = time.monotonic()
+        alice = self.login(self.server, 'alice')
+        bob = self.login(self.server, 'bob')
+        time.sleep(0.2)  # Let the reactor start watching both sockets
+        alice.send_message('hello', 'alice')
+        message = json.loads(bob._recv_decrypted())
+        while message['type'] != 'message':
+            message = json.loads(bob._recv_decrypted())
+        self.assertEqual('hello', message['message'])
+        self.assertLess(time.monotonic() - start, 3)
+
+        alice.disconnect()
+        bob.disconnect()
+        for sock in stalled:
+            sock.close()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Unit tests for configuration loading and hot reloading.
+Validates the typed configuration object and live updates to the server.
+"""
+
+import unittest
+import dataclasses
+import logging
+import os
+import sys
+import tempfile
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.authentication import AuthenticationManager
+from server.database import DatabaseManager
+from server.server import ChatServer
+from utils.config import (
+    ConfigWatcher,
+    Configuration,
+    add_reload_listener,
+    get_config,
+    remove_reload_listener
+)
+
+class TestConfiguration(unittest.TestCase):
+    def setUp(self):
+        """
+        Write a temporary .env file.
+        """
+        handle, self.env_path = tempfile.mkstemp(suffix='.env')
+        os.close(handle)
+        self.write_env(messages_per_second=5, pool_size=4)
+
+    def write_env(self, messages_per_second, pool_size, log_level='INFO', mode='threaded'):
+        with open(self.env_path, 'w') as f:
+            f.write(
+                f"SERVER_MODE={mode}\n"
+                f"WORKER_POOL_SIZE={pool_size}\n"
+                f"RATE_LIMIT_MESSAGES_PER_SECOND={messages_per_second}\n"
+                f"LOG_LEVEL={log_level}\n"
+            )
+        # Make sure the watcher sees a new modification time
+        stat = os.stat(self.env_path)
+        os.utime(self.env_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_typed_and_immutable(self):
+        """
+        Test that settings are typed attributes that cannot be changed in place.
+        """
+        config = Configuration.load(self.env_path)
+
+        self.assertEqual(4, config.server.worker_pool_size)
+        self.assertEqual(5.0, config.rate_limit.messages_per_second)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            config.server.port = 1
+
+    def test_loaded_once(self):
+        """
+        Test that get_config returns the cached object until a reload.
+        """
+        self.assertIs(get_config(self.env_path), get_config(self.env_path))
+
+    def test_invalid_reload_keeps_running_config(self):
+        """
+        Test that a bad edit is rejected and the old configuration stays.
+        """
+        original = get_config(self.env_path)
+        watcher = ConfigWatcher(self.env_path)
+
+        self.write_env(messages_per_second=0, pool_size=4)
+
+        self.assertIsNone(watcher.check())
+        self.assertIs(original, get_config(self.env_path))
+
+    def test_reload_updates_running_server(self):
+        """
+        Test that a file change reaches the server without a restart.
+        """
+        temp_dbs = [tempfile.mktemp(), tempfile.mktemp()]
+        server = ChatServer(
+            auth_manager=AuthenticationManager(database_path=temp_dbs[0]),
+            database_manager=DatabaseManager(database_path=temp_dbs[1])
+        )
+        old = get_config(self.env_path)
+        watcher = ConfigWatcher(self.env_path)
+        listener = lambda old, new: server.apply_config(new)
+        add_reload_listener(listener)
+        log_level = logging.getLogger().level
+        try:
+            self.write_env(messages_per_second=50, pool_size=8, log_level='WARNING', mode='reactor')
+            new = watcher.check()
+            self.assertEqual(logging.WARNING, logging.getLogger().level)
+        finally:
+            logging.getLogger().setLevel(log_level)
+            remove_reload_listener(listener)
+            for path in temp_dbs:
+                if os.path.exists(path):
+                    os.unlink(path)
+
+        self.assertIs(new, get_config(self.env_path))
+        self.assertEqual(50, server.rate_limits.user_messages.rate)
+        self.assertEqual(8, server.worker_pool_size)
+        self.assertEqual('threaded', server.mode)  # Needs a restart
+        self.assertEqual(['server.mode'], old.restart_required_changes(new))
+
+    def tearDown(self):
+        """
+        Remove the temporary .env file.
+        """
+        os.unlink(self.env_path)
+
+if __name__ == '__main__':
+    unittest.main()
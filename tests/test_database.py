@@ -0,0 +1,196 @@
+"""
+Unit tests for the database module.
+Validates message storage, direct conversations and schema migration.
+"""
+
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.authentication import AuthenticationManager
+from server.database import SCHEMA_VERSION, DatabaseManager
+
+class TestDatabaseManager(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a temporary database for testing.
+        """
+        self.temp_db = tempfile.mktemp()
+        self.database_manager = DatabaseManager(database_path=self.temp_db)
+
+    def test_conversation_includes_both_directions(self):
+        """
+        Test that a conversation returns messages sent either way, newest first.
+        """
+        self.database_manager.store_direct_message('alice', 'bob', 'hi bob')
+        self.database_manager.store_direct_message('bob', 'alice', 'hi alice')
+        self.database_manager.store_direct_message('alice', 'carol', 'unrelated')
+        self.database_manager.store_message('alice', 'room message')
+
+        conversation = self.database_manager.get_conversation('bob', 'alice')
+
+        self.assertEqual(['hi alice', 'hi bob'], [row['content'] for row in conversation])
+
+    def test_conversation_pagination(self):
+        """
+        Test fetching older messages with before_id.
+        """
+        ids = [
+            self.database_manager.store_direct_message('alice', 'bob', f'message {i}')
+            for i in range(5)
+        ]
+
+        page = self.database_manager.get_conversation('alice', 'bob', limit=2, before_id=ids[3])
+
+        self.assertEqual([ids[2], ids[1]], [row['id'] for row in page])
+
+    def test_room_history_pages_by_id(self):
+        """
+        Test paging back through room history, newest first.
+        """
+        ids = [self.database_manager.store_message('alice', f'room {i}') for i in range(5)]
+        self.database_manager.store_direct_message('alice', 'bob', 'not in the room')
+
+        latest = self.database_manager.get_messages_before(limit=2)
+        older = self.database_manager.get_messages_before(before_id=latest[-1]['id'], limit=10)
+
+        self.assertEqual([ids[4], ids[3]], [row['id'] for row in latest])
+        self.assertEqual([ids[2], ids[1], ids[0]], [row['id'] for row in older])
+
+    def test_export_does_not_block_writers(self):
+        """
+        Test that messages can be stored while a stream is part way through.
+        """
+        for i in range(5):
+            self.database_manager.store_message('alice', f'room {i}')
+
+        stream = self.database_manager.iter_messages(batch_size=2)
+        first = next(stream)
+        self.database_manager.store_message('bob', 'during export')
+
+        self.assertEqual('room 0', first['content'])
+        self.assertEqual(
+            ['room 1', 'room 2', 'room 3', 'room 4', 'during export'],
+            [row['content'] for row in stream]
+        )
+
+    def test_offline_delivery(self):
+        """
+        Test that undelivered messages are returned until marked delivered.
+        """
+        self.database_manager.store_direct_message('alice', 'bob', 'online', delivered=True)
+        offline_id = self.database_manager.store_direct_message(
+            'alice', 'bob', 'offline', delivered=False
+        )
+
+        pending = self.database_manager.get_undelivered_messages('bob')
+        self.assertEqual([offline_id], [row['id'] for row in pending])
+
+        self.database_manager.mark_messages_delivered([offline_id])
+        self.assertEqual([], self.database_manager.get_undelivered_messages('bob'))
+
+    def test_conversation_query_uses_index(self):
+        """
+        Ensure conversation lookups are served by the conversation index.
+        """
+        with sqlite3.connect(self.temp_db) as conn:
+            plan = conn.execute(
+                '''EXPLAIN QUERY PLAN SELECT * FROM messages
+                   WHERE conversation = ? AND id < ? ORDER BY id DESC LIMIT ?''',
+                ('alice:bob', 100, 10)
+            ).fetchall()
+
+        self.assertIn('idx_messages_conversation', ' '.join(str(row) for row in plan))
+
+    def test_migrates_old_schema(self):
+        """
+        Test that a messages table from an older version gains the new columns.
+        """
+        old_db = tempfile.mktemp()
+        try:
+            with sqlite3.connect(old_db) as conn:
+                conn.execute('''
+                    CREATE TABLE messages (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        sender TEXT,
+                        content TEXT,
+                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        room TEXT
+                    )
+                ''')
+
+            migrated = DatabaseManager(database_path=old_db)
+            migrated.store_direct_message('alice', 'bob', 'after migration')
+
+            self.assertEqual(1, len(migrated.get_conversation('alice', 'bob')))
+        finally:
+            os.unlink(old_db)
+
+    def test_imports_accounts_from_legacy_users_db_once(self):
+        """
+        Test that upgrading a version 1 database copies users.db accounts in, only once.
+        """
+        legacy_db, chat_db = tempfile.mktemp(), tempfile.mktemp()
+        try:
+            # Accounts as older versions stored them, next to a version 1 chat database
+            hashed = AuthenticationManager(storage=self.database_manager)._hash_password('password')
+            with sqlite3.connect(legacy_db) as conn:
+                conn.execute('CREATE TABLE users (username TEXT PRIMARY KEY, password_hash TEXT, salt TEXT)')
+                for username in ('alice', 'bob'):
+                    conn.execute(
+                        'INSERT INTO users VALUES (?, ?, ?)',
+                        (username, hashed['password_hash'], hashed['salt'])
+                    )
+            with sqlite3.connect(chat_db) as conn:
+                conn.execute('CREATE TABLE users (username TEXT PRIMARY KEY, last_seen DATETIME)')
+                conn.execute("INSERT INTO users (username, last_seen) VALUES ('alice', '2024-01-01 00:00:00')")
+                conn.execute('PRAGMA user_version = 1')
+
+            upgraded = DatabaseManager(database_path=chat_db, legacy_users_path=legacy_db)
+            auth = AuthenticationManager(storage=upgraded)
+            self.assertTrue(auth.authenticate_user('alice', 'password'))
+            self.assertTrue(auth.authenticate_user('bob', 'password'))
+
+            # Once upgraded, users.db is not read again
+            with sqlite3.connect(legacy_db) as conn:
+                conn.execute(
+                    'INSERT INTO users VALUES (?, ?, ?)',
+                    ('carol', hashed['password_hash'], hashed['salt'])
+                )
+            reopened = DatabaseManager(database_path=chat_db, legacy_users_path=legacy_db)
+            self.assertFalse(reopened.user_exists('carol'))
+        finally:
+            for path in (legacy_db, chat_db):
+                if os.path.exists(path):
+                    os.unlink(path)
+
+    def test_schema_version_skips_setup_on_restart(self):
+        """
+        Test that a database marked current is not checked again.
+        """
+        with sqlite3.connect(self.temp_db) as conn:
+            self.assertEqual(SCHEMA_VERSION, conn.execute('PRAGMA user_version').fetchone()[0])
+            conn.execute('DROP INDEX idx_messages_room')
+
+        DatabaseManager(database_path=self.temp_db)
+
+        with sqlite3.connect(self.temp_db) as conn:
+            indexes = conn.execute(
+                "SELECT name FROM sqlite_master WHERE name = 'idx_messages_room'"
+            ).fetchall()
+        self.assertEqual([], indexes)
+
+    def tearDown(self):
+        """
+        Clean up temporary database after tests.
+        """
+        if os.path.exists(self.temp_db):
+            os.unlink(self.temp_db)
+
+if __name__ == '__main__':
+    unittest.main()
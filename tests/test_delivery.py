@@ -0,0 +1,211 @@
+"""
+Unit tests for delivery acknowledgements and de-duplication.
+Validates that resent messages are stored once and ACKs are batched.
+"""
+
+import unittest
+import sys
+import os
+import json
+import queue
+import socket
+import tempfile
+from unittest import mock
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from client.client import ChatClient
+from security.encryption import SecureEncryption
+from server.authentication import AuthenticationManager
+from server.database import DatabaseManager
+from server.dedup import DeduplicationWindow
+from server.server import ChatServer
+from server.session import ClientSession
+from tests.server_harness import ServerTestCase
+from utils.protocol import recv_frame
+
+class TestDeduplicationWindow(unittest.TestCase):
+    def test_remembers_stored_ids(self):
+        """
+        Test that a recorded message is found for the same sender only.
+        """
+        window = DeduplicationWindow()
+        window.record('alice', 'm1', 42)
+
+        self.assertEqual(42, window.get('alice', 'm1'))
+        self.assertIsNone(window.get('bob', 'm1'))
+
+    def test_window_is_bounded(self):
+        """
+        Test that the oldest IDs are forgotten once the window is full.
+        """
+        window = DeduplicationWindow(max_entries=3)
+        for i in range(5):
+            window.record('alice', f'm{i}', i)
+
+        self.assertEqual(3, len(window))
+        self.assertIsNone(window.get('alice', 'm0'))
+        self.assertEqual(4, window.get('alice', 'm4'))
+
+class TestServerAcknowledgements(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a server with temporary databases and two socket-pair sessions.
+        """
+        self.temp_dbs = [tempfile.mktemp(), tempfile.mktemp()]
+        self.server = ChatServer(
+            auth_manager=AuthenticationManager(database_path=self.temp_dbs[0]),
+            database_manager=DatabaseManager(database_path=self.temp_dbs[1])
+        )
+        self.peers = {}
+        for username in ('alice', 'bob'):
+            server_end, client_end = socket.socketpair()
+            client_end.settimeout(2)
+            session = ClientSession(server_end, None, SecureEncryption(), username)
+            self.server.clients.add(session)
+            self.peers[username] = (session, client_end)
+
+    def receive(self, username):
+        session, client_end = self.peers[username]
+        return json.loads(session.cipher.decrypt_bytes(recv_frame(client_end)).decode('utf-8'))
+
+    def send(self, username, msg_id, message):
+        session, _ = self.peers[username]
+        self.server._handle_message(session, json.dumps({
+            'type': 'message', 'msg_id': msg_id, 'message': message
+        }))
+
+    def test_resend_is_stored_once_and_acked_with_same_id(self):
+        """
+        Test that a resent message is acknowledged again but not stored or broadcast again.
+        """
+        self.send('alice', 'm1', 'hello')
+        self.send('alice', 'm1', 'hello')
+        self.server._flush_acks()
+
+        ack = self.receive('alice')
+        stored = self.server.database_manager.get_recent_messages()
+
+        self.assertEqual('ack', ack['type'])
+        self.assertEqual([['m1', stored[0]['id']], ['m1', stored[0]['id']]], ack['acks'])
+        self.assertEqual(1, len(stored))
+        self.assertEqual('hello', self.receive('bob')['message'])
+
+        bob_end = self.peers['bob'][1]
+        bob_end.setblocking(False)
+        with self.assertRaises(BlockingIOError):
+            bob_end.recv(1)
+
+    def test_acks_piggyback_on_outbound_traffic(self):
+        """
+        Test that pending ACKs ride on the next frame instead of a separate one.
+        """
+        self.send('alice', 'm1', 'first')
+        self.send('alice', 'm2', 'second')
+        self.send('bob', 'b1', 'reply')
+
+        message = self.receive('alice')
+
+        self.assertEqual('reply', message['message'])
+        self.assertEqual(['m1', 'm2'], [ack[0] for ack in message['acks']])
+
+        self.server._flush_acks()
+        alice_end = self.peers['alice'][1]
+        alice_end.setblocking(False)
+        with self.assertRaises(BlockingIOError):
+            alice_end.recv(1)
+
+    def test_history_request_returns_older_page(self):
+        """
+        Test that a history request is answered with a capped page of room messages.
+        """
+        for i in range(3):
+            self.server.database_manager.store_message('bob', f'old {i}')
+
+        session, _ = self.peers['alice']
+        self.server._handle_message(session, json.dumps({
+            'type': 'history', 'before_id': None, 'limit': 2
+        }))
+        page = self.receive('alice')
+
+        self.assertEqual('history', page['type'])
+        self.assertEqual(['old 2', 'old 1'], [row['message'] for row in page['messages']])
+        self.assertEqual(
+            ['bob: old 1', 'bob: old 2'],
+            ChatClient.format_message(page)
+        )
+
+    def tearDown(self):
+        """
+        Close sockets and remove temporary databases.
+        """
+        for session, client_end in self.peers.values():
+            session.socket.close()
+            client_end.close()
+        for path in self.temp_dbs:
+            if os.path.exists(path):
+                os.unlink(path)
+
+class TestClientTracking(unittest.TestCase):
+    def test_messages_tracked_until_acknowledged(self):
+        """
+        Test that the client keeps unacknowledged messages for resending.
+        """
+        client = ChatClient()
+        first = client.send_message('queued while offline', 'alice')
+        second = client.send_direct_message('bob', 'also queued')
+
+        self.assertEqual([first, second], list(client.unacknowledged))
+
+        client._handle_acks([[first, 7]])
+        self.assertEqual([second], list(client.unacknowledged))
+
+    def test_unacknowledged_messages_are_capped(self):
+        """
+        Test that the oldest tracked messages are given up beyond the cap.
+        """
+        client = ChatClient()
+        with mock.patch('client.client.MAX_UNACKNOWLEDGED', 3):
+            ids = [client.send_message(f'queued {i}', 'alice') for i in range(5)]
+
+        self.assertEqual(ids[2:], list(client.unacknowledged))
+
+    def test_repeat_deliveries_are_dropped(self):
+        """
+        Test that a message delivered twice is only shown once.
+        """
+        client = ChatClient()
+        message = {'type': 'message', 'id': 5, 'sender': 'bob', 'message': 'hi'}
+
+        self.assertFalse(client._is_repeat_delivery(message))
+        self.assertTrue(client._is_repeat_delivery(dict(message)))
+
+class TestRejectedMessages(ServerTestCase):
+    def setUp(self):
+        """
+        Start a server on a free port with one account.
+        """
+        super().setUp()
+        self.server, _ = self.start_server(users=('alice',))
+
+    def test_refused_message_is_not_resent(self):
+        """
+        Test that a direct message to a missing user is dropped by the client, not resent on reconnect.
+        """
+        client = self.connect(self.server, 'alice')
+        try:
+            msg_id = client.send_direct_message('nobody', 'hello?')
+            error = self.next_message(client, 'error')
+            self.assertEqual(msg_id, error['msg_id'])
+            self.assertEqual({}, dict(client.unacknowledged))
+
+            client.disconnect()
+            self.assertTrue(client.connect('alice', 'password'))
+            with self.assertRaises(queue.Empty):
+                self.next_message(client, 'error', timeout=1)
+        finally:
+            client.disconnect()
+
+if __name__ == '__main__':
+    unittest.main()
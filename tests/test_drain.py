@@ -0,0 +1,88 @@
+"""
+Integration tests for graceful drain and listening socket handoff.
+Validates that clients get a reconnect hint and state is flushed on shutdown.
+"""
+
+import unittest
+import json
+import os
+import socket
+import sqlite3
+import sys
+import textwrap
+import threading
+
+# Add project root to Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from server.handoff import spawn_successor
+from tests.server_harness import ServerTestCase
+
+class TestGracefulDrain(ServerTestCase):
+    def test_drain_sends_jittered_reconnect_and_flushes(self):
+        """
+        Test that draining hints clients to reconnect, closes them and stops the server.
+        """
+        for mode in ('threaded', 'reactor'):
+            with self.subTest(mode=mode):
+                server, thread = self.start_server(mode, users=('alice',))
+                alice = self.login(server, 'alice')
+                port = server.port
+
+                result = []
+                drainer = threading.Thread(
+                    target=lambda: result.append(server.drain(reconnect_window=0.5, timeout=5))
+                )
+                drainer.start()
+
+                message = json.loads(alice._recv_decrypted())
+                while message['type'] != 'reconnect':
+                    message = json.loads(alice._recv_decrypted())
+                self.assertTrue(0 <= message['delay'] <= 0.5)
+                self.assertIsNone(alice._recv_decrypted())
+                alice.disconnect()
+
+                drainer.join(timeout=10)
+                thread.join(timeout=10)
+                self.assertEqual([True], result)
+                self.assertFalse(thread.is_alive())
+                with self.assertRaises(ConnectionRefusedError):
+                    socket.create_connection(('127.0.0.1', port), timeout=1)
+
+                with sqlite3.connect(server.database_manager.database_path) as conn:
+                    last_seen = conn.execute(
+                        "SELECT last_seen FROM users WHERE username = 'alice'"
+                    ).fetchone()
+                self.assertIsNotNone(last_seen)
+
+    def test_successor_serves_inherited_socket(self):
+        """
+        Test that a spawned process accepts on the listening socket it inherits.
+        """
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(5)
+        port = listener.getsockname()[1]
+
+        script = textwrap.dedent(f"""
+            import socket, sys
+            sys.path.insert(0, {PROJECT_ROOT!r})
+            from server.handoff import inherited_listen_fd, notify_ready
+            listener = socket.socket(fileno=inherited_listen_fd())
+            notify_ready()
+            connection, _ = listener.accept()
+            connection.sendall(b'successor')
+            connection.close()
+        """)
+        successor = spawn_successor(listener, argv=[sys.executable, '-c', script], timeout=10)
+        try:
+            # The old process stops accepting; the successor takes the connection
+            listener.close()
+            with socket.create_connection(('127.0.0.1', port), timeout=5) as client:
+                self.assertEqual(b'successor', client.recv(16))
+        finally:
+            successor.wait(timeout=10)
+
+if __name__ == '__main__':
+    unittest.main()
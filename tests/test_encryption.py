@@ -4,13 +4,18 @@ Validates encryption and decryption functionality.
 """
 
 import unittest
+import ssl
 import sys
 import os
 
 # Add project root to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from client.async_client import AsyncChatClient
+from client.client import ChatClient
+from security.cipher_backends import BACKENDS, resolve_backend_name
 from security.encryption import SecureEncryption
+from security.key_exchange import KeyExchange
 
 class TestSecureEncryption(unittest.TestCase):
     def setUp(self):
@@ -63,5 +68,106 @@ class TestSecureEncryption(unittest.TestCase):
             "Special character message encryption failed"
         )
 
+class TestCipherBackends(unittest.TestCase):
+    def test_every_backend_round_trips(self):
+        """
+        Test bytes and string round trips for each backend.
+        """
+        payload = "Hello, Secure World! \u00e9\u00e8"
+        for name in BACKENDS:
+            with self.subTest(backend=name):
+                encryptor = SecureEncryption(backend=name)
+                self.assertEqual(payload, encryptor.decrypt(encryptor.encrypt(payload)))
+                self.assertEqual(
+                    b'\x00\xffraw',
+                    encryptor.decrypt_bytes(encryptor.encrypt_bytes(b'\x00\xffraw'))
+                )
+
+    def test_aead_rejects_tampering(self):
+        """
+        Ensure a modified AEAD ciphertext fails authentication.
+        """
+        for name in ('aes-gcm', 'chacha20-poly1305'):
+            with self.subTest(backend=name):
+                encryptor = SecureEncryption(backend=name)
+                token = bytearray(encryptor.encrypt_bytes(b'payload'))
+                token[-1] ^= 1
+                with self.assertRaises(Exception):
+                    encryptor.decrypt_bytes(bytes(token))
+
+    def test_aead_output_is_smaller_than_fernet(self):
+        """
+        Test that raw AEAD output avoids Fernet's base64 inflation.
+        """
+        payload = b'x' * 1024
+        fernet_size = len(SecureEncryption(backend='fernet').encrypt_bytes(payload))
+        aead_size = len(SecureEncryption(backend='aead').encrypt_bytes(payload))
+        
+        self.assertLess(aead_size, fernet_size)
+        self.assertEqual(len(payload) + 28, aead_size)
+
+    def test_aead_alias_resolves_to_concrete_backend(self):
+        """
+        Test that 'aead' picks one of the AEAD ciphers and bad names are rejected.
+        """
+        self.assertIn(resolve_backend_name('aead'), ('aes-gcm', 'chacha20-poly1305'))
+        with self.assertRaises(ValueError):
+            resolve_backend_name('rot13')
+
+class TestKeyExchange(unittest.TestCase):
+    def test_both_sides_derive_same_key(self):
+        """
+        Test that server and client agree on the session key.
+        """
+        server = KeyExchange()
+        client = KeyExchange()
+        
+        server_key = server.derive_session_key(
+            KeyExchange.parse_hello(client.hello_frame())[0], is_server=True
+        )
+        client_key = client.derive_session_key(
+            KeyExchange.parse_hello(server.hello_frame())[0], is_server=False
+        )
+        
+        self.assertEqual(server_key, client_key, "Session keys should match")
+
+    def test_session_ciphers_interoperate(self):
+        """
+        Test that ciphers built from the agreed key decrypt each other's messages.
+        """
+        server = KeyExchange()
+        client = KeyExchange()
+        server_cipher = SecureEncryption.from_session_key(
+            server.derive_session_key(client.public_bytes, is_server=True)
+        )
+        client_cipher = SecureEncryption.from_session_key(
+            client.derive_session_key(server.public_bytes, is_server=False)
+        )
+        
+        self.assertEqual("ping", server_cipher.decrypt(client_cipher.encrypt("ping")))
+
+    def test_sessions_get_distinct_keys(self):
+        """
+        Ensure two connections never share a session key.
+        """
+        server = KeyExchange()
+        first = server.derive_session_key(KeyExchange().public_bytes, is_server=True)
+        second = server.derive_session_key(KeyExchange().public_bytes, is_server=True)
+        
+        self.assertNotEqual(first, second)
+
+    def test_clients_refuse_remote_plaintext_logins(self):
+        """
+        Ensure credentials only cross the network over TLS unless explicitly allowed.
+        """
+        for client_class in (ChatClient, AsyncChatClient):
+            with self.assertRaises(ValueError):
+                client_class('chat.example.com', 5000)
+            client_class('127.0.0.1', 5000)
+            client_class('::1', 5000)
+            client_class('localhost', 5000)
+            client_class('chat.example.com', 5000, ssl_context=ssl.create_default_context())
+            client_class('chat.example.com', 5000, allow_plaintext=True)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
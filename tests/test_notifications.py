@@ -0,0 +1,155 @@
+"""
+Unit tests for mention and keyword notifications.
+Validates the keyword matcher, the subscription index and notify-only fan-out.
+"""
+
+import unittest
+import sys
+import os
+import json
+import socket
+import tempfile
+import time
+from unittest import mock
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from client.client import ChatClient
+from security.encryption import SecureEncryption
+from server.database import DatabaseManager
+from server.notifications import KeywordMatcher, NotificationIndex
+from server.server import ChatServer
+from server.session import ClientSession
+from utils.protocol import recv_frame
+
+class TestKeywordMatcher(unittest.TestCase):
+    def test_matches_whole_words_in_any_case(self):
+        """
+        Test overlapping keywords, phrases and word boundaries in one pass.
+        """
+        matcher = KeywordMatcher(['he', 'she', 'hers', 'deploy', 'deploy failed', 'ploy'])
+
+        found = matcher.find('She said: the DEPLOY failed, hers too (deployment ushers)')
+
+        self.assertEqual({'she', 'hers', 'deploy', 'deploy failed'}, found)
+
+    def test_no_keywords_matches_nothing(self):
+        """
+        Test that an empty matcher scans without matching.
+        """
+        self.assertEqual(set(), KeywordMatcher([]).find('anything at all'))
+
+class TestNotificationIndex(unittest.TestCase):
+    def test_mentions_and_keywords(self):
+        """
+        Test that mentions always match and keywords follow subscriptions.
+        """
+        index = NotificationIndex()
+        self.assertEqual({'carol'}, index.match('hi @carol'))
+
+        index.subscribe('alice', ['Outage', ' ', 42])
+        index.subscribe('bob', ['outage', 'release'])
+        self.assertEqual(frozenset({'outage'}), index.keywords('alice'))
+        self.assertEqual({'alice', 'bob', 'carol'}, index.match('@carol outage!'))
+
+        index.subscribe('bob', ['release'])
+        index.unsubscribe('alice')
+        self.assertEqual(set(), index.match('outage'))
+        self.assertEqual({'bob'}, index.match('release notes'))
+
+    def test_matcher_is_rebuilt_off_the_message_path(self):
+        """
+        Test that matching never builds the matcher and changes stay exact until a background rebuild.
+        """
+        index = NotificationIndex(rebuild_delay=0.05)
+        with mock.patch('server.notifications.KeywordMatcher', wraps=KeywordMatcher) as build:
+            index.subscribe('alice', ['outage'])
+            index.subscribe('bob', ['release'])
+            self.assertEqual({'alice'}, index.match('Outage in eu-west'))
+            self.assertEqual(set(), index.match('outages'))
+            self.assertEqual(0, build.call_count)
+
+            deadline = time.monotonic() + 5
+            while index._matcher is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(1, build.call_count)
+
+            # Leaving does not invalidate the matcher for the next message
+            index.unsubscribe('alice')
+            self.assertEqual(set(), index.match('outage'))
+            self.assertEqual({'bob'}, index.match('release notes'))
+            self.assertEqual(1, build.call_count)
+        index.close()
+
+class TestNotificationFanOut(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a server with a temporary database and three socket-pair sessions.
+        """
+        self.temp_db = tempfile.mktemp()
+        self.server = ChatServer(database_manager=DatabaseManager(database_path=self.temp_db))
+        self.peers = {}
+        for username in ('alice', 'bob', 'carol'):
+            server_end, client_end = socket.socketpair()
+            client_end.settimeout(0.5)
+            session = ClientSession(server_end, None, SecureEncryption(), username)
+            self.server.clients.add(session)
+            self.peers[username] = (session, client_end)
+
+    def receive(self, username):
+        session, client_end = self.peers[username]
+        return json.loads(session.cipher.decrypt_bytes(recv_frame(client_end)).decode('utf-8'))
+
+    def send(self, username, payload):
+        session, _ = self.peers[username]
+        self.server._handle_message(session, json.dumps(payload))
+
+    def test_notify_only_sessions_receive_matching_messages(self):
+        """
+        Test that tagged messages reach notify-only users and others are skipped.
+        """
+        self.send('bob', {'type': 'subscribe', 'keywords': ['Deploy'], 'notify_only': True})
+        subscribed = self.receive('bob')
+        self.assertEqual(['deploy'], subscribed['keywords'])
+        self.assertTrue(subscribed['notify_only'])
+
+        self.send('alice', {'type': 'message', 'message': 'lunch?'})
+        self.send('alice', {'type': 'message', 'message': 'deploy is done'})
+        self.send('alice', {'type': 'message', 'message': '@carol can you check'})
+
+        tagged = self.receive('bob')
+        self.assertEqual('deploy is done', tagged['message'])
+        self.assertTrue(tagged['notify'])
+        with self.assertRaises(socket.timeout):
+            self.receive('bob')
+
+        carol = [self.receive('carol') for _ in range(3)]
+        self.assertEqual([None, None, True], [message.get('notify') for message in carol])
+        self.assertEqual(
+            ['[!] alice: @carol can you check'],
+            ChatClient.format_message(carol[2])
+        )
+
+    def test_disconnect_drops_subscription(self):
+        """
+        Test that keywords of a user who left no longer match.
+        """
+        self.send('bob', {'type': 'subscribe', 'keywords': ['deploy']})
+        session, client_end = self.peers['bob']
+        self.server._close_client(session.socket, session)
+
+        self.assertEqual(set(), self.server.notifications.match('deploy'))
+
+    def tearDown(self):
+        """
+        Close the socket pairs and remove the temporary database.
+        """
+        for session, client_end in self.peers.values():
+            session.socket.close()
+            client_end.close()
+        if os.path.exists(self.temp_db):
+            os.unlink(self.temp_db)
+
+if __name__ == '__main__':
+    unittest.main()
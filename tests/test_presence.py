@@ -0,0 +1,107 @@
+"""
+Unit tests for the presence tracking module.
+Validates coalescing of presence changes and batched last-seen writes.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.database import DatabaseManager
+from server.presence import PresenceTracker
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1700000000.0
+
+    def __call__(self):
+        return self.now
+
+class RecordingDatabase:
+    def __init__(self):
+        self.batches = []
+
+    def update_users_last_seen(self, last_seen):
+        self.batches.append(dict(last_seen))
+
+class TestPresenceTracker(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a tracker with a fake clock and a recording database.
+        """
+        self.clock = FakeClock()
+        self.database = RecordingDatabase()
+        self.tracker = PresenceTracker(self.database, typing_timeout=5.0, clock=self.clock)
+
+    def test_many_events_coalesce_into_one_change(self):
+        """
+        Test that a burst of events for one user yields a single pushed change.
+        """
+        self.tracker.connected('alice')
+        for _ in range(50):
+            self.tracker.typing('alice')
+        self.tracker.activity('alice')
+
+        changes = self.tracker.drain_changes()
+
+        self.assertEqual(1, len(changes))
+        self.assertEqual((True, False), (changes[0]['online'], changes[0]['typing']))
+        self.assertEqual([], self.tracker.drain_changes())
+
+    def test_last_seen_written_in_one_batch(self):
+        """
+        Test that activity from many users is flushed as one batch write.
+        """
+        for i in range(100):
+            self.tracker.connected(f'user{i}')
+            for _ in range(10):
+                self.tracker.activity(f'user{i}')
+
+        self.assertEqual(100, self.tracker.flush_last_seen())
+        self.assertEqual(1, len(self.database.batches))
+        self.assertEqual(0, self.tracker.flush_last_seen())
+
+    def test_typing_expires(self):
+        """
+        Test that a typing indicator with no follow-up is reported as stopped.
+        """
+        self.tracker.connected('alice')
+        self.tracker.typing('alice')
+        self.assertTrue(self.tracker.drain_changes()[0]['typing'])
+
+        self.clock.now += 6
+        changes = self.tracker.drain_changes()
+
+        self.assertEqual(1, len(changes))
+        self.assertFalse(changes[0]['typing'])
+
+    def test_online_users(self):
+        """
+        Test that disconnecting removes a user from the online list.
+        """
+        self.tracker.connected('alice')
+        self.tracker.connected('bob')
+        self.tracker.disconnected('alice')
+
+        self.assertEqual(['bob'], self.tracker.online_users())
+
+    def test_flush_writes_to_database(self):
+        """
+        Test the batch write against a real database.
+        """
+        temp_db = tempfile.mktemp()
+        try:
+            tracker = PresenceTracker(DatabaseManager(database_path=temp_db), clock=self.clock)
+            tracker.connected('alice')
+            tracker.connected('bob')
+
+            self.assertEqual(2, tracker.flush_last_seen())
+        finally:
+            os.unlink(temp_db)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Unit tests for the wire protocol module.
+Validates length-prefixed framing over a socket pair, blocking and non-blocking.
+"""
+
+import unittest
+import sys
+import os
+import socket
+import threading
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.protocol import FRAME_HEADER, FrameBuffer, FrameError, MAX_FRAME_SIZE, recv_frame, send_frame
+
+class TestFraming(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a connected socket pair for each test.
+        """
+        self.left, self.right = socket.socketpair()
+
+    def test_frames_keep_boundaries(self):
+        """
+        Test that back-to-back frames are received separately.
+        """
+        for payload in (b'first', b'', b'third' * 1000):
+            send_frame(self.left, payload)
+
+        self.assertEqual(b'first', recv_frame(self.right))
+        self.assertEqual(b'', recv_frame(self.right))
+        self.assertEqual(b'third' * 1000, recv_frame(self.right))
+
+    def test_closed_connection_returns_none(self):
+        """
+        Test that a clean close is reported as None.
+        """
+        self.left.close()
+        self.assertIsNone(recv_frame(self.right))
+
+    def test_oversized_frame_rejected(self):
+        """
+        Test that a header announcing an oversized frame raises FrameError.
+        """
+        self.left.sendall(FRAME_HEADER.pack(MAX_FRAME_SIZE + 1))
+        with self.assertRaises(FrameError):
+            recv_frame(self.right)
+
+    def test_nonblocking_send_waits_for_slow_reader(self):
+        """
+        Test that a frame larger than the socket buffers goes out whole on a non-blocking socket.
+        """
+        payload = os.urandom(MAX_FRAME_SIZE)
+        self.left.setblocking(False)
+        received = []
+        reader = threading.Thread(target=lambda: received.append(recv_frame(self.right)))
+        reader.start()
+        send_frame(self.left, payload)
+        reader.join(timeout=5)
+
+        self.assertEqual([payload], received)
+
+    def test_frame_buffer_reassembles_partial_reads(self):
+        """
+        Test that frames split across and packed into reads come out whole and in order.
+        """
+        stream = b''.join(FRAME_HEADER.pack(len(p)) + p for p in (b'first', b'', b'third' * 1000))
+        frames = FrameBuffer()
+
+        received = []
+        for start in range(0, len(stream), 7):
+            received.extend(frames.feed(stream[start:start + 7]))
+        self.assertEqual([b'first', b'', b'third' * 1000], received)
+        self.assertEqual([b'first', b''], frames.feed(stream[:FRAME_HEADER.size * 2 + 5 + 2]))
+
+        with self.assertRaises(FrameError):
+            FrameBuffer().feed(FRAME_HEADER.pack(MAX_FRAME_SIZE + 1))
+
+    def tearDown(self):
+        """
+        Close the socket pair.
+        """
+        self.left.close()
+        self.right.close()
+
+if __name__ == '__main__':
+    unittest.main()
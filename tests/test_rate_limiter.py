@@ -0,0 +1,103 @@
+"""
+Unit tests for the rate limiting module.
+Validates token-bucket behaviour, eviction and server throttling limits.
+"""
+
+import unittest
+import sys
+import os
+import time
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server.rate_limiter import ServerRateLimits, TokenBucketLimiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestTokenBucketLimiter(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a limiter driven by a fake clock.
+        """
+        self.clock = FakeClock()
+        self.limiter = TokenBucketLimiter(rate=2.0, burst=3, clock=self.clock)
+
+    def test_burst_then_throttle(self):
+        """
+        Test that exactly the burst is allowed at once.
+        """
+        results = [self.limiter.allow('bot') for _ in range(5)]
+        self.assertEqual([True, True, True, False, False], results)
+
+    def test_refill_over_time(self):
+        """
+        Test that tokens come back at the configured rate.
+        """
+        for _ in range(3):
+            self.limiter.allow('bot')
+        self.assertFalse(self.limiter.allow('bot'))
+
+        self.clock.now += 0.5
+        self.assertTrue(self.limiter.allow('bot'))
+        self.assertFalse(self.limiter.allow('bot'))
+
+    def test_keys_are_independent(self):
+        """
+        Test that one noisy key does not throttle another.
+        """
+        for _ in range(5):
+            self.limiter.allow('noisy')
+        self.assertTrue(self.limiter.allow('quiet'))
+
+    def test_refilled_buckets_are_forgotten(self):
+        """
+        Test that keys whose buckets have refilled are evicted.
+        """
+        self.limiter.allow('a')
+        self.clock.now += 10
+        self.limiter.allow('b')
+
+        self.assertEqual(1, len(self.limiter))
+
+    def test_scales_to_100k_keys(self):
+        """
+        Test that key count stays bounded and lookups stay fast at 100k keys.
+        """
+        limiter = TokenBucketLimiter(rate=1.0, burst=5, max_keys=100000)
+        start = time.perf_counter()
+        for i in range(120000):
+            limiter.allow(i)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(100000, len(limiter))
+        self.assertLess(elapsed, 5.0)
+
+class TestServerRateLimits(unittest.TestCase):
+    def test_counts_throttled_events(self):
+        """
+        Test that throttled messages and logins are counted by cause.
+        """
+        limits = ServerRateLimits(
+            messages_per_second=1, message_burst=1,
+            ip_messages_per_second=100, ip_message_burst=100,
+            auth_attempts_per_minute=1, auth_burst=1
+        )
+
+        self.assertTrue(limits.allow_message('bot', '10.0.0.1'))
+        self.assertFalse(limits.allow_message('bot', '10.0.0.1'))
+        self.assertTrue(limits.allow_auth('bot', '10.0.0.1'))
+        self.assertFalse(limits.allow_auth('other', '10.0.0.1'))
+
+        self.assertEqual(
+            {'message_throttled_user': 1, 'auth_throttled_ip': 1},
+            limits.counters.snapshot()
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+Concurrency tests for the session registry.
+Stress connects, disconnects and fan-out iteration from many threads.
+"""
+
+import unittest
+import sys
+import os
+import socket
+import tempfile
+import threading
+import time
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from security.encryption import SecureEncryption
+from server.authentication import AuthenticationManager
+from server.database import DatabaseManager
+from server.server import ChatServer
+from server.session import ClientSession, SessionRegistry
+
+def make_session(username, client_socket=None):
+    return ClientSession(client_socket, None, None, username)
+
+class TestSessionRegistry(unittest.TestCase):
+    def test_add_get_remove(self):
+        """
+        Test basic registration and lookup.
+        """
+        registry = SessionRegistry(shard_count=4)
+        session = make_session('alice')
+
+        self.assertIsNone(registry.add(session))
+        self.assertIs(session, registry.get('alice'))
+        self.assertIn('alice', registry)
+        self.assertEqual(1, len(registry))
+        self.assertTrue(registry.remove('alice'))
+        self.assertNotIn('alice', registry)
+
+    def test_stale_session_cannot_remove_newer_login(self):
+        """
+        Test that cleanup of an old connection leaves a re-login in place.
+        """
+        registry = SessionRegistry()
+        old, new = make_session('alice'), make_session('alice')
+        registry.add(old)
+
+        self.assertIs(old, registry.add(new))
+        self.assertFalse(registry.remove('alice', old))
+        self.assertIs(new, registry.get('alice'))
+
+    def test_snapshot_is_shared_until_modified(self):
+        """
+        Test that snapshots are reused on a stable registry and refreshed after writes.
+        """
+        registry = SessionRegistry()
+        registry.add(make_session('alice'))
+        first = registry.snapshot()
+
+        self.assertIs(first, registry.snapshot())
+
+        registry.add(make_session('bob'))
+        self.assertEqual({'alice', 'bob'}, {s.username for s in registry.snapshot()})
+
+    def test_churn_during_iteration(self):
+        """
+        Stress thousands of connects and disconnects while fan-out iterates.
+        """
+        registry = SessionRegistry()
+        for i in range(200):
+            registry.add(make_session(f'stable{i}'))
+
+        errors = []
+        stop = threading.Event()
+        iterations = [0]
+
+        def churn(worker):
+            try:
+                for i in range(2000):
+                    session = make_session(f'w{worker}-{i % 50}')
+                    registry.add(session)
+                    registry.remove(session.username, session)
+            except Exception as e:
+                errors.append(e)
+
+        def fan_out():
+            try:
+                while not stop.is_set():
+                    for session in registry.snapshot():
+                        session.username
+                    iterations[0] += 1
+            except Exception as e:
+                errors.append(e)
+
+        readers = [threading.Thread(target=fan_out) for _ in range(2)]
+        writers = [threading.Thread(target=churn, args=(w,)) for w in range(8)]
+        start = time.perf_counter()
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+        self.assertEqual([], errors)
+        self.assertEqual(200, len(registry), "Only the stable sessions should remain")
+        self.assertGreater(iterations[0], 0)
+        self.assertGreater(8 * 2000 * 2 / elapsed, 1000, "Expected thousands of operations per second")
+
+class TestBroadcastUnderChurn(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a server with temporary databases.
+        """
+        self.temp_dbs = [tempfile.mktemp(), tempfile.mktemp()]
+        self.server = ChatServer(
+            auth_manager=AuthenticationManager(database_path=self.temp_dbs[0]),
+            database_manager=DatabaseManager(database_path=self.temp_dbs[1])
+        )
+
+    def test_broadcast_while_clients_come_and_go(self):
+        """
+        Broadcast continuously while sessions connect and disconnect, some with dead sockets.
+        """
+        listeners = []
+        received = []
+        for i in range(5):
+            server_end, client_end = socket.socketpair()
+            self.server.clients.add(ClientSession(server_end, None, SecureEncryption(), f'listener{i}'))
+            listeners.append((server_end, client_end))
+
+        def drain(client_end):
+            total = 0
+            while True:
+                data = client_end.recv(65536)
+                if not data:
+                    break
+                total += len(data)
+            received.append(total)
+
+        drainers = [threading.Thread(target=drain, args=(c,)) for _, c in listeners]
+        for thread in drainers:
+            thread.start()
+
+        errors = []
+
+        def churn():
+            try:
+                for i in range(500):
+                    server_end, client_end = socket.socketpair()
+                    client_end.close()  # Sends to this session fail immediately
+                    session = ClientSession(server_end, None, SecureEncryption(), f'churn{i % 20}')
+                    self.server.clients.add(session)
+                    self.server.clients.remove(session.username, session)
+                    server_end.close()
+            except Exception as e:
+                errors.append(e)
+
+        def broadcast():
+            try:
+                for i in range(100):
+                    self.server._broadcast_message('sender', f'message {i}')
+            except Exception as e:
+                errors.append(e)
+
+        workers = [threading.Thread(target=churn) for _ in range(4)]
+        workers.append(threading.Thread(target=broadcast))
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        for server_end, _ in listeners:
+            server_end.close()
+        for thread in drainers:
+            thread.join(timeout=5)
+
+        self.assertEqual([], errors)
+        self.assertEqual(5, len(received))
+        self.assertTrue(all(total > 0 for total in received))
+
+    def tearDown(self):
+        """
+        Remove temporary databases.
+        """
+        for path in self.temp_dbs:
+            if os.path.exists(path):
+                os.unlink(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Unit tests for the SSL/TLS configuration module.
+Validates certificate caching, shared contexts and session resumption.
+"""
+
+import unittest
+import sys
+import os
+import socket
+import shutil
+import tempfile
+import threading
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cryptography import x509
+from cryptography.hazmat.primitives.asymmetric import ec
+from security.ssl_config import (
+    SSLConfiguration,
+    TLSSessionCache,
+    get_client_context,
+    get_server_context
+)
+
+class TestSSLConfiguration(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a temporary certificate directory for each test.
+        """
+        self.cert_dir = tempfile.mkdtemp()
+        self.ssl_config = SSLConfiguration(output_dir=self.cert_dir)
+
+    def test_generates_ecdsa_certificate(self):
+        """
+        Test that certificates use an ECDSA key by default.
+        """
+        cert_path, _ = self.ssl_config.generate_self_signed_cert()
+        with open(cert_path, 'rb') as f:
+            cert = x509.load_pem_x509_certificate(f.read())
+
+        self.assertIsInstance(cert.public_key(), ec.EllipticCurvePublicKey)
+
+    def test_cached_certificate_is_reused(self):
+        """
+        Test that a second call reuses the certificate instead of regenerating it.
+        """
+        cert_path, key_path = self.ssl_config.generate_self_signed_cert()
+        with open(cert_path, 'rb') as f:
+            first = f.read()
+
+        self.assertEqual((cert_path, key_path), self.ssl_config.generate_self_signed_cert())
+        with open(cert_path, 'rb') as f:
+            self.assertEqual(first, f.read(), "Cached certificate should not be rewritten")
+
+    def test_key_type_change_regenerates(self):
+        """
+        Test that a cached certificate with a different key type is replaced.
+        """
+        self.ssl_config.generate_self_signed_cert()
+        rsa_config = SSLConfiguration(output_dir=self.cert_dir, key_type='rsa')
+
+        self.assertFalse(rsa_config._cached_cert_is_valid())
+
+    def test_shared_server_context(self):
+        """
+        Test that the same certificate yields the same process-wide context.
+        """
+        cert_path, key_path = self.ssl_config.generate_self_signed_cert()
+
+        self.assertIs(
+            get_server_context(cert_path, key_path),
+            get_server_context(cert_path, key_path)
+        )
+
+    def test_session_resumption(self):
+        """
+        Test that a reconnect resumes the cached TLS session.
+        """
+        cert_path, key_path = self.ssl_config.generate_self_signed_cert()
+        server_context = get_server_context(cert_path, key_path)
+        client_context = get_client_context(cafile=cert_path)
+        cache = TLSSessionCache()
+
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(5)
+        port = listener.getsockname()[1]
+
+        def serve(count):
+            for _ in range(count):
+                conn, _ = listener.accept()
+                with server_context.wrap_socket(conn, server_side=True) as tls_conn:
+                    tls_conn.sendall(b'x')
+                    tls_conn.recv(1)
+
+        server_thread = threading.Thread(target=serve, args=(2,), daemon=True)
+        server_thread.start()
+
+        reused = []
+        for _ in range(2):
+            sock = socket.create_connection(('127.0.0.1', port))
+            with client_context.wrap_socket(
+                sock,
+                server_hostname='localhost',
+                session=cache.get('localhost', port)
+            ) as tls_sock:
+                tls_sock.recv(1)
+                cache.store('localhost', port, tls_sock)
+                reused.append(tls_sock.session_reused)
+                tls_sock.sendall(b'y')
+
+        server_thread.join(timeout=5)
+        listener.close()
+
+        self.assertEqual([False, True], reused, "Second connection should resume the session")
+
+    def tearDown(self):
+        """
+        Remove generated certificates.
+        """
+        shutil.rmtree(self.cert_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Startup tests for the server and client entry points.
+Validates that heavy modules stay out of the import path until needed.
+"""
+
+import unittest
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Certificate handling, passphrase KDFs, asyncio and .env parsing are only
+# loaded by the code paths that use them
+DEFERRED_MODULES = (
+    'cryptography.x509',
+    'cryptography.hazmat.primitives.kdf.pbkdf2',
+    'asyncio',
+    'dotenv',
+    'sqlite3'
+)
+
+def loaded_modules(statement: str):
+    """
+    Run a statement in a fresh interpreter and list which deferred modules it loaded.
+    """
+    result = subprocess.run(
+        [
+            sys.executable, '-c',
+            f"import sys\n{statement}\n"
+            f"print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+        ],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout.split()
+
+class TestStartup(unittest.TestCase):
+    def test_entry_points_defer_heavy_imports(self):
+        """
+        Test that importing the server and client loads none of the deferred modules.
+        """
+        self.assertEqual([], loaded_modules('import run_server'))
+        self.assertEqual([], loaded_modules('import client.client'))
+
+    def test_server_with_supplied_storage_skips_sqlite(self):
+        """
+        Test that constructing a server on another backend never loads sqlite3.
+        """
+        statement = (
+            "from server.server import ChatServer\n"
+            "from server.storage import StorageBackend\n"
+            "class Storage(StorageBackend):\n"
+            "    pass\n"
+            "Storage.__abstractmethods__ = frozenset()\n"
+            "ChatServer(host='127.0.0.1', port=0, database_manager=Storage())"
+        )
+        self.assertNotIn('sqlite3', loaded_modules(statement))
+
+if __name__ == '__main__':
+    unittest.main()
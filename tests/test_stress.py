@@ -0,0 +1,211 @@
+"""
+Stress tests for the chat server under concurrent clients.
+Runs the real server in-process while many clients connect, send,
+disconnect and reconnect, then checks per-sender ordering, exactly-once
+storage, thread and descriptor leaks, and latency and throughput budgets.
+
+The default load finishes in a few seconds. Raise it for a soak run:
+    STRESS_CLIENTS=64 STRESS_ROUNDS=20 python -m pytest tests/test_stress.py
+"""
+
+import unittest
+import os
+import sys
+import threading
+import time
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from client.client import ChatClient
+from server.rate_limiter import ServerRateLimits
+from tests.server_harness import ServerTestCase
+
+CLIENTS = int(os.environ.get('STRESS_CLIENTS', 10))
+ROUNDS = int(os.environ.get('STRESS_ROUNDS', 3))
+MESSAGES_PER_ROUND = int(os.environ.get('STRESS_MESSAGES', 20))
+# Seconds between one client's messages; 0 sends each round as a burst
+SEND_INTERVAL = float(os.environ.get('STRESS_INTERVAL', 0.05))
+
+# Budgets for a single-core CPU-only runner, where the clients share the
+# server's core
+MAX_P99_LATENCY_MS = float(os.environ.get('STRESS_MAX_P99_MS', 750))
+MIN_MESSAGES_PER_SECOND = float(os.environ.get('STRESS_MIN_RATE', 50))
+
+# How long acknowledgements, threads and sockets get to settle; a server
+# meeting the throughput budget handles the whole load within this
+SETTLE_TIMEOUT = max(10.0, CLIENTS * ROUNDS * MESSAGES_PER_ROUND / MIN_MESSAGES_PER_SECOND)
+
+def open_descriptors():
+    """
+    Count this process's open file descriptors, or None where /proc is missing.
+    """
+    try:
+        return len(os.listdir('/proc/self/fd'))
+    except OSError:
+        return None
+
+def running_threads():
+    """
+    Count live threads other than the reactor's pool, which starts workers
+    on demand up to its fixed size.
+    """
+    return sum(1 for thread in threading.enumerate() if not thread.name.startswith('chat-worker'))
+
+def wait_for(condition, timeout=SETTLE_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+class Observer:
+    """
+    A client that stays connected and records every room message it sees.
+    """
+    def __init__(self, port):
+        self.lock = threading.Lock()
+        self.received = {}  # sender -> [(seq, latency)]
+        self.client = ChatClient('127.0.0.1', port)
+        self.client.message_handler = self.handle
+
+    def handle(self, message_data):
+        if message_data.get('type') != 'message':
+            return
+        now = time.perf_counter()
+        sender, seq, sent_at = message_data['message'].split()
+        with self.lock:
+            self.received.setdefault(sender, []).append((int(seq), now - float(sent_at)))
+
+    def count(self):
+        with self.lock:
+            return sum(len(messages) for messages in self.received.values())
+
+class TestServerUnderLoad(ServerTestCase):
+    def start_load_server(self, mode):
+        return self.start_server(
+            mode,
+            users=[f'user{index}' for index in range(CLIENTS)] + ['observer'],
+            # Limits are not under test; every client shares one IP
+            rate_limits=ServerRateLimits(
+                messages_per_second=1e6,
+                message_burst=1e6,
+                ip_messages_per_second=1e6,
+                ip_message_burst=1e6,
+                auth_attempts_per_minute=1e6,
+                auth_burst=1e6
+            ),
+            worker_pool_size=4,
+            # A dropped connection keeps its slot until its buffered frames are processed
+            max_connections=CLIENTS * ROUNDS + 10
+        )
+
+    def run_client(self, port, username, resent, errors):
+        """
+        Send ROUNDS rounds of messages, dropping the connection after each one
+        without waiting for acknowledgements; the next connect resends what was lost.
+        """
+        client = ChatClient('127.0.0.1', port)
+        client.message_handler = lambda message_data: None
+        sequence_of = {}
+        seq = 0
+        try:
+            for round_number in range(ROUNDS):
+                resent.update((username, sequence_of[msg_id]) for msg_id in client.unacknowledged)
+                if not client.connect(username, 'password'):
+                    errors.append(f"{username} could not connect in round {round_number}")
+                    return
+                for _ in range(MESSAGES_PER_ROUND):
+                    msg_id = client.send_message(f"{username} {seq} {time.perf_counter()}", username)
+                    sequence_of[msg_id] = seq
+                    seq += 1
+                    time.sleep(SEND_INTERVAL)
+                if round_number == ROUNDS - 1 and not wait_for(lambda: not client.unacknowledged):
+                    errors.append(f"{username} has {len(client.unacknowledged)} unacknowledged messages")
+                client.disconnect()
+        except Exception as e:
+            errors.append(f"{username}: {e!r}")
+            client.disconnect()
+
+    def test_concurrent_clients_with_reconnects(self):
+        """
+        Test ordering, exactly-once storage, leaks and budgets with churning clients.
+        """
+        for mode in ('threaded', 'reactor'):
+            with self.subTest(mode=mode):
+                self.run_load(mode)
+
+    def run_load(self, mode):
+        # Everything the server starts must be gone again once it stops
+        baseline_threads = running_threads()
+        baseline_descriptors = open_descriptors()
+
+        server, server_thread = self.start_load_server(mode)
+        observer = Observer(server.port)
+        self.assertTrue(observer.client.connect('observer', 'password'))
+        try:
+            resent, errors = set(), []
+            workers = [
+                threading.Thread(target=self.run_client, args=(server.port, f'user{index}', resent, errors))
+                for index in range(CLIENTS)
+            ]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            total = CLIENTS * ROUNDS * MESSAGES_PER_ROUND
+            self.assertEqual([], errors)
+            self.assertTrue(wait_for(lambda: observer.count() >= total), "observer missed messages")
+            elapsed = time.perf_counter() - start
+
+            # Exactly once and in send order, both in storage and on the wire
+            stored = {}
+            for row in server.database_manager.iter_messages():
+                sender, seq, _ = row['content'].split()
+                stored.setdefault(sender, []).append(int(seq))
+            expected = list(range(ROUNDS * MESSAGES_PER_ROUND))
+            for index in range(CLIENTS):
+                username = f'user{index}'
+                self.assertEqual(expected, stored.get(username), f"{username} storage")
+                delivered = [seq for seq, _ in observer.received.get(username, [])]
+                self.assertEqual(expected, delivered, f"{username} delivery")
+
+            # Every churning client is gone and the pool stayed within its size
+            self.assertTrue(
+                wait_for(lambda: len(server.clients.snapshot()) == 1),
+                f"{len(server.clients.snapshot()) - 1} sessions left behind"
+            )
+            self.assertLessEqual(threading.active_count() - running_threads(), server.worker_pool_size)
+
+            # Resent messages waited out a reconnect, so only first sends count
+            latencies = sorted(
+                latency
+                for sender, messages in observer.received.items()
+                for seq, latency in messages
+                if (sender, seq) not in resent
+            )
+            p99_ms = latencies[int(len(latencies) * 0.99) - 1] * 1000
+            rate = total / elapsed
+            print(f"\n{mode}: {total} messages in {elapsed:.2f}s ({rate:.0f}/s), "
+                  f"p99 delivery {p99_ms:.1f} ms, {len(resent)} resent")
+            self.assertLess(p99_ms, MAX_P99_LATENCY_MS)
+            self.assertGreater(rate, MIN_MESSAGES_PER_SECOND)
+        finally:
+            observer.client.disconnect()
+            self.stop_server(server, server_thread)
+
+        # Nothing left behind once the server has stopped
+        self.assertTrue(
+            wait_for(lambda: running_threads() <= baseline_threads),
+            f"{running_threads() - baseline_threads} threads leaked"
+        )
+        if baseline_descriptors is not None:
+            self.assertTrue(
+                wait_for(lambda: open_descriptors() <= baseline_descriptors),
+                f"{open_descriptors() - baseline_descriptors} descriptors leaked"
+            )
+
+if __name__ == '__main__':
+    unittest.main()
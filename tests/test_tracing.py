@@ -0,0 +1,155 @@
+"""
+Unit tests for message tracing and on-demand profiling.
+Validates sampled stage timings and the profile files written.
+"""
+
+import unittest
+import cProfile
+import json
+import os
+import pstats
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from unittest import mock
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from security.encryption import SecureEncryption
+from server.authentication import AuthenticationManager
+from server.database import DatabaseManager
+from server.server import ChatServer
+from server.session import ClientSession
+from server.tracing import MessageTracer
+
+class TestMessageTracer(unittest.TestCase):
+    def test_sampling_rate_bounds_recording(self):
+        """
+        Test that nothing is recorded at rate 0 and everything at rate 1.
+        """
+        tracer = MessageTracer(sample_rate=0.0)
+        for _ in range(10):
+            tracer.begin()
+            tracer.mark('decrypt')
+            tracer.end()
+        self.assertEqual([], tracer.dump())
+
+        tracer.sample_rate = 1.0
+        tracer.begin()
+        tracer.label('message')
+        tracer.mark('decrypt')
+        tracer.mark('store')
+        tracer.end()
+
+        [trace] = tracer.dump()
+        self.assertEqual('message', trace['kind'])
+        self.assertEqual(['decrypt', 'store'], [stage for stage, _ in trace['stages']])
+        self.assertEqual(trace['total_ns'], sum(duration for _, duration in trace['stages']))
+
+    def test_ring_buffer_keeps_newest(self):
+        """
+        Test that the buffer drops the oldest traces once full.
+        """
+        tracer = MessageTracer(sample_rate=1.0, capacity=3)
+        for i in range(5):
+            tracer.begin(f'trace {i}')
+            tracer.end()
+
+        self.assertEqual(['trace 2', 'trace 3', 'trace 4'], [t['kind'] for t in tracer.dump()])
+
+class TestServerTracing(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a fully sampled server with two socket-pair sessions.
+        """
+        self.temp_dbs = [tempfile.mktemp(), tempfile.mktemp()]
+        self.profile_dir = tempfile.mkdtemp()
+        self.server = ChatServer(
+            auth_manager=AuthenticationManager(database_path=self.temp_dbs[0]),
+            database_manager=DatabaseManager(database_path=self.temp_dbs[1]),
+            trace_sample_rate=1.0,
+            profile_dir=self.profile_dir
+        )
+        self.sockets = []
+        self.sessions = {}
+        for username in ('alice', 'bob'):
+            server_end, client_end = socket.socketpair()
+            self.sockets += [server_end, client_end]
+            session = ClientSession(server_end, None, SecureEncryption(), username)
+            self.server.clients.add(session)
+            self.sessions[username] = session
+
+    def send(self, message):
+        session = self.sessions['alice']
+        frame = session.cipher.encrypt_bytes(json.dumps({'message': message}).encode('utf-8'))
+        self.server._process_frame(session, frame)
+
+    def test_broadcast_records_every_stage(self):
+        """
+        Test that a traced broadcast is timed through each stage.
+        """
+        self.send('hello')
+
+        [trace] = self.server.tracer.dump()
+        self.assertEqual('message', trace['kind'])
+        self.assertEqual(
+            ['throttle', 'decrypt', 'parse', 'store', 'match', 'encode', 'send'],
+            [stage for stage, _ in trace['stages']]
+        )
+        self.assertIn('store', self.server.tracer.summary())
+
+    def test_profiles_written(self):
+        """
+        Test that both profile modes write a usable file.
+        """
+        path = self.server.profiler.start(0.2, 'cprofile')
+        self.send('profiled')
+        self.wait_for(self.server.profiler)
+        stats = pstats.Stats(path)
+        self.assertTrue(any(name == '_broadcast_message' for _, _, name in stats.stats))
+
+        path = self.server.profiler.start(0.2, 'sample')
+        self.wait_for(self.server.profiler)
+        with open(path) as f:
+            self.assertTrue(f.read().strip())
+
+    def test_cprofile_clash_is_reported(self):
+        """
+        Test that a handler whose cProfile cannot be enabled still runs and the capture says so.
+        """
+        profiler = self.server.profiler
+        with self.assertLogs('server.profiling', 'WARNING') as logs:
+            path = profiler.start(0.2, 'cprofile')
+            while not profiler._cprofile_active:
+                time.sleep(0.01)
+            clash = ValueError('Another profiling tool is already active')
+            with mock.patch.object(cProfile.Profile, 'enable', side_effect=clash):
+                self.send('unprofiled')
+            self.wait_for(profiler)
+
+        self.assertIn('1 handler runs were not profiled', logs.output[0])
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(0, os.path.getsize(path))
+
+    def wait_for(self, profiler):
+        deadline = time.monotonic() + 5
+        while profiler.running and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(profiler.running)
+
+    def tearDown(self):
+        """
+        Close sockets and remove temporary files.
+        """
+        for sock in self.sockets:
+            sock.close()
+        for path in self.temp_dbs:
+            if os.path.exists(path):
+                os.unlink(path)
+        shutil.rmtree(self.profile_dir)
+
+if __name__ == '__main__':
+    unittest.main()
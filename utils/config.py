@@ -1,70 +1,445 @@
 """
 Configuration management module for the distributed chat application.
-Handles loading and parsing configuration from environment and files.
+Handles loading and parsing configuration from environment and files,
+and reloading it while the server runs.
 """
 
+import logging
 import os
-from typing import Dict, Any
-from dotenv import load_dotenv
+import signal
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+def _read_environment(env_path: str) -> Dict[str, str]:
+    """
+    Merge the .env file with the process environment.
+
+    The file is parsed without touching os.environ, so a later reload
+    sees edits to it; variables set in the real environment still win.
+    """
+    values = {}
+    if os.path.exists(env_path):
+        # Deployments configured purely through the environment never load dotenv
+        from dotenv import dotenv_values
+        values.update({k: v for k, v in dotenv_values(env_path).items() if v is not None})
+    values.update(os.environ)
+    return values
 
 def load_configuration(env_path: str = '.env') -> Dict[str, Any]:
     """
     Load configuration from environment variables and .env file.
-    
+
     Args:
         env_path (str): Path to .env configuration file
-    
+
     Returns:
         Dict containing configuration settings
     """
-    # Load environment variables from .env file
-    load_dotenv(env_path)
-    
+    env = _read_environment(env_path)
+
     # Configuration dictionary to store settings
     config = {
         'SERVER': {
-            'HOST': os.getenv('SERVER_HOST', '127.0.0.1'),
-            'PORT': int(os.getenv('SERVER_PORT', 5000)),
-            'DEBUG': os.getenv('DEBUG_MODE', 'false').lower() == 'true'
+            'HOST': env.get('SERVER_HOST', '127.0.0.1'),
+            'PORT': int(env.get('SERVER_PORT', 5000)),
+            'DEBUG': env.get('DEBUG_MODE', 'false').lower() == 'true',
+            'MODE': env.get('SERVER_MODE', 'threaded'),
+            'WORKER_POOL_SIZE': int(env.get('WORKER_POOL_SIZE', 32)),
+            'HANDSHAKE_TIMEOUT': float(env.get('HANDSHAKE_TIMEOUT', 10.0)),
+            'RECONNECT_WINDOW': float(env.get('RECONNECT_WINDOW', 10.0)),
+            'DRAIN_TIMEOUT': float(env.get('DRAIN_TIMEOUT', 30.0))
         },
         'DATABASE': {
-            'URL': os.getenv('DATABASE_URL', 'sqlite:///chat_application.db'),
-            'MAX_CONNECTIONS': int(os.getenv('DB_MAX_CONNECTIONS', 5))
+            'URL': env.get('DATABASE_URL', 'sqlite:///chat_application.db'),
+            'MAX_CONNECTIONS': int(env.get('DB_MAX_CONNECTIONS', 5))
         },
         'SECURITY': {
-            'SECRET_KEY': os.getenv('SECRET_KEY', 'default_secret_key'),
-            'ENCRYPTION_SALT': os.getenv('ENCRYPTION_SALT', 'default_salt'),
-            'SSL_CERT_PATH': os.getenv('SSL_CERT_PATH', './security/cert.pem'),
-            'SSL_KEY_PATH': os.getenv('SSL_KEY_PATH', './security/key.pem')
+            'SECRET_KEY': env.get('SECRET_KEY', 'default_secret_key'),
+            'ENCRYPTION_SALT': env.get('ENCRYPTION_SALT', 'default_salt'),
+            'ENCRYPTION_BACKEND': env.get('ENCRYPTION_BACKEND', 'fernet'),
+            'SSL_ENABLED': env.get('SSL_ENABLED', 'false').lower() == 'true',
+            'SSL_CERT_PATH': env.get('SSL_CERT_PATH', './security/cert.pem'),
+            'SSL_KEY_PATH': env.get('SSL_KEY_PATH', './security/key.pem')
+        },
+        'RATE_LIMIT': {
+            'MAX_CONNECTIONS': int(env.get('MAX_CONNECTIONS', 100)),
+            'MESSAGES_PER_SECOND': float(env.get('RATE_LIMIT_MESSAGES_PER_SECOND', 5)),
+            'MESSAGE_BURST': float(env.get('RATE_LIMIT_MESSAGE_BURST', 10)),
+            'IP_MESSAGES_PER_SECOND': float(env.get('RATE_LIMIT_IP_MESSAGES_PER_SECOND', 20)),
+            'IP_MESSAGE_BURST': float(env.get('RATE_LIMIT_IP_MESSAGE_BURST', 40)),
+            'AUTH_ATTEMPTS_PER_MINUTE': float(env.get('RATE_LIMIT_AUTH_PER_MINUTE', 10)),
+            'AUTH_BURST': float(env.get('RATE_LIMIT_AUTH_BURST', 5)),
+            'UPLOAD_MB_PER_SECOND': float(env.get('RATE_LIMIT_UPLOAD_MB_PER_SECOND', 4)),
+            'UPLOAD_BURST_MB': float(env.get('RATE_LIMIT_UPLOAD_BURST_MB', 8)),
+            'MAX_TRACKED_KEYS': int(env.get('RATE_LIMIT_MAX_TRACKED_KEYS', 100000))
+        },
+        'PRESENCE': {
+            'PUSH_INTERVAL': float(env.get('PRESENCE_PUSH_INTERVAL', 1.0)),
+            'FLUSH_INTERVAL': float(env.get('PRESENCE_FLUSH_INTERVAL', 5.0))
+        },
+        'DELIVERY': {
+            'ACK_FLUSH_INTERVAL': float(env.get('ACK_FLUSH_INTERVAL', 0.05)),
+            'DEDUP_WINDOW': int(env.get('DEDUP_WINDOW', 100000))
+        },
+        'TRACING': {
+            'SAMPLE_RATE': float(env.get('TRACE_SAMPLE_RATE', 0.0)),
+            'BUFFER_SIZE': int(env.get('TRACE_BUFFER_SIZE', 4096)),
+            'PROFILE_MODE': env.get('PROFILE_MODE', 'sample'),
+            'PROFILE_SECONDS': float(env.get('PROFILE_SECONDS', 10.0)),
+            'OUTPUT_DIR': env.get('PROFILE_DIR', './profiles')
+        },
+        'ATTACHMENTS': {
+            'DIR': env.get('ATTACHMENT_DIR', './attachments'),
+            'MAX_SIZE_MB': float(env.get('MAX_ATTACHMENT_MB', 50))
         },
         'LOGGING': {
-            'LEVEL': os.getenv('LOG_LEVEL', 'INFO'),
-            'FILE_PATH': os.getenv('LOG_FILE_PATH', './logs/chat_app.log')
+            'LEVEL': env.get('LOG_LEVEL', 'INFO'),
+            'FILE_PATH': env.get('LOG_FILE_PATH', './logs/chat_app.log')
         }
     }
-    
+
     return config
 
 def validate_configuration(config: Dict[str, Any]) -> bool:
     """
     Validate loaded configuration for required settings.
-    
+
     Args:
         config (Dict): Configuration dictionary
-    
+
     Returns:
         bool: Configuration validity status
     """
     required_keys = [
-        'SERVER.HOST', 
-        'SERVER.PORT', 
+        'SERVER.HOST',
+        'SERVER.PORT',
         'SECURITY.SECRET_KEY'
     ]
-    
+
     for key in required_keys:
         section, setting = key.split('.')
         if not config.get(section, {}).get(setting):
             print(f"Missing required configuration: {key}")
             return False
-    
-    return True
\ No newline at end of file
+
+    checks = [
+        (0 <= config['SERVER']['PORT'] <= 65535, 'SERVER.PORT must be 0-65535'),
+        (config['SERVER']['MODE'] in ('threaded', 'reactor'), 'SERVER.MODE must be threaded or reactor'),
+        (config['SERVER']['WORKER_POOL_SIZE'] >= 1, 'SERVER.WORKER_POOL_SIZE must be at least 1'),
+        (config['SERVER']['HANDSHAKE_TIMEOUT'] > 0, 'SERVER.HANDSHAKE_TIMEOUT must be positive'),
+        (
+            config['DATABASE']['URL'].split(':', 1)[0] in ('sqlite', 'postgresql', 'postgres'),
+            'DATABASE.URL must be a sqlite:/// or postgresql:// URL'
+        ),
+        (config['DATABASE']['MAX_CONNECTIONS'] >= 1, 'DATABASE.MAX_CONNECTIONS must be at least 1'),
+        (config['SERVER']['RECONNECT_WINDOW'] >= 0, 'SERVER.RECONNECT_WINDOW must not be negative'),
+        (config['SERVER']['DRAIN_TIMEOUT'] >= 0, 'SERVER.DRAIN_TIMEOUT must not be negative'),
+        (config['RATE_LIMIT']['MAX_CONNECTIONS'] >= 1, 'RATE_LIMIT.MAX_CONNECTIONS must be at least 1'),
+        (config['RATE_LIMIT']['MESSAGES_PER_SECOND'] > 0, 'RATE_LIMIT.MESSAGES_PER_SECOND must be positive'),
+        (config['RATE_LIMIT']['MESSAGE_BURST'] >= 1, 'RATE_LIMIT.MESSAGE_BURST must be at least 1'),
+        (config['RATE_LIMIT']['IP_MESSAGES_PER_SECOND'] > 0, 'RATE_LIMIT.IP_MESSAGES_PER_SECOND must be positive'),
+        (config['RATE_LIMIT']['IP_MESSAGE_BURST'] >= 1, 'RATE_LIMIT.IP_MESSAGE_BURST must be at least 1'),
+        (config['RATE_LIMIT']['AUTH_ATTEMPTS_PER_MINUTE'] > 0, 'RATE_LIMIT.AUTH_ATTEMPTS_PER_MINUTE must be positive'),
+        (config['RATE_LIMIT']['AUTH_BURST'] >= 1, 'RATE_LIMIT.AUTH_BURST must be at least 1'),
+        (config['RATE_LIMIT']['UPLOAD_MB_PER_SECOND'] > 0, 'RATE_LIMIT.UPLOAD_MB_PER_SECOND must be positive'),
+        # A burst smaller than one 256 KB chunk would refuse every upload
+        (config['RATE_LIMIT']['UPLOAD_BURST_MB'] >= 0.25, 'RATE_LIMIT.UPLOAD_BURST_MB must be at least 0.25'),
+        (config['PRESENCE']['PUSH_INTERVAL'] > 0, 'PRESENCE.PUSH_INTERVAL must be positive'),
+        (config['PRESENCE']['FLUSH_INTERVAL'] > 0, 'PRESENCE.FLUSH_INTERVAL must be positive'),
+        (config['DELIVERY']['ACK_FLUSH_INTERVAL'] > 0, 'DELIVERY.ACK_FLUSH_INTERVAL must be positive'),
+        (config['DELIVERY']['DEDUP_WINDOW'] >= 1, 'DELIVERY.DEDUP_WINDOW must be at least 1'),
+        (0 <= config['TRACING']['SAMPLE_RATE'] <= 1, 'TRACING.SAMPLE_RATE must be 0-1'),
+        (config['TRACING']['BUFFER_SIZE'] >= 1, 'TRACING.BUFFER_SIZE must be at least 1'),
+        (config['TRACING']['PROFILE_MODE'] in ('sample', 'cprofile'), 'TRACING.PROFILE_MODE must be sample or cprofile'),
+        (config['TRACING']['PROFILE_SECONDS'] >= 0, 'TRACING.PROFILE_SECONDS must not be negative'),
+        (config['ATTACHMENTS']['MAX_SIZE_MB'] > 0, 'ATTACHMENTS.MAX_SIZE_MB must be positive'),
+        (
+            isinstance(logging.getLevelName(config['LOGGING']['LEVEL'].upper()), int),
+            'LOGGING.LEVEL must be a logging level name'
+        )
+    ]
+    for valid, problem in checks:
+        if not valid:
+            print(f"Invalid configuration: {problem}")
+            return False
+
+    return True
+
+@dataclass(frozen=True)
+class ServerSettings:
+    host: str
+    port: int
+    debug: bool
+    mode: str
+    worker_pool_size: int
+    handshake_timeout: float
+    reconnect_window: float
+    drain_timeout: float
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    url: str
+    max_connections: int
+
+@dataclass(frozen=True)
+class SecuritySettings:
+    secret_key: str
+    encryption_salt: str
+    encryption_backend: str
+    ssl_enabled: bool
+    ssl_cert_path: str
+    ssl_key_path: str
+
+@dataclass(frozen=True)
+class RateLimitSettings:
+    max_connections: int
+    messages_per_second: float
+    message_burst: float
+    ip_messages_per_second: float
+    ip_message_burst: float
+    auth_attempts_per_minute: float
+    auth_burst: float
+    upload_mb_per_second: float
+    upload_burst_mb: float
+    max_tracked_keys: int
+
+@dataclass(frozen=True)
+class PresenceSettings:
+    push_interval: float
+    flush_interval: float
+
+@dataclass(frozen=True)
+class DeliverySettings:
+    ack_flush_interval: float
+    dedup_window: int
+
+@dataclass(frozen=True)
+class TracingSettings:
+    sample_rate: float
+    buffer_size: int
+    profile_mode: str
+    profile_seconds: float
+    output_dir: str
+
+@dataclass(frozen=True)
+class AttachmentSettings:
+    dir: str
+    max_size_mb: float
+
+    @property
+    def max_size(self) -> int:
+        return int(self.max_size_mb * 1024 * 1024)
+
+@dataclass(frozen=True)
+class LoggingSettings:
+    level: str
+    file_path: str
+
+@dataclass(frozen=True)
+class Configuration:
+    """
+    Typed, immutable view of load_configuration().
+
+    A reload builds a new Configuration and swaps it in whole, so a
+    reader never sees half of an old and half of a new configuration.
+    """
+    server: ServerSettings
+    database: DatabaseSettings
+    security: SecuritySettings
+    rate_limit: RateLimitSettings
+    presence: PresenceSettings
+    delivery: DeliverySettings
+    tracing: TracingSettings
+    attachments: AttachmentSettings
+    logging: LoggingSettings
+
+    # Settings that only take effect on restart, as SECTION.KEY
+    RESTART_REQUIRED = (
+        'server.host', 'server.port', 'server.mode', 'database.url', 'database.max_connections',
+        'security.encryption_backend', 'security.ssl_enabled',
+        'security.ssl_cert_path', 'security.ssl_key_path', 'tracing.buffer_size',
+        'attachments.dir'
+    )
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> 'Configuration':
+        """
+        Build a Configuration from a load_configuration() dictionary.
+
+        Args:
+            config (Dict): Configuration dictionary
+
+        Returns:
+            Configuration: Typed configuration
+        """
+        sections = {}
+        for name, field in cls.__dataclass_fields__.items():
+            values = config[name.upper()]
+            sections[name] = field.type(**{key.lower(): value for key, value in values.items()})
+        return cls(**sections)
+
+    @classmethod
+    def load(cls, env_path: str = '.env') -> 'Configuration':
+        """
+        Load and validate configuration.
+
+        Raises:
+            ValueError: If the configuration is invalid
+        """
+        config = load_configuration(env_path)
+        if not validate_configuration(config):
+            raise ValueError(f"Invalid configuration in {env_path}")
+        return cls.from_dict(config)
+
+    def restart_required_changes(self, other: 'Configuration') -> List[str]:
+        """
+        List settings that differ from another configuration but need a restart.
+        """
+        changed = []
+        for key in self.RESTART_REQUIRED:
+            section, setting = key.split('.')
+            if getattr(getattr(self, section), setting) != getattr(getattr(other, section), setting):
+                changed.append(key)
+        return changed
+
+# Loaded once and replaced whole on reload
+_config_lock = threading.Lock()
+_current: Dict[str, Configuration] = {}
+_listeners: List[Callable[[Configuration, Configuration], None]] = []
+
+def get_config(env_path: str = '.env') -> Configuration:
+    """
+    Return the current configuration, loading it on first use.
+
+    Args:
+        env_path (str): Path to .env configuration file
+
+    Returns:
+        Configuration: Current configuration
+    """
+    key = os.path.abspath(env_path)
+    config = _current.get(key)
+    if config is None:
+        with _config_lock:
+            config = _current.get(key)
+            if config is None:
+                config = _current[key] = Configuration.load(env_path)
+    return config
+
+def add_reload_listener(listener: Callable[[Configuration, Configuration], None]) -> None:
+    """
+    Call listener(old, new) whenever a reload changes the configuration.
+    """
+    with _config_lock:
+        _listeners.append(listener)
+
+def remove_reload_listener(listener: Callable[[Configuration, Configuration], None]) -> None:
+    with _config_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+def reload_configuration(env_path: str = '.env') -> Optional[Configuration]:
+    """
+    Re-read configuration and swap it in if it is valid.
+
+    An invalid file is logged and ignored, leaving the running
+    configuration untouched.
+
+    Args:
+        env_path (str): Path to .env configuration file
+
+    Returns:
+        Optional new Configuration, None if it was invalid or unchanged
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        new = Configuration.load(env_path)
+    except (ValueError, KeyError) as e:
+        logger.error(f"[!] Configuration reload rejected: {e}")
+        return None
+
+    key = os.path.abspath(env_path)
+    with _config_lock:
+        old = _current.get(key)
+        if new == old:
+            return None
+        _current[key] = new
+        listeners = list(_listeners)
+
+    if old is not None:
+        for setting in old.restart_required_changes(new):
+            logger.warning(f"[!] {setting} changed; it takes effect after a restart")
+        for listener in listeners:
+            try:
+                listener(old, new)
+            except Exception as e:
+                logger.error(f"[!] Configuration listener error: {e}")
+    logger.info("[*] Configuration reloaded")
+    return new
+
+class ConfigWatcher:
+    def __init__(self, env_path: str = '.env', poll_interval: float = 2.0):
+        """
+        Reload configuration when the .env file changes or on SIGHUP.
+
+        Args:
+            env_path (str): Path to .env configuration file
+            poll_interval (float): Seconds between file modification checks
+        """
+        self.env_path = env_path
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._signature = self._file_signature()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.env_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def check(self) -> Optional[Configuration]:
+        """
+        Reload if the file changed since the last check.
+        """
+        signature = self._file_signature()
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        return reload_configuration(self.env_path)
+
+    def install_signal_handler(self) -> None:
+        """
+        Reload on SIGHUP. Must be called from the main thread.
+        """
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self._reload_in_background())
+
+    def _reload_in_background(self) -> None:
+        # Keep signal handlers short; the reload takes locks and does I/O
+        threading.Thread(
+            target=reload_configuration,
+            args=(self.env_path,),
+            name='config-reload',
+            daemon=True
+        ).start()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='config-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logging.getLogger(__name__).error(f"[!] Configuration watch error: {e}")
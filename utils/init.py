@@ -4,6 +4,6 @@ Imports and configures utility modules.
 """
 
 from .logger import setup_logging
-from .config import load_configuration
+from .config import Configuration, get_config, load_configuration
 
-__all__ = ['setup_logging', 'load_configuration']
\ No newline at end of file
+__all__ = ['setup_logging', 'load_configuration', 'get_config', 'Configuration']
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Wire protocol helpers for the distributed chat application.
+Provides length-prefixed framing shared by the client and server,
+for blocking and non-blocking sockets and asyncio streams.
+"""
+
+import socket
+import struct
+import time
+from typing import List, Optional, Tuple
+
+# Every frame is a 4-byte big-endian length followed by the payload
+FRAME_HEADER = struct.Struct('!I')
+MAX_FRAME_SIZE = 1024 * 1024
+
+# Longest a send on a non-blocking socket waits for a slow peer, in seconds
+SEND_TIMEOUT = 10.0
+
+# Decrypted payloads starting with this byte carry file data, not JSON:
+# marker, 16-byte transfer ID, then the chunk itself
+CHUNK_MARKER = b'\x00'
+CHUNK_HEADER_SIZE = 17
+CHUNK_SIZE = 256 * 1024
+
+
+class FrameError(Exception):
+    """
+    Raised when a peer sends a malformed or oversized frame.
+    """
+
+
+def pack_chunk(transfer_id: str, data: bytes) -> bytes:
+    """
+    Build a file data payload for one chunk of a transfer.
+
+    Args:
+        transfer_id (str): 32 hex digit transfer ID
+        data (bytes): Chunk, at most CHUNK_SIZE bytes
+
+    Returns:
+        bytes: Payload to encrypt and send as one frame
+    """
+    return CHUNK_MARKER + bytes.fromhex(transfer_id) + data
+
+
+def is_chunk(payload: bytes) -> bool:
+    return payload[:1] == CHUNK_MARKER
+
+
+def unpack_chunk(payload: bytes) -> Tuple[str, bytes]:
+    """
+    Split a file data payload into its transfer ID and chunk.
+
+    Raises:
+        FrameError: If the payload is too short to hold a transfer ID
+    """
+    if len(payload) < CHUNK_HEADER_SIZE:
+        raise FrameError("Truncated chunk header")
+    return payload[1:CHUNK_HEADER_SIZE].hex(), payload[CHUNK_HEADER_SIZE:]
+
+
+def send_frame(sock: socket.socket, payload: bytes) -> None:
+    """
+    Send one length-prefixed frame.
+
+    On a non-blocking socket this waits up to SEND_TIMEOUT for the peer
+    to make room, instead of failing part way through the frame.
+
+    Args:
+        sock (socket): Connected socket
+        payload (bytes): Frame payload
+    """
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(payload)} bytes exceeds {MAX_FRAME_SIZE}")
+    data = FRAME_HEADER.pack(len(payload)) + payload
+    if sock.gettimeout() == 0.0:
+        _send_nonblocking(sock, data, time.monotonic() + SEND_TIMEOUT)
+    else:
+        sock.sendall(data)
+
+
+def _send_nonblocking(sock: socket.socket, data: bytes, deadline: float) -> None:
+    """
+    Send all of ``data`` on a non-blocking socket, waiting until it is writable as needed.
+    """
+    # Only the server's reactor sockets are non-blocking; clients never load these
+    import selectors
+    import ssl
+
+    view = memoryview(data)
+    while view:
+        try:
+            view = view[sock.send(view):]
+            continue
+        except (BlockingIOError, ssl.SSLWantWriteError):
+            event = selectors.EVENT_WRITE
+        except ssl.SSLWantReadError:
+            event = selectors.EVENT_READ
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout("Frame not sent in time")
+        with selectors.DefaultSelector() as selector:
+            selector.register(sock, event)
+            selector.select(remaining)
+
+
+def _recv_exact(sock: socket.socket, size: int, deadline: Optional[float] = None) -> Optional[bytes]:
+    """
+    Read exactly ``size`` bytes, or return None if the peer closed first.
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        if deadline is not None:
+            # A peer trickling bytes must not extend the wait one recv at a time
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout("Frame not received in time")
+            sock.settimeout(remaining)
+        count = sock.recv_into(view[received:], size - received)
+        if not count:
+            return None
+        received += count
+    return bytes(buffer)
+
+
+def recv_frame(sock: socket.socket, deadline: Optional[float] = None) -> Optional[bytes]:
+    """
+    Receive one length-prefixed frame.
+
+    Args:
+        sock (socket): Connected socket
+        deadline (float, optional): time.monotonic() by which the whole
+            frame must have arrived; changes the socket's timeout
+
+    Returns:
+        Optional frame payload, None if the connection was closed
+
+    Raises:
+        socket.timeout: If the deadline passes first
+    """
+    header = _recv_exact(sock, FRAME_HEADER.size, deadline)
+    if header is None:
+        return None
+
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {size} bytes exceeds {MAX_FRAME_SIZE}")
+    if size == 0:
+        return b''
+
+    payload = _recv_exact(sock, size, deadline)
+    if payload is None:
+        raise FrameError("Connection closed mid-frame")
+    return payload
+
+
+class FrameBuffer:
+    """
+    Reassembles frames from whatever bytes a non-blocking socket delivers.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self):
+        self._data = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Add received bytes and take every frame they complete.
+
+        Args:
+            data (bytes): Bytes as read from the socket
+
+        Returns:
+            List of complete frame payloads, possibly empty
+
+        Raises:
+            FrameError: If a frame header announces an oversized frame
+        """
+        buffer = self._data
+        buffer += data
+        frames = []
+        while len(buffer) >= FRAME_HEADER.size:
+            (size,) = FRAME_HEADER.unpack_from(buffer)
+            if size > MAX_FRAME_SIZE:
+                raise FrameError(f"Frame of {size} bytes exceeds {MAX_FRAME_SIZE}")
+            end = FRAME_HEADER.size + size
+            if len(buffer) < end:
+                break
+            frames.append(bytes(buffer[FRAME_HEADER.size:end]))
+            del buffer[:end]
+        return frames
+
+
+async def read_frame(reader) -> Optional[bytes]:
+    """
+    Receive one length-prefixed frame from an asyncio stream.
+
+    Args:
+        reader (asyncio.StreamReader): Connected stream reader
+
+    Returns:
+        Optional frame payload, None if the connection was closed
+    """
+    # Already loaded by the caller's event loop; blocking clients never import it
+    import asyncio
+
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise FrameError("Connection closed mid-frame")
+        return None
+
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {size} bytes exceeds {MAX_FRAME_SIZE}")
+    try:
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError:
+        raise FrameError("Connection closed mid-frame")
+
+
+async def write_frame(writer, payload: bytes) -> None:
+    """
+    Send one length-prefixed frame on an asyncio stream.
+
+    Waits for the transport buffer to drain, so a slow peer slows the
+    sender down instead of growing memory.
+
+    Args:
+        writer (asyncio.StreamWriter): Connected stream writer
+        payload (bytes): Frame payload
+    """
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(payload)} bytes exceeds {MAX_FRAME_SIZE}")
+    writer.write(FRAME_HEADER.pack(len(payload)) + payload)
+    await writer.drain()